@@ -6,7 +6,12 @@ from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from functools import lru_cache
+import json
+import numpy as np
 # Add the main directory of the project to the system path.
 # This allows for importing utility modules from the 'util' package.
 current_dir = pathlibPath(__file__).resolve().parent
@@ -15,7 +20,9 @@ sys.path.insert(0, str(project_root))
 
 # Import utility functions for antibody searching and PDB interaction from the 'util' package.
 from util.antibody_search import search_antibodies_api
-from util.pdb_interaction import get_pdb_from_rcsb, get_fasta_from_rcsb, extract_chains_from_pdb, generate_chain_selection, generate_linked_chains
+from util.chain_database import get_local_chains
+from util.sequence_search import search_sequence
+from util.pdb_interaction import get_pdb_from_rcsb, get_fasta_from_rcsb, extract_chains_from_pdb, generate_chain_selection, generate_linked_chains, resolve_selection, iter_chains_from_rcsb, find_interface_residues, get_terminus_coordinates, suggest_chain_order, trim_structure, LEVELS_OF_DETAIL
 # Import data dictionaries for various biological components like TMDs, proteases, signal sequences, etc.
 from util import TMD_DATA, CTEV_DATA, NTEV_DATA, TEVP_DATA, SIGNAL_SEQS, PRS_DATA, AIP_DATA, FRET_ICDs, TAG_SEQS
 
@@ -26,12 +33,17 @@ class ChainSelection(BaseModel):
     Pydantic model to define the structure for selecting specific chain segments
     within a PDB structure.
     """
-    selection: dict[str, tuple[int, int]] = Field(
+    selection: dict[str, tuple[int | str, int | str]] = Field(
         ...,
         examples=[
             {"A": (0, 200), "C": (45, 87)},
+            {"H": (1, "113"), "L": ("1", "52A")}
         ],
-        description="Dictionary where keys are chain IDs and values are tuples of 0-indexed start and endpoint of chain selection."
+        description="Dictionary where keys are chain IDs and values are tuples of 0-indexed start and endpoint (exclusive) of chain selection, or of the first and last residue number (inclusive) if by_residue_number is set."
+    )
+    by_residue_number: bool = Field(
+        False,
+        description="Whether the selection is given by the residue numbers of the structure (including insertion codes such as '52A') instead of 0-indexed sequence positions."
     )
 
 
@@ -50,6 +62,50 @@ class ChainLinkage(BaseModel):
     )
 
 
+class BatchChainsInput(BaseModel):
+    """
+    Pydantic model for retrieving chain data of multiple PDB structures in a single request.
+    """
+    pdb_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        examples=[["1a2y", "7kql", "1ahw"]],
+        description="List of PDB IDs for which chain data should be retrieved. Duplicates are only fetched once."
+    )
+    max_concurrency: int = Field(
+        8,
+        ge=1,
+        le=32,
+        description="Maximum number of structures fetched from RCSB at the same time."
+    )
+
+
+class SequenceSearchInput(BaseModel):
+    """
+    Pydantic model for searching local structures for chains similar to a query sequence.
+    """
+    sequence: str = Field(
+        ...,
+        min_length=5,
+        max_length=5000,
+        examples=["EVQLVESGGGLVQPGGSLRLSCAASGFNIKDTYIHWVRQAPGKGLEWVARIYPTNGYTRYADSVKG"],
+        description="The amino acid sequence to search for, e.g. a custom binder sequence."
+    )
+    top_n: int = Field(
+        20,
+        ge=1,
+        le=500,
+        description="Maximum number of hits to return."
+    )
+    min_identity: float = Field(
+        0.0,
+        ge=0.0,
+        le=1.0,
+        description="Minimum approximate sequence identity of returned hits."
+    )
+
+
 class SplitProteaseAttachmentInput(BaseModel):
     """
     Pydantic model for attaching split protease components to sequences.
@@ -181,6 +237,18 @@ def get_pdb_with_http_error(pdb_id: str) -> str:
     return pdb
 
 
+@lru_cache(maxsize=64)
+def get_trimmed_structure(pdb_id: str, chains: tuple[str, ...] | None, level_of_detail: str) -> str:
+    """
+    Retrieves PDB content from RCSB and trims it for display. Results are cached per (pdb_id, chains, level_of_detail), failed retrievals are not cached.
+    :param pdb_id: The ID of the PDB to retrieve.
+    :param chains: The chain IDs to keep, or None to keep all chains.
+    :param level_of_detail: The level of detail, one of LEVELS_OF_DETAIL.
+    :return: The trimmed content of the PDB file as a string.
+    """
+    return trim_structure(get_pdb_with_http_error(pdb_id), list(chains) if chains else None, level_of_detail)
+
+
 # Initialize the FastAPI application.
 app: FastAPI = FastAPI(
     title="MESA-Designer API",
@@ -217,45 +285,110 @@ async def read_root() -> dict[str, str]:
 
 
 @app.get(path="/search_antigen", summary="Search for antibodies based on an antigen query")
-async def search_antigens(antigen: str = Query(..., description="The antigen name to search for")) -> dict[str, list[dict[str, str]] | float]:
+async def search_antigens(antigen: str = Query(..., description="The antigen name to search for"),
+                          deduplicate: bool = Query(False, description="Cluster redundant entries by heavy/light chain sequence identity and only return the best resolved entry of each cluster, together with the cluster size.")) -> dict[str, list[dict[str, str]] | float]:
     """
     Searches the antibody database for entries matching the provided antigen query.
     :param antigen: The name of the antigen to search for.
+    :param deduplicate: Whether to only return one representative per cluster of redundant entries.
     :return: A dictionary containing search results (e.g., SAbDab data) and search duration.
     """
     if not antigen:
         raise HTTPException(status_code=400, detail="Antigen query cannot be empty.")
 
-    results = search_antibodies_api(antigen)
+    # the search blocks while deduplication fetches sequences from RCSB, so it runs in a worker thread instead of the event loop
+    results = await run_in_threadpool(search_antibodies_api, antigen, deduplicate)
     if not results["sabdab_data"]:
         raise HTTPException(status_code=404, detail=f"No antibodies found for antigen: {antigen}")
 
     return results
 
 
+@app.post(path="/search_sequence", summary="Search local structures for chains similar to a sequence")
+async def search_similar_chains(search_data: SequenceSearchInput) -> dict[str, list[dict[str, str | int | float]] | float]:
+    """
+    Searches all chains of the local structure set for sequences similar to the query using a k-mer index.
+    Hits are ranked by the number of shared k-mers and annotated with an approximate sequence identity.
+    :param search_data: A SequenceSearchInput model containing the query sequence and result limits.
+    :return: A dictionary containing the ranked hits (PDB ID, chain ID, shared k-mers, identity) and the search duration.
+    """
+    results = search_sequence(search_data.sequence, search_data.top_n, search_data.min_identity)
+    if not results["hits"]:
+        raise HTTPException(status_code=404, detail="No similar chains found in the local structures.")
+
+    return results
+
+
 @app.get(path="/pdb/{pdb_id}_chains", summary="Retrieve PDB chain data")
-async def get_pdb_chains(pdb_id: str = Path(..., description="The PDB ID to retrieve chain data for")) -> dict[str, str | list[dict[str, str]]]:
+async def get_pdb_chains(pdb_id: str = Path(..., description="The PDB ID to retrieve chain data for")) -> dict[str, str | dict[str, dict[str, str | int | list[str]]]]:
     """
-    Retrieves the PDB file content for a given PDB ID from RCSB and then extracts and returns detailed information about each chain within the PDB.
+    Retrieves detailed information about each chain within the PDB. Chain data is taken from the local chain database if available,
+    otherwise the PDB file is retrieved from RCSB and its chains are extracted.
     :param pdb_id: The PDB ID for which to retrieve chain data.
-    :return: A dictionary containing the PDB ID and a list of dictionaries, each representing a chain with its details.
+    :return: A dictionary containing the PDB ID and a dictionary mapping chain IDs to the chains' details.
     """
-    pdb_content: str = get_pdb_with_http_error(pdb_id)
+    # answer from the pre-extracted chain database if possible and only fetch and parse the structure otherwise
+    chains_data: dict[str, dict[str, str | int | list[str]]] | None = get_local_chains(pdb_id)
+    if not chains_data:
+        pdb_content: str = get_pdb_with_http_error(pdb_id)
+        chains_data = extract_chains_from_pdb(file_content=pdb_content)
 
-    chains_data: list[dict[str, str]] = extract_chains_from_pdb(file_content=pdb_content)
     if not chains_data:
         raise HTTPException(status_code=404, detail=f"No chain data extracted for PDB ID '{pdb_id}'.")
 
     return {"pdb_id": pdb_id, "chains": chains_data}
 
 
+@app.post(path="/pdb/batch_chains", summary="Retrieve chain data for multiple PDB structures concurrently")
+async def get_batch_pdb_chains(batch_data: BatchChainsInput) -> StreamingResponse:
+    """
+    Fetches multiple PDB files from RCSB concurrently and extracts their chains in a worker pool.
+    Results are streamed back as newline-delimited JSON as soon as each structure has been processed, so the order of the lines may differ from the order of the input.
+    Each line either has the form {"pdb_id": ..., "chains": ...} or {"pdb_id": ..., "error": ...}.
+    :param batch_data: A BatchChainsInput model containing the PDB IDs and the concurrency limit.
+    :return: A streaming response with one JSON object per PDB ID.
+    """
+    # remove empty and duplicate ids while preserving the input order
+    pdb_ids: list[str] = list(dict.fromkeys(pdb_id.strip() for pdb_id in batch_data.pdb_ids if pdb_id.strip()))
+    if not pdb_ids:
+        raise HTTPException(status_code=400, detail="You need to provide at least one PDB ID.")
+
+    def stream_chains():
+        # answer structures available in the local chain database immediately and only fetch the remaining ones
+        remaining_ids: list[str] = []
+        for pdb_id in pdb_ids:
+            local_chains: dict[str, dict[str, str | int | list[str]]] | None = get_local_chains(pdb_id)
+            if local_chains:
+                yield json.dumps({"pdb_id": pdb_id, "chains": local_chains}) + "\n"
+            else:
+                remaining_ids.append(pdb_id)
+
+        for pdb_id, chains_data, error in iter_chains_from_rcsb(remaining_ids, max_concurrency=batch_data.max_concurrency):
+            yield json.dumps({"pdb_id": pdb_id, "error": error} if error else {"pdb_id": pdb_id, "chains": chains_data}) + "\n"
+
+    return StreamingResponse(stream_chains(), media_type="application/x-ndjson")
+
+
 @app.get(path="/pdb/{pdb_id}_structure", summary="Retrieve PDB file from RCSB")
-async def get_pdb_structure(pdb_id: str = Path(..., description="The PDB ID to retrieve PDB file from RCSB for. It should be noted that it is likely faster to get this structure directly from RCSB")) -> dict[str, str]:
+async def get_pdb_structure(pdb_id: str = Path(..., description="The PDB ID to retrieve PDB file from RCSB for. It should be noted that it is likely faster to get this structure directly from RCSB"),
+                            chains: str | None = Query(None, description="Comma separated chain IDs (e.g. 'H,L'). If given, only these chains are returned."),
+                            level_of_detail: str | None = Query(None, description=f"If given, the structure is trimmed for display: hydrogens, waters and header records are removed. One of {', '.join(LEVELS_OF_DETAIL)}. 'trace' only keeps C-alpha atoms, 'auto' does so for large structures.")
+                            ) -> dict[str, str]:
     """
     Retrieves a PDB file from RCSB database based on pdb id. It is usually faster to retrieve this from RCSB directly.
+    If chains or a level of detail are given, a reduced structure suited for 3D viewers is returned instead of the original file.
     :param pdb_id: The PDB ID to retrieve the structure for.
+    :param chains: Comma separated chain IDs to keep.
+    :param level_of_detail: The level of detail of the trimmed structure.
     :return: A dictionary containing the PDB ID and its content as a string.
     """
+    if chains or level_of_detail:
+        if (level_of_detail or "full") not in LEVELS_OF_DETAIL:
+            raise HTTPException(status_code=400, detail=f"Invalid level of detail. Must be one of: {', '.join(LEVELS_OF_DETAIL)}.")
+
+        chain_ids: tuple[str, ...] | None = tuple(sorted({chain_id.strip() for chain_id in chains.split(",") if chain_id.strip()})) if chains else None
+        return {"pdb_id": pdb_id, "pdb_content": get_trimmed_structure(pdb_id.lower(), chain_ids, level_of_detail or "full")}
+
     pdb_content: str = get_pdb_with_http_error(pdb_id)
 
     return {"pdb_id": pdb_id, "pdb_content": pdb_content}
@@ -275,6 +408,28 @@ async def get_pdb_fasta(pdb_id: str = Path(..., description="The PDB ID to retri
     return {"pdb_id": pdb_id, "pdb_content": pdb_fasta}
 
 
+@app.get(path="/pdb/{pdb_id}/interface", summary="Detect interface residues between the chains of a PDB structure")
+async def get_pdb_interface(pdb_id: str = Path(..., description="The PDB ID to detect interface residues for"),
+                            cutoff: float = Query(5.0, gt=0, le=12, description="The maximum heavy atom distance in Angstrom for two residues to be in contact."),
+                            padding: int = Query(10, ge=0, description="The number of residues added on both sides of the contacting residues when suggesting residue ranges.")
+                            ) -> dict[str, str | dict[str, dict[str, dict[str, list[str]]]]]:
+    """
+    Detects the residues of every chain which contact another chain (e.g. the paratope of an antibody chain contacting the antigen)
+    and suggests a compact residue range per chain pair which can be used as a binder selection in later requests.
+    :param pdb_id: The PDB ID to detect interface residues for.
+    :param cutoff: The maximum heavy atom distance in Angstrom for two residues to be in contact.
+    :param padding: The number of residues added on both sides of the contacting residues when suggesting residue ranges.
+    :return: A dictionary containing the PDB ID and a dictionary mapping chain IDs to their partner chains' contacting residues and suggested ranges.
+    """
+    pdb_content: str = get_pdb_with_http_error(pdb_id)
+
+    interfaces: dict[str, dict[str, dict[str, list[str]]]] = find_interface_residues(pdb_content, cutoff, padding)
+    if not interfaces:
+        raise HTTPException(status_code=404, detail=f"No interface between chains found for PDB ID '{pdb_id}'.")
+
+    return {"pdb_id": pdb_id, "interfaces": interfaces}
+
+
 @app.post(path="/pdb/{pdb_id}/generate_chain_selection", summary="Generate chain selection from selected PDB cahins and residues")
 async def get_chain_selection(selection_data: ChainSelection,
                               pdb_id: str = Path(..., description="The PDB ID for which to generate the chain selection")) -> dict[str, str | dict[str, str]]:
@@ -285,8 +440,9 @@ async def get_chain_selection(selection_data: ChainSelection,
     :return: A dictionary containing the PDB ID and the generated chain selections.
     """
     pdb_content: str = get_pdb_with_http_error(pdb_id)
+    chains_data: dict[str, dict[str, str | int | list[str]]] = get_local_chains(pdb_id) or extract_chains_from_pdb(file_content=pdb_content)
 
-    chain_selection: dict[str, str] | None = generate_chain_selection(pdb_content, selection_data.selection)
+    chain_selection: dict[str, str] | None = generate_chain_selection(pdb_content, selection_data.selection, selection_data.by_residue_number, chains_data)
     if not chain_selection:
         raise HTTPException(status_code=400, detail=f"Could not select chains from pdb with the given selection data. Ensure valid chain IDs and residue numbers.")
 
@@ -308,8 +464,9 @@ async def get_linked_chains(selection_data: ChainSelection,
     :return: A dictionary containing the PDB ID, chain selection, linkage data, linker, and the assembled MESA chains.
     """
     pdb_content: str = get_pdb_with_http_error(pdb_id)
+    chains_data: dict[str, dict[str, str | int | list[str]]] = get_local_chains(pdb_id) or extract_chains_from_pdb(file_content=pdb_content)
 
-    chain_selection: dict[str, str] | None = generate_chain_selection(pdb_content, selection_data.selection)
+    chain_selection: dict[str, str] | None = generate_chain_selection(pdb_content, selection_data.selection, selection_data.by_residue_number, chains_data)
     if not chain_selection:
         raise HTTPException(status_code=400, detail=f"Could not select chains from pdb with the given selection data. Ensure valid chain IDs and residue numbers.")
 
@@ -323,6 +480,49 @@ async def get_linked_chains(selection_data: ChainSelection,
             "linker": linker,
             "mesa_chains": chains}
 
+
+@app.post(path="/pdb/{pdb_id}/suggest_linkers", summary="Suggest chain order and minimal linker lengths from the distances between chain termini")
+async def get_suggested_linkers(selection_data: ChainSelection,
+                                linkage_data: ChainLinkage,
+                                pdb_id: str = Path(..., description="The PDB ID which supplies the selected chains"),
+                                linker_pattern: str = Query("GGGGS", min_length=1, description="The amino acid pattern which is repeated to form the linkers.")
+                                ) -> dict[str, str | dict[str, list[str]] | dict[str, dict[str, list[str] | list[float] | list[int]]]]:
+    """
+    Measures the distance between the C-terminus and N-terminus of every pair of selected chain segments and, for each MESA chain of the linkage,
+    picks the order of its segments which needs the shortest linkers together with the smallest number of pattern repeats spanning each junction.
+    The returned linkage can be used directly in a request to /pdb/{pdb_id}/generate_linked_chains.
+    :param selection_data: A ChainSelection model specifying the chains and residue ranges.
+    :param linkage_data: A ChainLinkage model specifying which chains are linked into which MESA chain. The order of the chains is ignored.
+    :param pdb_id: The PDB ID supplying the chains.
+    :param linker_pattern: The amino acid pattern which is repeated to form the linkers.
+    :return: A dictionary containing the PDB ID, the reordered linkage and the suggested order, junction distances, repeats and linkers per MESA chain.
+    """
+    pdb_content: str = get_pdb_with_http_error(pdb_id)
+    chains_data: dict[str, dict[str, str | int | list[str]]] = get_local_chains(pdb_id) or extract_chains_from_pdb(file_content=pdb_content)
+
+    # convert the selections to the residue numbers of the first and last selected residue
+    segments: dict[str, tuple[str, str]] = {}
+    for chain_id, (first, last) in selection_data.selection.items():
+        positions: tuple[int, int] | None = resolve_selection(chains_data[chain_id], first, last, selection_data.by_residue_number) if chain_id in chains_data else None
+        if not positions:
+            raise HTTPException(status_code=400, detail=f"Invalid selection for chain '{chain_id}'. Ensure valid chain IDs and residue numbers.")
+        segments[chain_id] = (chains_data[chain_id]["residue_numbers"][positions[0]], chains_data[chain_id]["residue_numbers"][positions[1] - 1])
+
+    termini: dict[str, np.ndarray] = get_terminus_coordinates(pdb_content, segments)
+
+    suggestions: dict[str, dict[str, list[str] | list[float] | list[int]]] = {}
+    for mesa_chain_id, chain_ids in linkage_data.linkage.items():
+        try:
+            suggestions[mesa_chain_id] = suggest_chain_order(termini, chain_ids, linker_pattern)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Could not suggest linkers for MESA chain '{mesa_chain_id}': {e}")
+        suggestions[mesa_chain_id]["linkers"] = [linker_pattern * repeats for repeats in suggestions[mesa_chain_id]["repeats"]]
+
+    return {"pdb_id": pdb_id,
+            "linkage": {mesa_chain_id: suggestion["order"] for mesa_chain_id, suggestion in suggestions.items()},
+            "suggestions": suggestions}
+
+
 @app.get(path="/tmd/overview", summary="Receive an overview over a selection of TMDs taken from various papers.")
 async def get_tmd_overview() -> dict[str, dict[str, list[str]] | list[str]]:
     """
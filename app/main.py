@@ -1,6 +1,7 @@
 from pathlib import Path
 import sys
 import streamlit as st
+import streamlit.components.v1 as components
 from stmol import *
 from streamlit_js_eval import streamlit_js_eval
 from streamlit_sortables import sort_items
@@ -9,13 +10,15 @@ from annotated_text import annotated_text
 import zipfile
 import io
 import json
+from hashlib import sha256
+import numpy as np
 from datetime import datetime
+from uuid import uuid4
 from Bio import SeqIO
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqFeature import SeqFeature, FeatureLocation
 from Bio.Restriction.Restriction_Dictionary import rest_dict
-import dnachisel
 from streamlit_downloader import downloader
 
 # Add the parent directory of the current file to sys.path
@@ -28,8 +31,13 @@ from streamlit_scroll_navigation import scroll_navbar
 
 # Import custom utility functions and data from the 'util' package
 from util.antibody_search import search_antibodies
-from util import TMD_DATA, CTEV_DATA, NTEV_DATA, TEVP_DATA, PRS_DATA, AIP_DATA, FRET_ICDs, CHAIN_COLORS, SIGNAL_SEQS, TAG_SEQS
-from util.pdb_interaction import extract_chains_from_pdb, get_pdb_from_rcsb
+from util import DATA_DIR, TMD_DATA, CTEV_DATA, NTEV_DATA, TEVP_DATA, PRS_DATA, AIP_DATA, FRET_ICDs, CHAIN_COLORS, SIGNAL_SEQS, TAG_SEQS
+from util.pdb_interaction import extract_chains_from_pdb, get_pdb_from_rcsb, find_interface_residues, suggest_residue_range, resolve_selection, get_residue_ranges, get_terminus_coordinates, calculate_linker_repeats, suggest_chain_order, MAX_ORDER_SEGMENTS, trim_structure, LEVELS_OF_DETAIL
+from util.chain_database import get_local_chains
+from util.sequence_search import search_sequence
+from util.structure_prefetch import StructurePrefetcher, PREFETCH_COUNT, PREFETCH_TIMEOUT
+from util.dna_optimization import optimize_construct
+from mesa_designer.store import ArtifactStore
 
 # Set Streamlit page configuration (must be called before any other Streamlit command)
 st.set_page_config(page_title="MESA-Designer", layout="wide", page_icon="resources/imgs/MESA.png", menu_items={
@@ -57,7 +65,11 @@ if "pdb_fasta" not in state: # Stores FASTA format sequences extracted from sele
     state.pdb_fasta = None
 if "current_pdb_chains_data" not in state: # Stores extracted data (sequences, IDs) for each chain of the selected PDB
     state.current_pdb_chains_data = {}
-if "highlight_selection" not in state: # Dictionary to store residue selections for highlighting in the 3D viewer (per chain)
+if "interface_residues" not in state: # Stores contacting residues and suggested residue ranges between the chains of the selected PDB
+    state.interface_residues = {}
+if "antigen_chains" not in state: # Stores the antigen chain IDs of the selected PDB according to SAbDab
+    state.antigen_chains = []
+if "highlight_selection" not in state: # Dictionary to store residue selections for highlighting in the 3D viewer as (start, end) sequence positions (per chain)
     state.highlight_selection = {}
 if "prev_pdb_selection" not in state: # Stores the previously selected PDB ID to detect changes
     state.prev_pdb_selection = None
@@ -79,6 +91,10 @@ if "download_data" not in state: # Stores a BytesIO object containing the final
     state.download_data = None
 if "prev_search" not in state: # Stores the previous search query to detect changes in the search field
     state.prev_search = ""
+if "prev_filter_structures" not in state: # Stores whether redundant structures were removed in the previous search to detect changes
+    state.prev_filter_structures = False
+if "search_token" not in state: # Identifies this session's requests to the shared structure prefetcher, so a new search only cancels this session's pending structures
+    state.search_token = uuid4().hex
 if "optimization_settings" not in state: # Stores settings for sequence optimization (e.g., restriction enzymes, species)
     state.optimization_settings = {}
 if "themes" not in state: # Dictionary to manage light/dark mode themes and their properties
@@ -516,7 +532,8 @@ def display_warnings(warnings: list[str], component_key: str) -> None:
 def update_chain_highlight_selection(chain_id_to_toggle: str, current_pdb_selection: str) -> None:
     """
     Updates the session state's `highlight_selection` when a PDB chain's checkbox is toggled.
-    If a chain is selected, its entire residue range is added to `highlight_selection`.
+    If a chain is selected, the residue range suggested from its interface with the antigen (or any other chain if the antigen is unknown)
+    is added to `highlight_selection`. Chains without contacts and antigen chains are selected entirely.
     If deselected, the chain is removed from `highlight_selection`.
 
     :param chain_id_to_toggle: The ID of the chain being toggled (e.g., 'A', 'B').
@@ -527,8 +544,17 @@ def update_chain_highlight_selection(chain_id_to_toggle: str, current_pdb_select
     checkbox_key: str = f"{current_pdb_selection}_checkbox_chain_{chain_id_to_toggle}"
 
     if state[checkbox_key] and chain_id_to_toggle not in state.highlight_selection: #If the checkbox is now checked and if the chain is not already in the selection, add it.
-            # Select the entire range of residues for the chain (1-based indexing).
-            state.highlight_selection[chain_id_to_toggle] = list(range(state.current_pdb_chains_data[chain_id_to_toggle]["start"], state.current_pdb_chains_data[chain_id_to_toggle]["end"] + 1))
+            # Pre-fill the selection with the residues around the binding interface if the chain is a binder chain.
+            suggested_range: tuple[str, str] | None = None
+            if chain_id_to_toggle not in state.antigen_chains:
+                suggested_range = suggest_residue_range(state.interface_residues, state.current_pdb_chains_data, chain_id_to_toggle, state.antigen_chains or None)
+
+            if suggested_range:
+                # Resolve the suggested residue numbers to positions in the chain's sequence.
+                state.highlight_selection[chain_id_to_toggle] = resolve_selection(state.current_pdb_chains_data[chain_id_to_toggle], *suggested_range)
+            else:
+                # Select the entire sequence of the chain.
+                state.highlight_selection[chain_id_to_toggle] = (0, len(state.current_pdb_chains_data[chain_id_to_toggle]["sequence"]))
     elif chain_id_to_toggle in state.highlight_selection: # If the checkbox is now unchecked and if the chain is in the selection, remove it.
         del state.highlight_selection[chain_id_to_toggle]
 
@@ -547,12 +573,16 @@ def update_chain_highlight_selection_residues(chain_id_to_change: str, current_p
 
     # Only update if the chain is currently selected (i.e., exists in highlight_selection).
     if chain_id_to_change in state.highlight_selection.keys():
-        # Parse the 'start:end' string from the text input.
+        # Parse the 'start:end' string from the text input, residue numbers may carry insertion codes (e.g. '52A').
+        if state[input_key].count(":") != 1:
+            return
         select_from_str: str
         select_to_str: str
         select_from_str, select_to_str = state[input_key].split(":")
-        # Update the highlight selection with the new range of residues.
-        state.highlight_selection[chain_id_to_change] = list(range(int(select_from_str), int(select_to_str) + 1))
+        # Update the highlight selection with the positions of the residues in the chain's sequence, invalid ranges keep the previous selection.
+        positions: tuple[int, int] | None = resolve_selection(state.current_pdb_chains_data[chain_id_to_change], select_from_str, select_to_str)
+        if positions:
+            state.highlight_selection[chain_id_to_change] = positions
 
 
 def update_split_protease_value() -> None:
@@ -601,6 +631,8 @@ def generate_download() -> None:
             record_name: str = "_".join(construct[0].replace(">", "").split(" ")[1:]).strip()
             record_sequence: str = ""
             record_features: list[SeqFeature] = []
+            # The amino acid sequences of the parts, which are optimized separately when using sequence optimization.
+            record_parts: list[str] = []
 
             # Process each part of the construct (sequence, annotated part, etc.).
             for part in construct[1:]:
@@ -618,36 +650,48 @@ def generate_download() -> None:
                                                           type="CDS", # Coding Sequence type
                                                           qualifiers=qualifiers)) # Store name and amino acid translation.
                         record_sequence += part[0] # Append amino acid sequence.
+                        record_parts.append(part[0])
 
                 else: # Handle non-annotated string parts (e.g., linkers not specifically annotated).
                     if len(part) > 0: # Ensure the string part is not empty.
                         record_sequence += part # Append amino acid sequence.
+                        record_parts.append(part)
 
             # Define a clean file name for the GenBank file.
             file_name: str = f"{key.replace(' ', '_').replace(':', '').replace('-', '_').replace('/', '_')}.gb"
 
             if state.sequence_optimization_toggle:
-                # Perform sequence optimization using dnachisel.
-                # Reverse translate the amino acid sequence to DNA.
-                sequence = dnachisel.reverse_translate(record_sequence)
-                # Define constraints: avoid specified restriction sites and enforce translation.
-                cons = [dnachisel.AvoidPattern(pat+"_site") for pat in state.optimization_settings["restriction_enzymes"]]
-                cons.append(dnachisel.EnforceTranslation())
-                # Create a DNA optimization problem.
-                problem = dnachisel.DnaOptimizationProblem(sequence = sequence, constraints = cons, objectives = [dnachisel.CodonOptimize(species=state.optimization_settings["species"], method="match_codon_usage")])
-                # Resolve constraints and optimize the DNA sequence.
-                problem.resolve_constraints(final_check = True)
-                problem.optimize()
-                # Get the optimized sequence as a SeqRecord.
-                recordseq: SeqRecord = problem.to_record()
-
-                # Create the final SeqRecord for GenBank output.
-                record: SeqRecord = SeqRecord(recordseq.seq, # Use the optimized DNA sequence.
-                                   id=record_name,
-                                   name=record_name,
-                                   description=record_name,
-                                   features=record_features,
-                                   annotations={"molecule_type": "DNA"}) # Specify molecule type as DNA.
+                species: str = state.optimization_settings["species"]
+                enzymes: list[str] = sorted(set(state.optimization_settings["restriction_enzymes"]))
+
+                def render_dna_record() -> str:
+                    # Assemble the DNA from the cached optimized DNA of the parts (see util.dna_optimization), avoiding the specified
+                    # restriction sites. Only new parts (e.g., the binder) and the junctions between parts are optimized with dnachisel.
+                    optimized_sequence: str = optimize_construct(record_parts, species=species, enzymes=enzymes)
+
+                    # Create the final SeqRecord for GenBank output.
+                    record: SeqRecord = SeqRecord(Seq(optimized_sequence), # Use the optimized DNA sequence.
+                                       id=record_name,
+                                       name=record_name,
+                                       description=record_name,
+                                       features=record_features,
+                                       annotations={"molecule_type": "DNA"}) # Specify molecule type as DNA.
+
+                    # Write the GenBank record to a temporary string buffer.
+                    tmp_file: io.StringIO = io.StringIO()
+                    SeqIO.write(record, tmp_file, "genbank")
+                    return tmp_file.getvalue()
+
+                # The construct is fingerprinted by its parts and their annotations, which determine the record apart from its name.
+                fingerprint: str = sha256(json.dumps([list(part[:2]) if isinstance(part, tuple) else part for part in construct[1:] if part],
+                                                     separators=(",", ":")).encode()).hexdigest()
+                # Retrieve the record from the artifact store if the construct was exported with the same settings before, so dnachisel does not run again.
+                # The record name is part of the key, as it is written into the LOCUS, DEFINITION, ACCESSION and VERSION lines and its length decides
+                # how Biopython lays out the LOCUS line, so a stored record cannot be renamed by patching it. Renaming a construct only stores
+                # another small record, the optimized DNA itself is still taken from the cache of util.dna_optimization.
+                artifact_key: str = ArtifactStore.key(fingerprint, "dna_genbank", record_name, species, *enzymes)
+                # Add the GenBank file to the ZIP archive.
+                zf.writestr(file_name, get_artifact_store().get_or_render(artifact_key, render_dna_record))
 
             else:
                 # Create the final SeqRecord for GenBank output.
@@ -658,11 +702,11 @@ def generate_download() -> None:
                                               features=record_features,
                                               annotations={"molecule_type": "PROTEIN"}) # Specify molecule type as protein.
 
-            # Write the GenBank record to a temporary string buffer.
-            tmp_file: io.StringIO = io.StringIO()
-            SeqIO.write(record, tmp_file, "genbank")
-            # Add the GenBank file to the ZIP archive.
-            zf.writestr(file_name, tmp_file.getvalue())
+                # Write the GenBank record to a temporary string buffer.
+                tmp_file: io.StringIO = io.StringIO()
+                SeqIO.write(record, tmp_file, "genbank")
+                # Add the GenBank file to the ZIP archive.
+                zf.writestr(file_name, tmp_file.getvalue())
 
         # Add the selected PDB structure to the ZIP file if chosen by the user.
         if state.download_sel_pdb and state.pdbs and state.pdb_selection:
@@ -816,8 +860,8 @@ def change_theme() -> None:
         state.themes["current_theme"] = "dark"
 
 
-# cache version of get_pdb_from_rcsb
-@st.cache_data(show_spinner="Fetching Structure from RCSB PDB...")
+# cache version of get_pdb_from_rcsb, without spinner as it is also called by the background threads of the structure prefetcher
+@st.cache_data(show_spinner=False)
 def get_cached_pdb_from_rcsb(pdb_id: str) -> str | None:
     """
     This function is simply a wrapper around the get_pdb_from_rcsb function which provides streamlit caching
@@ -827,6 +871,116 @@ def get_cached_pdb_from_rcsb(pdb_id: str) -> str | None:
     return get_pdb_from_rcsb(pdb_id)
 
 
+# a single structure prefetcher shared by all sessions, so its threads and buffered structures do not grow with the number of users
+@st.cache_resource
+def get_structure_prefetcher() -> StructurePrefetcher:
+    """
+    Creates the StructurePrefetcher downloading the structures of the top search results in the background. Prefetched structures are stored
+    in the cache of get_cached_pdb_from_rcsb.
+    :return: the shared StructurePrefetcher
+    """
+    return StructurePrefetcher(fetch_structure=get_cached_pdb_from_rcsb)
+
+
+# a single artifact store shared by all sessions and kept across restarts, so optimized constructs are only rendered once
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """
+    Creates the ArtifactStore the GenBank records of sequence optimized constructs are stored in.
+    :return: the shared ArtifactStore
+    """
+    return ArtifactStore(DATA_DIR / "artifacts")
+
+
+# cache interface detection per structure, the pdb content is excluded from hashing as it is determined by the pdb id
+@st.cache_data(show_spinner="Detecting Binding Interface...")
+def get_cached_interface_residues(pdb_id: str, _pdb_content: str) -> dict[str, dict[str, dict[str, list[str]]]]:
+    """
+    This function is simply a wrapper around the find_interface_residues function which provides streamlit caching
+    :param pdb_id: the pdb id of the structure, used as cache key
+    :param _pdb_content: the pdb file's content
+    :return: the contacting residues and suggested residue ranges of every chain pair
+    """
+    return find_interface_residues(_pdb_content) if _pdb_content else {}
+
+
+# cache terminus coordinates per structure and selection, the pdb content is excluded from hashing as it is determined by the pdb id
+@st.cache_data(show_spinner=False)
+def get_cached_terminus_coordinates(pdb_id: str, segments: tuple[tuple[str, str, str], ...], _pdb_content: str) -> dict[str, np.ndarray]:
+    """
+    This function is simply a wrapper around the get_terminus_coordinates function which provides streamlit caching
+    :param pdb_id: the pdb id of the structure, used as cache key
+    :param segments: (chain id, first residue number, last residue number) of every selected segment
+    :param _pdb_content: the pdb file's content
+    :return: the N- and C-terminal C-alpha coordinates of every segment
+    """
+    return get_terminus_coordinates(_pdb_content, {chain_id: (first, last) for chain_id, first, last in segments}) if _pdb_content else {}
+
+
+# cache trimmed structures per structure, chains and level of detail, the pdb content is excluded from hashing as it is determined by the pdb id
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_cached_viewer_structure(pdb_id: str, chains: tuple[str, ...] | None, level_of_detail: str, _pdb_content: str) -> str:
+    """
+    This function is simply a wrapper around the trim_structure function which provides streamlit caching
+    :param pdb_id: the pdb id of the structure, used as cache key
+    :param chains: the chain ids to keep or None to keep all chains
+    :param level_of_detail: the level of detail of the trimmed structure
+    :param _pdb_content: the pdb file's content
+    :return: the trimmed pdb file's content
+    """
+    return trim_structure(_pdb_content, list(chains) if chains is not None else None, level_of_detail) if _pdb_content else ""
+
+
+# cache the viewer html per structure, display style, selection and width, so reruns which do not change the view reuse it
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_cached_viewer_html(pdb_id: str, display_style: str, selection: tuple[tuple[str, tuple[tuple[int, int], ...]], ...], width: int, level_of_detail: str,
+                           chains: tuple[str, ...] | None, background_color: str, _pdb_content: str) -> str:
+    """
+    Builds the py3Dmol viewer of a structure with highlighted residue ranges and returns its html. Every contiguous range is styled with a single call.
+    :param pdb_id: the pdb id of the structure, used as cache key
+    :param display_style: the py3Dmol style of the model (e.g. 'cartoon')
+    :param selection: (chain id, ((first, last), ...)) residue number ranges to highlight per chain
+    :param width: the page width
+    :param level_of_detail: the level of detail of the displayed structure
+    :param chains: the chain ids to display or None to display all chains
+    :param background_color: the background color of the viewer
+    :param _pdb_content: the pdb file's content
+    :return: the html of the viewer
+    """
+    # Create a py3Dmol viewer instance with a dynamic width and fixed height.
+    view = py3Dmol.view(width=width*.66, height=500)
+    # Set the background color of the viewer based on the current theme.
+    view.setBackgroundColor(background_color)
+
+    # Add the trimmed protein model to the viewer with the selected display style. Residue numbering is unchanged, so highlights still apply.
+    add_model(view, xyz=get_cached_viewer_structure(pdb_id, chains, level_of_detail, _pdb_content), model_style=display_style)
+
+    # Apply specific styling to the highlighted (selected) residue ranges.
+    # CHAIN_COLORS provides colors per chain for highlighting.
+    for chain_id, ranges in selection:
+        for first, last in ranges:
+            # 3Dmol range strings cannot express negative residue numbers, these ranges are passed as lists instead.
+            view.setStyle({"chain": chain_id, "resi": f"{first}-{last}" if first >= 0 else list(range(first, last + 1))}, {display_style: {
+                          "color": CHAIN_COLORS[chain_id], "arrows": True}})
+
+    # Add hover functionality to display residue information (chain, residue type, residue number).
+    view.setHoverable({}, True,"""
+        function(atom,viewer,event,container) {
+            if(!atom.label) {
+                atom.label = viewer.addLabel(`Chain ${atom.chain}:${atom.resn}:${atom.resi}`,{position: atom, backgroundColor: 'mintcream', fontColor:'black'});
+            }
+        }""","""
+        function(atom,viewer) {
+            if(atom.label) {
+                viewer.removeLabel(atom.label);
+                delete atom.label;
+            }
+        }""")
+    view.zoomTo() # Zoom the view to fit the entire model.
+
+    return view._make_html()
+
+
 # update scroll navigation
 @st.cache_data(show_spinner=False)
 def update_scroll_navigation(transmembrane_design: bool, split_design: bool, protease_release_design: bool, cargo_release_design: bool, valine_design: bool, custom_icd: bool) -> tuple[dict[str, str], list[str]]:
@@ -936,8 +1090,24 @@ if not custom_binder:
         search_button: bool = st.button("", key="search_button",
                                   icon=":material/search:", width=45)
 
-    # Perform search if the search button is clicked or if the search query has changed.
-    if search_button or (search_field and state.prev_search != search_field):
+    # Allow the user to hide redundant entries (the same antibody solved multiple times).
+    filter_structures: bool = st.toggle(
+        "Remove Redundant Structures",
+        value=False,
+        key="filter_structures_toggle",
+        help="Cluster search results by heavy and light chain sequence identity and only show the best resolved structure of each cluster"
+    )
+
+    # Optionally download the structures of the top results in the background, so selecting them does not block.
+    prefetch_structures: bool = st.toggle(
+        "Prefetch Top Results",
+        value=True,
+        key="prefetch_structures_toggle",
+        help=f"Download the structures of the top {PREFETCH_COUNT} search results in the background as soon as results appear"
+    )
+
+    # Perform search if the search button is clicked or if the search query or filter setting has changed.
+    if search_button or (search_field and (state.prev_search != search_field or state.prev_filter_structures != filter_structures)):
         is_valid, error_msg = validate_search_query(search_field)
 
         if not is_valid:
@@ -945,8 +1115,15 @@ if not custom_binder:
         else:
             # Display a spinner while searching and call the antibody search function.
             with st.spinner(f"Searching for: **{search_field}**"):
-                state.sabdab, state.skempi, state.pdbs, state.search_duration = search_antibodies(search_field)
+                state.sabdab, state.skempi, state.pdbs, state.search_duration = search_antibodies(search_field, filter_structures)
                 state.prev_search = search_field # Update previous search to track changes.
+                state.prev_filter_structures = filter_structures # Update previous filter setting to track changes.
+
+            # Start prefetching the top results of the new search, cancelling the pending structures of this session's previous search.
+            if prefetch_structures and state.sabdab is not None:
+                get_structure_prefetcher().prefetch(state.sabdab["pdb"].head(PREFETCH_COUNT).tolist(), state.search_token)
+            else:
+                get_structure_prefetcher().prefetch([], state.search_token)
 
 # Display search results if available and custom binder is not active.
 if state.sabdab is not None and not state.custom_binder_toggle:
@@ -1008,8 +1185,13 @@ if state.sabdab is not None and not state.custom_binder_toggle:
         try:
             # Get the PDB ID from the selected row in the dataframe.
             state.pdb_selection = state.sabdab.iloc[selection["selection"]["rows"]]["pdb"].to_numpy()[0]
-            # Retrieve the PDB file content from RCSB PDB.
-            state.current_pdb = get_cached_pdb_from_rcsb(state.pdb_selection)
+            # Remember the antigen chains of the selected structure (e.g. 'A | B') to suggest binder residues contacting them.
+            antigen_chain = state.sabdab.iloc[selection["selection"]["rows"]]["antigen_chain"].to_numpy()[0]
+            state.antigen_chains = [chain_id.strip() for chain_id in antigen_chain.split("|")] if isinstance(antigen_chain, str) else []
+            # Retrieve the PDB file content from the prefetched structures if available, otherwise from RCSB PDB.
+            with st.spinner("Fetching Structure from RCSB PDB..."):
+                prefetched_structure: tuple[str | None, dict | None] | None = get_structure_prefetcher().get(state.pdb_selection, timeout=PREFETCH_TIMEOUT)
+                state.current_pdb = prefetched_structure[0] if prefetched_structure and prefetched_structure[0] else get_cached_pdb_from_rcsb(state.pdb_selection)
         except:
             # Handle cases where no row is selected or an error occurs.
             state["pdb_selection"] = 0
@@ -1036,8 +1218,11 @@ if state.pdbs and state.pdb_selection and not state.custom_binder_toggle:
         prev_pdb_selection = None # Temporary variable to store previous PDB selection.
         # Re-extract chains and reset selection if the PDB selection changes.
         if  state.pdb_selection:
-            # Extract detailed chain data (sequences, IDs) from the current PDB.
-            state.current_pdb_chains_data = extract_chains_from_pdb(file_content=state.current_pdb)
+            # Retrieve detailed chain data (sequences, IDs) of the current PDB from the prefetched structures or the chain database, extract it from the structure if not available.
+            prefetched_structure: tuple[str | None, dict | None] | None = get_structure_prefetcher().get(state.pdb_selection, timeout=PREFETCH_TIMEOUT)
+            state.current_pdb_chains_data = (prefetched_structure[1] if prefetched_structure else None) or get_local_chains(state.pdb_selection) or extract_chains_from_pdb(file_content=state.current_pdb)
+            # Detect the binding interface to pre-fill residue selections of binder chains.
+            state.interface_residues = get_cached_interface_residues(state.pdb_selection, state.current_pdb)
 
             # Generate colors for each chain for visualization.
             state.chain_colors = {}
@@ -1073,8 +1258,8 @@ if state.pdbs and state.pdb_selection and not state.custom_binder_toggle:
                     st.text_input(
                         f"Residues in Chain {chain_id}",
                         key=f"{state.pdb_selection}_residue_input_chain_{chain_id}",
-                        # Set initial value to the full range of currently selected residues.
-                        value=f"{state.highlight_selection[chain_id][0]}:{state.highlight_selection[chain_id][-1]}",
+                        # Set initial value to the residue numbers of the first and last currently selected residue.
+                        value=f"{state.current_pdb_chains_data[chain_id]['residue_numbers'][state.highlight_selection[chain_id][0]]}:{state.current_pdb_chains_data[chain_id]['residue_numbers'][state.highlight_selection[chain_id][1] - 1]}",
                         on_change=update_chain_highlight_selection_residues, # Callback function on change.
                         args=(chain_id, state.pdb_selection), # Arguments for the callback.
                         label_visibility="collapsed" # Hide the default label for a cleaner UI.
@@ -1090,45 +1275,33 @@ if state.pdbs and state.pdb_selection and not state.custom_binder_toggle:
             label_visibility="collapsed"
         )
 
+        # Level of detail of the displayed structure, large complexes are automatically reduced to a C-alpha trace.
+        level_of_detail = st.radio(
+            label="Level of Detail",
+            options=LEVELS_OF_DETAIL,
+            index=LEVELS_OF_DETAIL.index("auto"),
+            format_func=lambda option: option.capitalize(),
+            help="'Trace' only displays C-alpha atoms, 'Auto' does so for very large structures. Hydrogens and waters are never displayed."
+        )
+        # Optionally only display the selected chains.
+        selected_chains_only: bool = st.checkbox("Selected Chains Only", value=False, disabled=(len(state.highlight_selection) == 0))
+
         # link to rcsb for more information
         st.info(f"View on [RCSB PDB](https://www.rcsb.org/structure/{state.pdb_selection})")
 
     with pdb_cols[1]:
-        # Display selected residues using py3Dmol visualization library.
-        # Create a py3Dmol viewer instance with a dynamic width and fixed height.
-        view = py3Dmol.view(width=page_width*.66, height=500)
-        # Set the background color of the viewer based on the current theme.
-        view.setBackgroundColor(state.themes[state.themes["current_theme"]]["theme.backgroundColor"])
-
-        # Add the protein model to the viewer with the selected display style.
-        add_model(view, xyz=state.current_pdb, model_style=display_style)
-
-        # Apply specific styling to the highlighted (selected) residues.
-        for chain_id in state.highlight_selection.keys():
-            for residue_index in state.highlight_selection[chain_id]:
-                # Style selected residues with a specific color and arrows.
-                # CHAIN_COLORS provides colors per chain for highlighting.
-                view.setStyle({"chain": chain_id, "resi": residue_index}, {display_style: {
-                              "color": CHAIN_COLORS[chain_id], "arrows": True}})
-
-        # Add hover functionality to display residue information (chain, residue type, residue number).
-        view.setHoverable({}, True,"""
-            function(atom,viewer,event,container) {
-                if(!atom.label) {
-                    atom.label = viewer.addLabel(`Chain ${atom.chain}:${atom.resn}:${atom.resi}`,{position: atom, backgroundColor: 'mintcream', fontColor:'black'});
-                }
-            }""","""
-            function(atom,viewer) {
-                if(atom.label) {
-                    viewer.removeLabel(atom.label);
-                    delete atom.label;
-                }
-            }""")
-        view.zoomTo() # Zoom the view to fit the entire model.
-
-        # Render the py3Dmol viewer in a Streamlit container.
+        # Collapse the highlighted residues of every chain into contiguous ranges, which are styled with a single call each.
+        viewer_selection: tuple[tuple[str, tuple[tuple[int, int], ...]], ...] = tuple(
+            (chain_id, tuple(get_residue_ranges(state.current_pdb_chains_data[chain_id]["residue_numbers"][start:end])))
+            for chain_id, (start, end) in sorted(state.highlight_selection.items()))
+        # Only display the selected chains if requested.
+        viewer_chains: tuple[str, ...] | None = tuple(sorted(state.highlight_selection.keys())) if selected_chains_only and state.highlight_selection else None
+
+        # Render the cached py3Dmol viewer in a Streamlit container.
         with st.container(border=True, gap="small"):
-            showmol(view, height=500, width=page_width)
+            components.html(get_cached_viewer_html(state.pdb_selection, display_style, viewer_selection, page_width, level_of_detail, viewer_chains,
+                                                   state.themes[state.themes["current_theme"]]["theme.backgroundColor"], state.current_pdb),
+                            height=500, width=page_width)
 
     # Show current FASTA selection to the user if any chains/residues are highlighted.
     if len(state.highlight_selection) != 0:
@@ -1142,10 +1315,10 @@ if state.pdbs and state.pdb_selection and not state.custom_binder_toggle:
 
         # Iterate through PDB entries and add selected chains/residues to the FASTA string.
         for chain_id in state.highlight_selection.keys():
-            selection = state.highlight_selection[chain_id]
+            start, end = state.highlight_selection[chain_id]
             fasta += f">{chain_id}\n"
-            # Extract the sequence slice based on selected residues (1-based to 0-based conversion).
-            fasta += f"{state.current_pdb_chains_data[chain_id]['sequence'][selection[0] - state.current_pdb_chains_data[chain_id]['start']:selection[-1] - state.current_pdb_chains_data[chain_id]["start"] + 1]}\n"
+            # Extract the sequence slice based on the selected positions.
+            fasta += f"{state.current_pdb_chains_data[chain_id]['sequence'][start:end]}\n"
 
             items[2]["items"].append(chain_id) # Add the chain to the 'Components' list for sorting.
 
@@ -1173,25 +1346,30 @@ if state.pdbs and state.pdb_selection and not state.custom_binder_toggle:
         # Reset chain sequences before re-building them.
         state.chain_sequences = {"Chain A": "", "Chain B": ""}
 
-        # Assemble the sequence for "Chain A" based on user's sorted selection.
-        for i, chain_id in enumerate(sorted_chains[0]["items"]):
-            selection = state.highlight_selection[chain_id]
-            # Append the selected chain's sequence segment to Chain A.
-            state.chain_sequences["Chain A"] += state.current_pdb_chains_data[chain_id]["sequence"][selection[0] - state.current_pdb_chains_data[chain_id]["start"]:selection[-1] - state.current_pdb_chains_data[chain_id]["start"] + 1]
-
-            # Add a linker sequence between chains, except after the last one.
-            if i < len(sorted_chains[0]["items"]) - 1:
-                state.chain_sequences["Chain A"] += ("GGGGS" * 3) # A common flexible linker.
-
-        # Assemble the sequence for "Chain B" based on user's sorted selection.
-        for i, chain_id in enumerate(sorted_chains[1]["items"]):
-            selection = state.highlight_selection[chain_id]
-            # Append the selected chain's sequence segment to Chain B.
-            state.chain_sequences["Chain B"] += state.current_pdb_chains_data[chain_id]["sequence"][selection[0] - state.current_pdb_chains_data[chain_id]["start"]:selection[-1] - state.current_pdb_chains_data[chain_id]["start"] + 1]
-
-            # Add a linker sequence between chains, except after the last one.
-            if i < len(sorted_chains[1]["items"]) - 1:
-                state.chain_sequences["Chain B"] += ("GGGGS" * 5) # A common flexible linker.
+        # Measure the distances between the termini of the selected segments to choose linker lengths which span them.
+        termini: dict[str, np.ndarray] = get_cached_terminus_coordinates(state.pdb_selection, tuple((chain_id, state.current_pdb_chains_data[chain_id]["residue_numbers"][start], state.current_pdb_chains_data[chain_id]["residue_numbers"][end - 1]) for chain_id, (start, end) in state.highlight_selection.items()), state.current_pdb)
+
+        # Assemble the sequences for "Chain A" and "Chain B" based on user's sorted selection.
+        for mesa_chain, sorted_container, default_repeats in (("Chain A", sorted_chains[0], 3), ("Chain B", sorted_chains[1], 5)):
+            for i, chain_id in enumerate(sorted_container["items"]):
+                start, end = state.highlight_selection[chain_id]
+                # Append the selected chain's sequence segment to the MESA chain.
+                state.chain_sequences[mesa_chain] += state.current_pdb_chains_data[chain_id]["sequence"][start:end]
+
+                # Add a flexible linker between chains, except after the last one. Its length spans the distance from this segment's C-terminus
+                # to the next segment's N-terminus, or falls back to a common default if the termini are not resolved.
+                if i < len(sorted_container["items"]) - 1:
+                    next_chain_id: str = sorted_container["items"][i + 1]
+                    linker_repeats: int = default_repeats
+                    if chain_id in termini and next_chain_id in termini:
+                        linker_repeats = int(calculate_linker_repeats(np.linalg.norm(termini[chain_id][1] - termini[next_chain_id][0])))
+                    state.chain_sequences[mesa_chain] += ("GGGGS" * linker_repeats)
+
+            # Point out a different order of the chains if it allows shorter linkers.
+            if 1 < len(sorted_container["items"]) <= MAX_ORDER_SEGMENTS and all(chain_id in termini for chain_id in sorted_container["items"]):
+                suggested_order: dict[str, list[str] | list[float] | list[int]] = suggest_chain_order(termini, sorted_container["items"])
+                if suggested_order["order"] != sorted_container["items"]:
+                    st.info(f"{mesa_chain}: linking in the order {' → '.join(suggested_order['order'])} requires the shortest linkers ({' + '.join(f'{repeats}x GGGGS' for repeats in suggested_order['repeats'])}).")
 
 # This section is activated if the "Custom Binder" toggle is enabled.
 elif state.custom_binder_toggle:
@@ -1241,6 +1419,24 @@ elif state.custom_binder_toggle:
     if len(chain_b_text_input) > 0:
         state.pdb_fasta += f"> Chain B\n{chain_b_text_input}\n"
 
+    # Search the local structures for antibodies similar to the custom binder chains.
+    if state.chain_sequences["Chain A"] or state.chain_sequences["Chain B"]:
+        if st.button("Find Similar Structures", key="sequence_search_button", help="Search the local antibody structures for chains similar to the entered sequences"):
+            with st.spinner("Searching for similar structures..."):
+                state.sequence_search_results = {chain_id: search_sequence(sequence, top_n=10) for chain_id, sequence in state.chain_sequences.items() if sequence}
+
+        if "sequence_search_results" in state:
+            for chain_id, results in state.sequence_search_results.items():
+                st.markdown(f"##### Structures similar to {chain_id}")
+                if results["hits"]:
+                    st.caption(f"{len(results['hits'])} hits, search took {round(results['search_duration'] * 1000, 1)} ms")
+                    st.dataframe(results["hits"], hide_index=True, column_config={
+                        "identity": st.column_config.ProgressColumn(format="%.2f", min_value=0.0, max_value=1.0),
+                        "pdb": st.column_config.TextColumn("PDB"),
+                    })
+                else:
+                    st.info("No similar chains found in the local structures.")
+
 ### Build linker between Binder and TMD ################################################################################
 # This section is enabled if either Chain A or Chain B has a sequence (either from PDB or custom).
 if len(state.chain_sequences["Chain A"]) > 0 or len(state.chain_sequences["Chain B"]) > 0:
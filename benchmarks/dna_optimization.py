@@ -0,0 +1,65 @@
+from pathlib import Path
+import random
+import sys
+import time
+
+# Add the parent directory of the current file to sys.path
+# This allows for importing modules from the 'util' package.
+current_dir = Path(__file__).resolve().parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+from util import SIGNAL_SEQS, TMD_DATA, PRS_DATA, TEVP_DATA, TAG_SEQS
+from util.dna_optimization import optimize_construct, optimize_sequence, optimize_block
+
+# Defines the number of exported constructs, each with a different binder.
+CONSTRUCT_COUNT: int = 5
+# Defines the length of the binders in amino acids.
+BINDER_LENGTH: int = 120
+SPECIES: str = "h_sapiens"
+ENZYMES: list[str] = ["BsaI", "BsmBI", "EcoRI"]
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def generate_construct(seed: int) -> list[str]:
+    """
+    Generates the parts of a typical MESA chain with a random binder, in the same order as the app.
+    :param seed: The seed of the binder.
+    :return: The amino acid sequences of the parts.
+    """
+    binder: str = "".join(random.Random(seed).choices(AMINO_ACIDS, k=BINDER_LENGTH))
+    signal: str = next(iter(SIGNAL_SEQS.values()))[1]
+    tag: str = next(iter(TAG_SEQS.values()))[1]
+    tmd: str = next(iter(TMD_DATA.values()))[1]
+    prs: str = next(iter(PRS_DATA.values()))[1]
+    protease: str = next(iter(TEVP_DATA.values()))[1]
+
+    return [signal, "M", binder, "GGGSGGGS", tag, "GGGSGGGS", tmd, "GGGSGGGS", prs, "GGGSGGGS", protease, "*"]
+
+
+def measure(label: str, function, constructs: list[list[str]]) -> None:
+    """
+    Optimizes all constructs and prints the time per construct.
+    :param label: The label to print.
+    :param function: The function taking the parts of a construct.
+    :param constructs: The constructs.
+    :return: None
+    """
+    start: float = time.perf_counter()
+    for parts in constructs:
+        function(parts)
+    duration: float = time.perf_counter() - start
+    print(f"{label:<35s} {duration / len(constructs) * 1000:10.1f} ms/construct")
+
+
+# Can be run from the project directory: python benchmarks/dna_optimization.py
+if __name__ == "__main__":
+    constructs: list[list[str]] = [generate_construct(seed) for seed in range(CONSTRUCT_COUNT)]
+    print(f"Optimizing {CONSTRUCT_COUNT} constructs with {BINDER_LENGTH} aa binders for {SPECIES}, avoiding {', '.join(ENZYMES)}")
+
+    measure("whole construct", lambda parts: optimize_sequence("".join(parts), SPECIES, tuple(ENZYMES)), constructs)
+    # the first export optimizes the catalogue parts once, later exports only optimize their binder and the junctions
+    measure("parts, empty cache (first construct)", lambda parts: optimize_construct(parts, SPECIES, ENZYMES), constructs[:1])
+    measure("parts, new binders", lambda parts: optimize_construct(parts, SPECIES, ENZYMES), constructs[1:])
+    measure("parts, repeated export", lambda parts: optimize_construct(parts, SPECIES, ENZYMES), constructs)
+    print(f"cached blocks: {optimize_block.cache_info().currsize}")
@@ -0,0 +1,105 @@
+from pathlib import Path
+import math
+import sys
+import time
+import py3Dmol
+
+# Add the parent directory of the current file to sys.path
+# This allows for importing modules from the 'util' package.
+current_dir = Path(__file__).resolve().parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+from util import CHAIN_COLORS
+from util.pdb_interaction import get_residue_ranges, trim_structure
+
+# Defines the number of highlighted residues, split over two chains.
+RESIDUE_COUNT: int = 2000
+REPETITIONS: int = 20
+
+
+def generate_structure(residue_count: int) -> tuple[str, dict[str, list[str]]]:
+    """
+    Generates a helical poly-alanine structure with two chains, a numbering gap and an insertion code.
+    :param residue_count: The total number of residues.
+    :return: The structure in pdb format and the residue numbers of every chain.
+    """
+    lines: list[str] = []
+    residue_numbers: dict[str, list[str]] = {"A": [], "B": []}
+    serial: int = 1
+    for chain_id, count in (("A", residue_count // 2), ("B", residue_count - residue_count // 2)):
+        number: int = 1
+        for i in range(count):
+            # introduce a numbering gap and an insertion code, as common in antibody structures
+            insertion: str = "A" if number == 52 and residue_numbers[chain_id][-1:] == ["52"] else ""
+            if number == 100 and not insertion:
+                number = 110
+            residue_numbers[chain_id].append(f"{number}{insertion}")
+            x, y, z = 2.3 * math.cos(i * 1.7), 2.3 * math.sin(i * 1.7), 1.5 * i + (0 if chain_id == "A" else 30)
+            for atom_name, element, offset in (("N", "N", -0.5), ("CA", "C", 0.0), ("C", "C", 0.5), ("O", "O", 0.9), ("CB", "C", 0.3)):
+                lines.append(f"ATOM  {serial:5d}  {atom_name:<3s} ALA {chain_id}{number:4d}{insertion:1s}   {x + offset:8.3f}{y + offset:8.3f}{z:8.3f}  1.00 20.00          {element:>2s}  ")
+                serial += 1
+            if not (number == 52 and not insertion):
+                number += 1
+        lines.append("TER")
+    lines.append("END")
+
+    return "\n".join(lines), residue_numbers
+
+
+def build_view(pdb_content: str, selection: dict[str, list[tuple[int, int]] | list[int]], per_residue: bool) -> str:
+    """
+    Builds a py3Dmol viewer with highlighted residues in the same way as the app and returns its html.
+    :param pdb_content: The structure in pdb format.
+    :param selection: Residue numbers (per_residue) or residue ranges to highlight per chain.
+    :param per_residue: Whether to issue one style call per residue instead of one per range.
+    :return: The html of the viewer.
+    """
+    view = py3Dmol.view(width=800, height=500)
+    view.addModel(pdb_content, "pdb")
+    view.setStyle({"model": -1}, {"cartoon": {}})
+    for chain_id, residues in selection.items():
+        for residue in residues:
+            view.setStyle({"chain": chain_id, "resi": residue if per_residue else f"{residue[0]}-{residue[1]}"},
+                          {"cartoon": {"color": CHAIN_COLORS[chain_id], "arrows": True}})
+    view.zoomTo()
+
+    return view._make_html()
+
+
+def benchmark(label: str, function, *args) -> str:
+    """
+    Runs a function repeatedly and prints its mean duration.
+    :param label: The label to print.
+    :param function: The function to benchmark.
+    :param args: The arguments of the function.
+    :return: The result of the last run.
+    """
+    start: float = time.perf_counter()
+    for _ in range(REPETITIONS):
+        result = function(*args)
+    print(f"{label:<45s} {(time.perf_counter() - start) / REPETITIONS * 1000:9.3f} ms")
+
+    return result
+
+
+# Can be run from the project root to benchmark the viewer rendering: python benchmarks/viewer_rendering.py
+if __name__ == "__main__":
+    pdb_content, residue_numbers = generate_structure(RESIDUE_COUNT)
+    print(f"Highlighting {sum(len(numbers) for numbers in residue_numbers.values())} residues in {len(residue_numbers)} chains")
+
+    # per residue styling as previously done in the app
+    per_residue_selection: dict[str, list[int]] = {chain_id: [int(number.rstrip("A")) for number in numbers] for chain_id, numbers in residue_numbers.items()}
+    per_residue_html: str = benchmark("per-residue style calls", build_view, pdb_content, per_residue_selection, True)
+
+    # range based styling
+    range_selection: dict[str, list[tuple[int, int]]] = benchmark("collapse selection into ranges", lambda: {chain_id: get_residue_ranges(numbers) for chain_id, numbers in residue_numbers.items()})
+    range_html: str = benchmark("range style calls", build_view, pdb_content, range_selection, False)
+    trimmed_html: str = benchmark("range style calls on trimmed trace", build_view, trim_structure(pdb_content, level_of_detail="trace"), range_selection, False)
+
+    # cached reruns only look up the html
+    cache: dict[tuple, str] = {("bench", "cartoon", tuple((chain_id, tuple(ranges)) for chain_id, ranges in range_selection.items()), 800): range_html}
+    benchmark("cached rerun (lookup)", lambda: cache[("bench", "cartoon", tuple((chain_id, tuple(ranges)) for chain_id, ranges in range_selection.items()), 800)])
+
+    print(f"style calls: {sum(len(residues) for residues in per_residue_selection.values())} per-residue vs. {sum(len(ranges) for ranges in range_selection.values())} ranges")
+    print(f"html size: {len(per_residue_html) / 1000:.1f} kB per-residue vs. {len(range_html) / 1000:.1f} kB ranges vs. {len(trimmed_html) / 1000:.1f} kB trimmed trace")
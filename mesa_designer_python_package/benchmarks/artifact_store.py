@@ -0,0 +1,47 @@
+import tempfile
+import time
+from typing import List
+
+from chain_assembly import generate_chains
+from mesa_designer.mesa import MesaChain
+from mesa_designer.store import ArtifactStore
+
+# Defines the number of chains.
+CHAIN_COUNT: int = 10000
+
+
+def measure(label: str, function, chains: List[MesaChain]) -> list:
+    """
+    Applies a function to all chains and prints the time per chain.
+    :param label: The label to print.
+    :param function: The function taking a chain and its index.
+    :param chains: The chains.
+    :return: The results.
+    """
+    start: float = time.perf_counter()
+    results: list = [function(chain, i) for i, chain in enumerate(chains)]
+    duration: float = time.perf_counter() - start
+    print(f"{label:<25s} {duration / len(chains) * 1e6:8.1f} us/chain")
+
+    return results
+
+
+# Can be run from the package directory: python benchmarks/artifact_store.py
+if __name__ == "__main__":
+    # the same designs built twice, as happens when they are created in two sessions
+    chains: List[MesaChain] = generate_chains(CHAIN_COUNT)
+    rebuilt: List[MesaChain] = generate_chains(CHAIN_COUNT)
+    print(f"Fingerprinting and storing {CHAIN_COUNT} chains")
+
+    fingerprints: List[str] = measure("fingerprint", lambda chain, i: chain.fingerprint(), chains)
+    print(f"unique fingerprints over both builds: {len(set(fingerprints) | {chain.fingerprint() for chain in rebuilt})}")
+
+    # a lookup only pays off for artifacts more expensive to render than reading a file, e.g. codon optimized DNA records,
+    # protein GenBank records are cheaper to render than to read from disk
+    with tempfile.TemporaryDirectory() as directory:
+        store: ArtifactStore = ArtifactStore(directory)
+        keys: List[str] = [store.key(fingerprint, "genbank", f"chain_{i}") for i, fingerprint in enumerate(fingerprints)]
+        measure("render protein GenBank", lambda chain, i: chain.to_annotated_part(f"chain_{i}").to_genbank_string(), rebuilt)
+        measure("store put", lambda chain, i: store.put(keys[i], chain.to_annotated_part(f"chain_{i}").to_genbank_string().encode()), chains)
+        hits: list = measure("store lookup", lambda chain, i: store.get(store.key(chain.fingerprint(), "genbank", f"chain_{i}")), rebuilt)
+        print(f"lookups of the rebuilt chains hitting the store: {sum(hit is not None for hit in hits)} of {len(rebuilt)}")
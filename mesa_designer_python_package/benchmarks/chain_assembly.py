@@ -0,0 +1,105 @@
+import copy
+import random
+import time
+from typing import List
+
+from mesa_designer import TMD_DATA, PRS_DATA, TEVP_DATA, SIGNAL_SEQS
+from mesa_designer.mesa import MesaChain, MESA_ORDER
+from mesa_designer.part import AnnotatedPart, Annotation
+
+# Defines the number of generated chains.
+CHAIN_COUNT: int = 5000
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def generate_chains(count: int, seed: int = 0) -> List[MesaChain]:
+    """
+    Generates random MESA chains with varying components.
+    :param count: The number of chains to generate.
+    :param seed: The seed of the random number generator.
+    :return: A list of MesaChain objects.
+    """
+    rng: random.Random = random.Random(seed)
+    chains: List[MesaChain] = []
+    for i in range(count):
+        chain: MesaChain = MesaChain(name=f"chain_{i}")
+        chain.add_binder("".join(rng.choices(AMINO_ACIDS, k=rng.randint(100, 300))))
+        chain.add_tmd(rng.choice([name for name in TMD_DATA.keys() if name.isupper()]))
+        chain.add_signal_peptide(rng.choice([name for name in SIGNAL_SEQS.keys() if name.isupper()]))
+        if rng.random() < 0.5:
+            chain.add_tmd_linker()
+        if rng.random() < 0.5:
+            chain.add_protease(rng.choice(list(TEVP_DATA.keys())))
+            chain.add_prs(rng.choice(list(PRS_DATA.keys())))
+            chain.add_cargo("".join(rng.choices(AMINO_ACIDS, k=rng.randint(20, 100))))
+        chains.append(chain)
+
+    return chains
+
+
+def deepcopy_to_annotated_part(chain: MesaChain, name: str) -> AnnotatedPart:
+    """
+    Reference implementation of MesaChain.to_annotated_part which deep copies the chain and concatenates the sequence step by step.
+    :param chain: The MesaChain to convert.
+    :param name: The name of the resulting AnnotatedPart.
+    :return: The AnnotatedPart representing the chain.
+    """
+    temp: MesaChain = copy.deepcopy(chain)
+    sequence: str = ""
+    seq_annotations: List[Annotation] = []
+    for component in MESA_ORDER:
+        if component in temp.parts.keys():
+            seq_annotations.append(temp.parts[component].get_annotations()[0].shift_annotation(len(sequence)))
+            sequence += temp.parts[component].get_sequence()
+            match component:
+                case "binder":
+                    if "tmd_linker" not in temp.parts.keys():
+                        sequence += "GGGSGGGS"
+                case "tmd":
+                    sequence += "GGGSGGGS"
+                case "protease":
+                    if "prs" in temp.parts.keys() or "cargo" in temp.parts.keys() or "aip" in temp.parts.keys():
+                        sequence += "GGGSGGGS"
+                case "prs":
+                    if "cargo" in temp.parts.keys():
+                        sequence += "GGGSGGGS"
+                case "cargo":
+                    if "aip" in temp.parts.keys():
+                        sequence += "GGGSGGGS"
+                    sequence += "*"
+
+    if not sequence.startswith("M"):
+        sequence = "M" + sequence
+        for annotation in seq_annotations:
+            annotation.shift_annotation(1)
+
+    return AnnotatedPart(sequence=sequence.upper(), name=name, seq_annotations=seq_annotations)
+
+
+def benchmark(label: str, function, chains: List[MesaChain]) -> List[AnnotatedPart]:
+    """
+    Converts all chains with a function and prints the duration.
+    :param label: The label to print.
+    :param function: The conversion function taking a chain and a name.
+    :param chains: The chains to convert.
+    :return: The converted AnnotatedParts.
+    """
+    start: float = time.perf_counter()
+    parts: List[AnnotatedPart] = [function(chain, chain.name) for chain in chains]
+    duration: float = time.perf_counter() - start
+    print(f"{label:<30s} {duration:8.3f} s  ({len(chains) / duration:10.0f} chains/s)")
+
+    return parts
+
+
+# Can be run from the package directory: python benchmarks/chain_assembly.py
+if __name__ == "__main__":
+    chains: List[MesaChain] = generate_chains(CHAIN_COUNT)
+    print(f"Assembling {len(chains)} chains")
+
+    reference_parts: List[AnnotatedPart] = benchmark("deepcopy reference", deepcopy_to_annotated_part, chains)
+    parts: List[AnnotatedPart] = benchmark("to_annotated_part", lambda chain, name: chain.to_annotated_part(name), chains)
+
+    # both implementations must produce identical GenBank records
+    identical: bool = all(part.to_genbank_string() == reference.to_genbank_string() for part, reference in zip(parts[:500], reference_parts[:500]))
+    print(f"identical GenBank output (first 500 chains): {identical}")
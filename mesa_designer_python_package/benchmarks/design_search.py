@@ -0,0 +1,79 @@
+import random
+import time
+from typing import List
+
+from mesa_designer import TMD_DATA, PRS_DATA, TEVP_DATA, AIP_DATA
+from mesa_designer.library import Design, MesaLibrary
+
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+# Defines the constraints of the search: a length budget, deamidation and isomerization hotspots and TMD/protease rules.
+MAX_LENGTH: int = 420
+FORBIDDEN_MOTIFS: List[str] = ["NG", "DG"]
+VALIDATORS = [lambda labels: labels.get("tmd", "FGFR").startswith("FGFR"),
+              lambda labels: "prs" not in labels or (labels["protease"] == "none") == (labels["prs"] == "none")]
+# Defines the number of designs enumerated by the enumerate-then-filter baseline, its total duration is extrapolated.
+BASELINE_DESIGNS: int = 20000
+
+
+def build_library(binder_count: int, seed: int = 0) -> MesaLibrary:
+    """
+    Builds a large library crossing random binders with all catalogue TMDs, linker lengths, proteases, PRS variants, cargos and AIPs.
+    :param binder_count: The number of random binders.
+    :param seed: The seed of the random number generator.
+    :return: The MesaLibrary.
+    """
+    rng: random.Random = random.Random(seed)
+    return MesaLibrary({"binder": {f"B{i}": "".join(rng.choices(AMINO_ACIDS, k=rng.randint(90, 250))) for i in range(binder_count)},
+                        "tmd_linker": {f"L{n}": "GGGGS" * n for n in range(1, 9)},
+                        "tmd": list(TMD_DATA.keys()),
+                        "protease": [None] + list(TEVP_DATA.keys()),
+                        "prs": [None] + list(PRS_DATA.keys()),
+                        "cargo": {f"C{i}": "".join(rng.choices(AMINO_ACIDS, k=rng.randint(20, 80))) for i in range(4)},
+                        "aip": [None] + list(AIP_DATA.keys())},
+                       name="bench")
+
+
+def is_feasible(design: Design) -> bool:
+    """
+    Checks all constraints on a fully assembled design, as done when enumerating and filtering.
+    :param design: The design to check.
+    :return: Whether the design satisfies all constraints.
+    """
+    sequence: str = design.chain.get_sequence()
+    return len(sequence) <= MAX_LENGTH and not any(motif in sequence for motif in FORBIDDEN_MOTIFS) and all(validator(design.labels) for validator in VALIDATORS)
+
+
+def score(design: Design) -> float:
+    """
+    Example score preferring short constructs with few hydrophobic residues.
+    :param design: The design to score.
+    :return: The score, higher is better.
+    """
+    sequence: str = design.chain.get_sequence()
+    return -len(sequence) - 5 * sum(sequence.count(residue) for residue in "FILVW") / len(sequence)
+
+
+# Can be run from the package directory: python benchmarks/design_search.py
+if __name__ == "__main__":
+    library: MesaLibrary = build_library(2000)
+    print(f"Searching a design space of {library.size:,} designs")
+
+    # both approaches must find the same feasible designs, which is checked on a smaller library
+    small_library: MesaLibrary = build_library(3)
+    identical: bool = [design.index for design in small_library if is_feasible(design)] == [design.index for design in small_library.search(max_length=MAX_LENGTH, forbidden_motifs=FORBIDDEN_MOTIFS, validators=VALIDATORS)]
+    print(f"identical feasible designs ({small_library.size:,} designs): {identical}")
+
+    # enumerate-then-filter, extrapolated from the first designs
+    start: float = time.perf_counter()
+    sum(1 for _, design in zip(range(BASELINE_DESIGNS), library) if is_feasible(design))
+    per_design: float = (time.perf_counter() - start) / BASELINE_DESIGNS
+    baseline_duration: float = per_design * library.size
+    print(f"{'enumerate-then-filter':<25s} {baseline_duration:12.1f} s  (extrapolated from {BASELINE_DESIGNS} designs, {per_design * 1e6:.1f} us/design)")
+
+    start = time.perf_counter()
+    top: List[Design] = library.top(10, score, max_length=MAX_LENGTH, forbidden_motifs=FORBIDDEN_MOTIFS, validators=VALIDATORS)
+    search_duration: float = time.perf_counter() - start
+    print(f"{'pruned search (top 10)':<25s} {search_duration:12.1f} s  ({baseline_duration / search_duration:,.0f}x faster)")
+
+    for design in top:
+        print(f"  {design.id}  {score(design):8.2f}  {design.labels}")
@@ -0,0 +1,53 @@
+from io import StringIO
+import time
+from typing import Callable, List
+
+from Bio import SeqIO
+
+from mesa_designer.part import AnnotatedPart
+from mesa_designer.template import DesignTemplate
+from mesa_designer.mesa import MesaChain
+
+# Defines the number of exported records.
+RECORD_COUNT: int = 20000
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def biopython_genbank_string(part: AnnotatedPart) -> str:
+    """
+    Reference implementation formatting a record with Biopython's SeqIO.write, as previously done by AnnotatedPart.to_genbank_string.
+    :param part: The AnnotatedPart to format.
+    :return: The GenBank record.
+    """
+    f: StringIO = StringIO()
+    SeqIO.write(part.get_seq_record(), f, "genbank")
+    return f.getvalue()
+
+
+def benchmark(label: str, function: Callable[[AnnotatedPart], str], parts: List[AnnotatedPart]) -> List[str]:
+    """
+    Formats all records with a function and prints the throughput.
+    :param label: The label to print.
+    :param function: The function formatting a single record.
+    :param parts: The AnnotatedParts to format.
+    :return: The formatted records.
+    """
+    start: float = time.perf_counter()
+    records: List[str] = [function(part) for part in parts]
+    duration: float = time.perf_counter() - start
+    print(f"{label:<25s} {duration:8.3f} s  ({len(parts) / duration:10.0f} records/s)")
+
+    return records
+
+
+# Can be run from the package directory: python benchmarks/genbank_export.py
+if __name__ == "__main__":
+    import random
+    rng: random.Random = random.Random(0)
+    template: DesignTemplate = DesignTemplate(MesaChain().add_signal_peptide("CD4").add_tmd("FGFR4").add_protease("TEVp").add_prs("PRS").add_cargo("GSGSGSDYKDDDDK"))
+    parts: List[AnnotatedPart] = list(template.apply_batch((f"design_{i}", "".join(rng.choices(AMINO_ACIDS, k=rng.randint(100, 300)))) for i in range(RECORD_COUNT)))
+    print(f"Formatting {RECORD_COUNT} GenBank records")
+
+    reference: List[str] = benchmark("Biopython SeqIO.write", biopython_genbank_string, parts)
+    native: List[str] = benchmark("native to_genbank_string", AnnotatedPart.to_genbank_string, parts)
+    print(f"byte-identical output: {native == reference}")
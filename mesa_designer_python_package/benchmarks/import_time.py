@@ -0,0 +1,42 @@
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+# Defines the number of measured interpreter starts per statement.
+REPEATS: int = 10
+# The source directory of the package, added to the path of the measured interpreters.
+SOURCE_DIR: Path = Path(__file__).resolve().parent.parent / "src"
+
+
+def import_time(statement: str, module: str) -> float:
+    """
+    Measures the cumulative import time of a module in a fresh interpreter using -X importtime.
+    :param statement: The statement to run (e.g., "import mesa_designer").
+    :param module: The module whose cumulative import time is reported.
+    :return: The median import time in milliseconds.
+    """
+    times: List[float] = []
+    for _ in range(REPEATS):
+        result: subprocess.CompletedProcess = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True,
+                                                             env={**os.environ, "PYTHONPATH": str(SOURCE_DIR)})
+        # lines have the format "import time: self [us] | cumulative | imported package", nested imports are indented
+        for line in result.stderr.splitlines():
+            fields: List[str] = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                times.append(int(fields[1]) / 1000)
+
+    return statistics.median(times)
+
+
+# Can be run from the package directory: python benchmarks/import_time.py
+if __name__ == "__main__":
+    print(f"Median cumulative import times over {REPEATS} interpreter starts")
+    for statement, module in (("import mesa_designer", "mesa_designer"),
+                              ("import mesa_designer.mesa", "mesa_designer.mesa"),
+                              ("import mesa_designer.export", "mesa_designer.export"),
+                              # the import time previously paid by every import of mesa_designer.part
+                              ("import Bio.SeqIO", "Bio.SeqIO")):
+        print(f"{statement:<30s} {import_time(statement, module):8.1f} ms")
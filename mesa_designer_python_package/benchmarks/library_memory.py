@@ -0,0 +1,83 @@
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable, List
+
+from mesa_designer import TMD_DATA, PRS_DATA, TEVP_DATA, SIGNAL_SEQS
+from mesa_designer.mesa import MesaChain
+from mesa_designer.registry import PART_REGISTRY, PROTEASE_FAMILIES
+
+# Defines the number of chains in the in-memory library.
+CHAIN_COUNT: int = 100_000
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def build_library(count: int, add_catalogue_parts: Callable[[MesaChain, str, str, str, str], None], seed: int = 0) -> List[MesaChain]:
+    """
+    Builds a library of chains sharing a small pool of binders with varying catalogue parts, as generated by combinatorial screens.
+    :param count: The number of chains to build.
+    :param add_catalogue_parts: Function adding the tmd, signal peptide, protease and prs of the given names to a chain.
+    :param seed: The seed of the random number generator.
+    :return: A list of MesaChain objects.
+    """
+    rng: random.Random = random.Random(seed)
+    binders: List[str] = ["".join(rng.choices(AMINO_ACIDS, k=120)) for _ in range(50)]
+    tmds: List[str] = [name for name in TMD_DATA.keys() if name.isupper()]
+    signals: List[str] = [name for name in SIGNAL_SEQS.keys() if name.isupper()]
+
+    chains: List[MesaChain] = []
+    for i in range(count):
+        chain: MesaChain = MesaChain(name=f"chain_{i}")
+        chain.add_binder(rng.choice(binders))
+        add_catalogue_parts(chain, rng.choice(tmds), rng.choice(signals), rng.choice(list(TEVP_DATA.keys())), rng.choice(list(PRS_DATA.keys())))
+        chains.append(chain)
+
+    return chains
+
+
+def add_flyweights(chain: MesaChain, tmd: str, signal: str, protease: str, prs: str) -> None:
+    """
+    Adds catalogue parts as shared flyweights.
+    """
+    chain.add_tmd(tmd).add_signal_peptide(signal).add_protease(protease).add_prs(prs)
+
+
+def add_copies(chain: MesaChain, tmd: str, signal: str, protease: str, prs: str) -> None:
+    """
+    Adds catalogue parts as separate parts with copied sequences, as chains previously held them.
+    """
+    chain.add_custom_tmd("".join(PART_REGISTRY.get(tmd, "tmd").protein), name=f"{tmd}_TMD", annotation=f"{tmd}_TMD")
+    chain.add_custom_signal_peptide("".join(PART_REGISTRY.get(signal, "signal").protein), name=f"{signal}_Signal_Peptide", annotation=f"{signal}_Signal_Peptide")
+    chain.add_component("protease", sequence="".join(PART_REGISTRY.get(protease, PROTEASE_FAMILIES).protein), annotation=protease)
+    chain.add_component("prs", sequence="".join(PART_REGISTRY.get(prs, "prs").protein), annotation=prs)
+
+
+def measure(label: str, add_catalogue_parts: Callable[[MesaChain, str, str, str, str], None]) -> List[MesaChain]:
+    """
+    Builds a library and prints its traced memory footprint and build duration.
+    :param label: The label to print.
+    :param add_catalogue_parts: Function adding the catalogue parts to a chain.
+    :return: The built library.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    chains: List[MesaChain] = build_library(CHAIN_COUNT, add_catalogue_parts)
+    duration: float = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<30s} {size / 1e6:8.1f} MB  ({size / CHAIN_COUNT:6.0f} B/chain)  built in {duration:6.2f} s")
+
+    return chains
+
+
+# Can be run from the package directory: python benchmarks/library_memory.py
+if __name__ == "__main__":
+    print(f"Building libraries of {CHAIN_COUNT} chains")
+    copies: List[MesaChain] = measure("per-chain copies", add_copies)
+    flyweights: List[MesaChain] = measure("shared catalogue parts", add_flyweights)
+
+    # both libraries must assemble into identical chains
+    identical: bool = all(a.to_annotated_part(a.name).to_genbank_string() == b.to_annotated_part(b.name).to_genbank_string() for a, b in zip(copies[:200], flyweights[:200]))
+    print(f"identical GenBank output (first 200 chains): {identical}")
@@ -0,0 +1,72 @@
+import os
+import pickle
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from mesa_designer.export import _iter_record_specs, write_records, write_records_parallel
+from mesa_designer.library import MesaLibrary
+
+# Defines the number of binders in the exported library (crossed with 4 TMDs and 2 proteases).
+BINDER_COUNT: int = 5000
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def build_library(binder_count: int, seed: int = 0) -> MesaLibrary:
+    """
+    Builds a library of random binders crossed with a few TMDs and proteases.
+    :param binder_count: The number of binders.
+    :param seed: The seed of the random number generator.
+    :return: The MesaLibrary.
+    """
+    rng: random.Random = random.Random(seed)
+    return MesaLibrary({"signal_peptide": ["CD4"],
+                        "binder": {f"binder_{i}": "".join(rng.choices(AMINO_ACIDS, k=rng.randint(100, 300))) for i in range(binder_count)},
+                        "tmd": ["FGFR4", "CD28", "GpA", "VEGFR1"],
+                        "protease": ["TEVp", "NTEVp_H75S"],
+                        "prs": ["PRS"],
+                        "cargo": ["GSGSGSDYKDDDDK"]},
+                       name="library")
+
+
+def benchmark(label: str, function: Callable[[Path], object], path: Path, records: int) -> float:
+    """
+    Runs an export and prints the throughput.
+    :param label: The label to print.
+    :param function: The export function taking the output path.
+    :param path: The output path.
+    :param records: The number of exported records.
+    :return: The duration in seconds.
+    """
+    start: float = time.perf_counter()
+    function(path)
+    duration: float = time.perf_counter() - start
+    print(f"{label:<25s} {duration:8.3f} s  ({records / duration:10.0f} records/s)")
+
+    return duration
+
+
+# Can be run from the package directory: python benchmarks/parallel_export.py
+if __name__ == "__main__":
+    library: MesaLibrary = build_library(BINDER_COUNT)
+    print(f"Exporting {len(library)} designs on {os.cpu_count()} CPUs")
+
+    # the data sent to the workers per chunk of 256 designs, compared to pickling the assembled records
+    designs = [library.design(i) for i in range(256)]
+    range_size: int = len(pickle.dumps([("designs", 0, 256)]))
+    spec_size: int = len(pickle.dumps(list(_iter_record_specs(designs, library))))
+    record_size: int = len(pickle.dumps([design.chain.to_annotated_part(design.id).get_seq_record() for design in designs]))
+    print(f"chunk of 256 designs: {range_size} bytes as index range, {spec_size} bytes as design specs (filtered libraries), "
+          f"{record_size} bytes as pickled SeqRecords")
+
+    with tempfile.TemporaryDirectory() as directory:
+        reference: Path = Path(directory) / "sequential.gb"
+        sequential: float = benchmark("write_records", lambda path: write_records(library, path), reference, len(library))
+
+        worker_counts: List[int] = sorted({1, 2, 4, os.cpu_count() or 1})
+        for workers in worker_counts:
+            path: Path = Path(directory) / f"parallel_{workers}.gb"
+            duration: float = benchmark(f"{workers} worker(s)", lambda path: write_records_parallel(library, path, max_workers=workers), path, len(library))
+            print(f"{'':<25s} speedup {sequential / duration:5.2f}x, identical output: {path.read_bytes() == reference.read_bytes()}")
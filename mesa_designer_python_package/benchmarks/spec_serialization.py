@@ -0,0 +1,51 @@
+from io import StringIO
+import pickle
+import time
+from typing import List
+
+from chain_assembly import generate_chains
+from mesa_designer.mesa import MesaChain
+from mesa_designer.spec import dump_all, load_all
+
+# Defines the number of serialized chains.
+CHAIN_COUNT: int = 20000
+
+
+# Can be run from the package directory: python benchmarks/spec_serialization.py
+if __name__ == "__main__":
+    chains: List[MesaChain] = generate_chains(CHAIN_COUNT)
+    print(f"Serializing {len(chains)} chains")
+
+    # pickling the whole list stores shared catalogue parts once, pickling single chains (e.g., when sending them between processes) stores them every time
+    start: float = time.perf_counter()
+    pickled: bytes = pickle.dumps(chains)
+    encode: float = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(pickled)
+    decode: float = time.perf_counter() - start
+    print(f"{'pickle (list)':<15s} {len(pickled) / len(chains):8.0f} bytes/chain  encode {len(chains) / encode:9.0f} chains/s  decode {len(chains) / decode:9.0f} chains/s")
+
+    start = time.perf_counter()
+    pickled_chains: List[bytes] = [pickle.dumps(chain) for chain in chains]
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in pickled_chains:
+        pickle.loads(data)
+    decode = time.perf_counter() - start
+    size: int = sum(len(data) for data in pickled_chains)
+    print(f"{'pickle (chain)':<15s} {size / len(chains):8.0f} bytes/chain  encode {len(chains) / encode:9.0f} chains/s  decode {len(chains) / decode:9.0f} chains/s")
+
+    handle: StringIO = StringIO()
+    start = time.perf_counter()
+    dump_all(chains, handle)
+    encode = time.perf_counter() - start
+    handle.seek(0)
+    start = time.perf_counter()
+    restored: List[MesaChain] = list(load_all(handle))
+    decode = time.perf_counter() - start
+    print(f"{'JSON lines':<15s} {len(handle.getvalue().encode()) / len(chains):8.0f} bytes/chain  encode {len(chains) / encode:9.0f} chains/s  decode {len(chains) / decode:9.0f} chains/s")
+
+    # restored chains must produce identical GenBank records and reference the shared catalogue parts
+    identical: bool = all(chain.to_genbank_string() == copy.to_genbank_string() for chain, copy in zip(chains[:500], restored[:500]))
+    shared: bool = all(copy.parts["tmd"] is chain.parts["tmd"] for chain, copy in zip(chains, restored))
+    print(f"identical GenBank output (first 500 chains): {identical}, shared catalogue parts: {shared}")
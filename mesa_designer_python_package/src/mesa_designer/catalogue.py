@@ -0,0 +1,135 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Union
+
+# Defines the directory of the catalogue sources and the compiled catalogue.
+DATA_DIR: Path = Path(__file__).resolve().parent / "data"
+# The compiled catalogue: all families in a single JSON file, together with the version hash of their content.
+CATALOGUE_FILE: Path = DATA_DIR / "catalogue.json"
+
+# Defines the source JSON file of each catalogue family relative to the data directory. Parts are edited in these files,
+# afterwards the catalogue is compiled with: python -m mesa_designer.catalogue
+SOURCE_FILES: Dict[str, str] = {
+    "tmd": "tmd/tmd_list.json",  # Transmembrane Domain (TMD) data
+    "aip": "aip/aip_list.json",  # Auto-inhibitory Peptide (AIP) data
+    "fret": "FRET/ICDs.json",  # FRET-related Intracellular Domains (ICDs) data
+    "ctev": "intracellular/CTEV_list.json",  # C-terminal TEV (Tobacco Etch Virus) protease chain data
+    "ntev": "intracellular/NTEV_list.json",  # N-terminal TEV (Tobacco Etch Virus) protease chain data
+    "tev": "intracellular/TEVp_list.json",  # TEV Protease (TEVp) data
+    "prs": "prs/prs_list.json",  # Protease Recognition Site (PRS) data
+    "signal": "signal_seqs/signal_sequences.json",  # signal sequences data
+    "tag": "tags/tag_sequences.json"  # tag sequences data
+}
+
+# Defines the names under which the data of each family is exported (e.g., mesa_designer.TMD_DATA and util.TMD_DATA).
+DATA_ATTRIBUTES: Dict[str, str] = {
+    "TMD_DATA": "tmd",
+    "AIP_DATA": "aip",
+    "FRET_ICDs": "fret",
+    "CTEV_DATA": "ctev",
+    "NTEV_DATA": "ntev",
+    "TEVP_DATA": "tev",
+    "PRS_DATA": "prs",
+    "SIGNAL_SEQS": "signal",
+    "TAG_SEQS": "tag"
+}
+
+
+def get_version(families: Mapping[str, Mapping[str, list]]) -> str:
+    """
+    Computes the version hash of catalogue data, which changes whenever a part is added, removed or modified.
+    :param families: A dictionary mapping family names to dictionaries mapping part names to [dna_sequence, protein_sequence] lists.
+    :return: The first 16 hexadecimal digits of the SHA-256 hash of the data.
+    """
+    # imported here, as importing hashlib would double the import time of mesa_designer
+    from hashlib import sha256
+
+    return sha256(json.dumps(families, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+def compile_catalogue(source_dir: Union[str, Path] = DATA_DIR, target: Union[str, Path] = CATALOGUE_FILE) -> str:
+    """
+    Compiles the source files of all families into a single catalogue file.
+    :param source_dir: The directory containing the source files listed in SOURCE_FILES.
+    :param target: The path of the compiled catalogue.
+    :return: The version hash of the compiled catalogue.
+    """
+    families: Dict[str, dict] = {}
+    for family, file_name in SOURCE_FILES.items():
+        with open(Path(source_dir) / file_name, "r") as f:
+            families[family] = dict(json.load(f))
+
+    version: str = get_version(families)
+    with open(target, "w") as f:
+        json.dump({"version": version, "families": families}, f, separators=(",", ":"))
+        f.write("\n")
+
+    return version
+
+
+class Catalogue(Mapping):
+    """
+    Read-only mapping of family names (e.g., "tmd") to dictionaries mapping part names to [dna_sequence, protein_sequence] lists.
+    The compiled catalogue file is parsed once on first access and shared by everything importing it (mesa_designer, util, the app and the API).
+    """
+    __slots__ = ("file_path", "_families", "_version")
+
+    def __init__(self, file_path: Union[str, Path] = CATALOGUE_FILE) -> None:
+        """
+        Initializes a Catalogue without reading the file.
+        :param file_path: The path of the compiled catalogue.
+        :return: None
+        """
+        self.file_path: Path = Path(file_path)
+        self._families: Optional[Dict[str, dict]] = None
+        self._version: Optional[str] = None
+
+    def _load(self) -> Dict[str, dict]:
+        """
+        Parses the compiled catalogue if this has not happened yet.
+        :return: The dictionary mapping family names to their data.
+        :raises ValueError: If the content of the catalogue does not match its version hash, e.g. because it was edited without compiling.
+        """
+        if self._families is None:
+            with open(self.file_path, "r") as f:
+                catalogue: dict = json.load(f)
+
+            if get_version(catalogue["families"]) != catalogue["version"]:
+                raise ValueError(f"Catalogue {self.file_path} does not match its version hash, recompile it with: python -m mesa_designer.catalogue")
+
+            self._version = catalogue["version"]
+            self._families = catalogue["families"]
+
+        return self._families
+
+    @property
+    def version(self) -> str:
+        """
+        Retrieves the version hash of the catalogue, e.g. to invalidate caches depending on catalogue parts.
+        :return: The version hash.
+        """
+        self._load()
+        return self._version
+
+    def __getitem__(self, family: str) -> dict:
+        return self._load()[family]
+
+    def __contains__(self, family: object) -> bool:
+        # checked without parsing the catalogue, unlike the default implementation of Mapping
+        return family in SOURCE_FILES
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SOURCE_FILES)
+
+    def __len__(self) -> int:
+        return len(SOURCE_FILES)
+
+
+# The catalogue shipped with mesa_designer.
+CATALOGUE: Catalogue = Catalogue()
+
+
+# Recompiles the catalogue after editing the source files: python -m mesa_designer.catalogue
+if __name__ == "__main__":
+    print(f"Compiled {CATALOGUE_FILE} (version {compile_catalogue()})")
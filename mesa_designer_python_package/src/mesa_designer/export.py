@@ -0,0 +1,312 @@
+from __future__ import annotations
+from collections import deque
+from contextlib import ExitStack
+import copy
+import gzip
+from io import StringIO
+from itertools import islice
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from .library import Design, MesaLibrary
+from .mesa import MesaAssembly, MesaChain
+from .part import AnnotatedPart, RECORD_FORMATS
+from .spec import chain_from_spec, chain_to_spec, part_from_spec, part_to_spec
+
+if TYPE_CHECKING:
+    from .store import ArtifactStore
+
+# An item which can be exported: a single part, a chain (named after the chain), a library design (named after its id) or an assembly (one record per chain).
+Exportable = Union[AnnotatedPart, MesaChain, Design, MesaAssembly]
+# A record as sent to a worker process: ("design", id, choice indices) for designs of the exported library,
+# ("chain", name, chain spec) for other chains and ("part", part spec) for AnnotatedParts.
+# ("designs", start, stop) stands for a range of designs of an unfiltered library.
+RecordSpec = Tuple
+# The library whose designs are exported by a worker process, set once per process by _init_worker.
+_worker_library: Optional[MesaLibrary] = None
+
+
+def _iter_named_chains(items: Iterable[Exportable]) -> Iterator[Tuple[str, Union[MesaChain, AnnotatedPart]]]:
+    """
+    Resolves exportable items into the chains of their records one at a time.
+    :param items: An iterable of AnnotatedParts, MesaChains, Designs or MesaAssemblies.
+    :return: An iterator over (record name, chain) tuples, one per record. AnnotatedParts are passed on instead of a chain.
+    :raises TypeError: If an item cannot be exported.
+    """
+    for item in items:
+        if isinstance(item, AnnotatedPart):
+            yield item.name, item
+
+        elif isinstance(item, Design):
+            yield item.id, item.chain
+
+        elif isinstance(item, MesaChain):
+            yield item.name if item.name else "mesa_chain", item
+
+        elif isinstance(item, MesaAssembly):
+            yield from item.mesa_chains.items()
+
+        else:
+            raise TypeError(f"Cannot export object of type {type(item).__name__}")
+
+
+def iter_annotated_parts(items: Iterable[Exportable]) -> Iterator[AnnotatedPart]:
+    """
+    Converts exportable items into AnnotatedParts one at a time.
+    :param items: An iterable of AnnotatedParts, MesaChains, Designs or MesaAssemblies.
+    :return: An iterator over the AnnotatedParts, one per chain.
+    :raises TypeError: If an item cannot be exported.
+    """
+    for name, item in _iter_named_chains(items):
+        yield item if isinstance(item, AnnotatedPart) else item.to_annotated_part(name=name)
+
+
+def format_record(part: AnnotatedPart, file_format: str = "genbank") -> str:
+    """
+    Formats an AnnotatedPart as a single record.
+    :param part: The AnnotatedPart.
+    :param file_format: The output format, either "genbank" or "fasta".
+    :return: The formatted record.
+    """
+    if file_format == "genbank":
+        return part.to_genbank_string()
+
+    handle: StringIO = StringIO()
+    part.write(handle, file_format)
+
+    return handle.getvalue()
+
+
+def open_output(file_path: Union[str, Path]) -> TextIO:
+    """
+    Opens a file for writing text, compressed with gzip if the file name ends with ".gz".
+    :param file_path: The path of the file.
+    :return: The opened text handle.
+    """
+    file_path = Path(file_path)
+    if file_path.suffix == ".gz":
+        return gzip.open(file_path, "wt")
+
+    return open(file_path, "w")
+
+
+def get_shard_paths(file_path: Union[str, Path], shards: int) -> List[Path]:
+    """
+    Determines the file paths of the shards of an output file, e.g. "library.gb.gz" becomes "library_0.gb.gz", "library_1.gb.gz", ...
+    :param file_path: The path of the unsharded output file.
+    :param shards: The number of shards.
+    :return: A list of the shard paths.
+    """
+    file_path = Path(file_path)
+    stem, _, extensions = file_path.name.partition(".")
+    width: int = len(str(shards - 1))
+
+    return [file_path.with_name(f"{stem}_{i:0{width}d}" + (f".{extensions}" if extensions else "")) for i in range(shards)]
+
+
+def _check_output(destination: Union[str, Path, TextIO], file_format: str, shards: int) -> None:
+    """
+    Validates the output arguments of write_records and write_records_parallel.
+    :raises ValueError: If the format is not supported, shards is smaller than 1 or sharding is requested for an open handle.
+    """
+    if file_format not in RECORD_FORMATS:
+        raise ValueError(f"Unsupported format '{file_format}', choose one of: {', '.join(RECORD_FORMATS)}")
+
+    if shards < 1:
+        raise ValueError("Number of shards must be at least 1")
+
+    if shards > 1 and not isinstance(destination, (str, Path)):
+        raise ValueError("Sharding requires a file path as destination")
+
+
+def _open_handles(stack: ExitStack, destination: Union[str, Path, TextIO], shards: int) -> List[TextIO]:
+    """
+    Opens the output handles of all shards, which are closed together with the stack.
+    :param stack: The ExitStack managing the opened files.
+    :param destination: An open text handle or a file path.
+    :param shards: The number of shards.
+    :return: A list of one handle per shard.
+    """
+    if not isinstance(destination, (str, Path)):
+        return [destination]
+
+    if shards == 1:
+        return [stack.enter_context(open_output(destination))]
+
+    return [stack.enter_context(open_output(shard_path)) for shard_path in get_shard_paths(destination, shards)]
+
+
+def write_records(items: Iterable[Exportable], destination: Union[str, Path, TextIO], file_format: str = "genbank", shards: int = 1,
+                  store: Optional[ArtifactStore] = None) -> List[int]:
+    """
+    Streams items as a multi-record GenBank or FASTA file. Items are converted and written one at a time,
+    so generators of designs (e.g., a MesaLibrary) are exported in constant memory.
+    :param items: An iterable of AnnotatedParts, MesaChains, Designs or MesaAssemblies.
+    :param destination: An open text handle or a file path. Paths ending with ".gz" are compressed with gzip.
+    :param file_format: The output format, either "genbank" or "fasta".
+    :param shards: The number of files to distribute the records over, round-robin in the order of the items. Requires a file path
+    as destination, the shards are named by get_shard_paths.
+    :param store: An optional ArtifactStore the records of chains are retrieved from, keyed by the fingerprint of the chain, the format and
+    the record name. Records missing from the store are rendered and stored, so repeated exports of a design are a single lookup.
+    The name is part of the key, as it is written into the LOCUS, DEFINITION, ACCESSION and VERSION lines (or the FASTA header) and its length
+    decides whether the record is written natively or by Biopython, so a stored record cannot be renamed by patching a few lines.
+    :return: The number of records written to each shard.
+    :raises ValueError: If the format is not supported, shards is smaller than 1 or sharding is requested for an open handle.
+    """
+    _check_output(destination, file_format, shards)
+
+    counts: List[int] = [0] * shards
+    with ExitStack() as stack:
+        handles: List[TextIO] = _open_handles(stack, destination, shards)
+        for i, (name, item) in enumerate(_iter_named_chains(items)):
+            if isinstance(item, AnnotatedPart):
+                item.write(handles[i % shards], file_format)
+            elif store is not None:
+                handles[i % shards].write(store.get_or_render(store.key(item.fingerprint(), file_format, name),
+                                                              lambda: format_record(item.to_annotated_part(name=name), file_format)))
+            else:
+                item.to_annotated_part(name=name).write(handles[i % shards], file_format)
+            counts[i % shards] += 1
+
+    return counts
+
+
+def _iter_record_specs(items: Iterable[Exportable], library: Optional[MesaLibrary]) -> Iterator[RecordSpec]:
+    """
+    Converts exportable items into compact record specs, which are cheap to send to worker processes.
+    :param items: An iterable of AnnotatedParts, MesaChains, Designs or MesaAssemblies.
+    :param library: The library known to the workers. Its designs are sent as choice indices only.
+    :return: An iterator over the record specs, one per chain.
+    :raises TypeError: If an item cannot be exported.
+    """
+    for item in items:
+        if isinstance(item, AnnotatedPart):
+            yield "part", part_to_spec(item)
+
+        elif isinstance(item, Design):
+            # designs sharing the choices of the workers' library are rebuilt by the workers, others are sent as chain specs
+            if library is not None and item._library.choices is library.choices:
+                yield "design", item.id, item._choice_indices
+            else:
+                yield "chain", item.id, chain_to_spec(item.chain)
+
+        elif isinstance(item, MesaChain):
+            yield "chain", item.name if item.name else "mesa_chain", chain_to_spec(item)
+
+        elif isinstance(item, MesaAssembly):
+            for name, chain in item.mesa_chains.items():
+                yield "chain", name, chain_to_spec(chain)
+
+        else:
+            raise TypeError(f"Cannot export object of type {type(item).__name__}")
+
+
+def _init_worker(library: Optional[MesaLibrary]) -> None:
+    """
+    Initializes a worker process of write_records_parallel.
+    :param library: The library whose designs are exported, or None.
+    :return: None
+    """
+    global _worker_library
+    _worker_library = library
+
+
+def _iter_spec_parts(specs: List[RecordSpec]) -> Iterator[AnnotatedPart]:
+    """
+    Recreates the AnnotatedParts of record specs in a worker process.
+    :param specs: The record specs.
+    :return: An iterator over the AnnotatedParts, one per record.
+    """
+    for spec in specs:
+        if spec[0] == "designs":
+            for index in range(spec[1], spec[2]):
+                design: Design = _worker_library.design(index)
+                yield design.chain.to_annotated_part(name=design.id)
+
+        elif spec[0] == "design":
+            yield _worker_library.build_chain(spec[2], name=spec[1]).to_annotated_part(name=spec[1])
+
+        elif spec[0] == "chain":
+            yield chain_from_spec(spec[2]).to_annotated_part(name=spec[1])
+
+        else:
+            yield part_from_spec(spec[1])
+
+
+def _format_chunk(specs: List[RecordSpec], file_format: str) -> List[str]:
+    """
+    Formats a chunk of record specs in a worker process.
+    :param specs: The record specs.
+    :param file_format: The output format, either "genbank" or "fasta".
+    :return: The formatted records, in the order of the specs.
+    """
+    return [format_record(part, file_format) for part in _iter_spec_parts(specs)]
+
+
+def write_records_parallel(items: Iterable[Exportable], destination: Union[str, Path, TextIO], file_format: str = "genbank", shards: int = 1,
+                           max_workers: Optional[int] = None, chunk_size: int = 256, progress: Optional[Callable[[int], None]] = None) -> List[int]:
+    """
+    Exports items like write_records, but assembles and formats the records in a pool of worker processes.
+    Items are sent to the workers in chunks of compact specs (catalogue parts by name, designs of a MesaLibrary by their indices),
+    and only a bounded number of chunks is in flight, so the export still runs in constant memory. The output is identical to write_records.
+    :param items: An iterable of AnnotatedParts, MesaChains, Designs or MesaAssemblies. If a MesaLibrary is passed, it is sent to every worker once,
+    so each design only costs its choice indices.
+    :param destination: An open text handle or a file path. Paths ending with ".gz" are compressed with gzip.
+    :param file_format: The output format, either "genbank" or "fasta".
+    :param shards: The number of files to distribute the records over, as in write_records.
+    :param max_workers: The number of worker processes. Defaults to the number of CPUs.
+    :param chunk_size: The number of records sent to a worker at once. Larger chunks reduce the communication overhead, smaller chunks
+    reduce the memory held by chunks in flight.
+    :param progress: An optional function called with the total number of records written after each chunk.
+    :return: The number of records written to each shard.
+    :raises ValueError: If the format is not supported, shards or chunk_size is smaller than 1 or sharding is requested for an open handle.
+    """
+    # the process pool is imported here, as it is the slowest import of this module and only needed for parallel exports
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    _check_output(destination, file_format, shards)
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+
+    workers: int = max_workers if max_workers else (os.cpu_count() or 1)
+    library: Optional[MesaLibrary] = None
+    if isinstance(items, MesaLibrary):
+        # filters are applied while enumerating in this process and might not be picklable, so the workers receive an unfiltered copy
+        library = copy.copy(items)
+        library._filters = ()
+
+    if library is not None and not items._filters:
+        # unfiltered libraries are split into ranges of design indices, which the workers decode themselves
+        chunks: Iterator[List[RecordSpec]] = ([("designs", start, min(start + chunk_size, library.size))] for start in range(0, library.size, chunk_size))
+    else:
+        specs: Iterator[RecordSpec] = _iter_record_specs(items, library)
+        chunks = iter(lambda: list(islice(specs, chunk_size)), [])
+
+    counts: List[int] = [0] * shards
+    written: int = 0
+    with ExitStack() as stack:
+        handles: List[TextIO] = _open_handles(stack, destination, shards)
+        executor: ProcessPoolExecutor = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(library, )))
+
+        def write_chunk(future: Future) -> None:
+            nonlocal written
+            for record in future.result():
+                handles[written % shards].write(record)
+                counts[written % shards] += 1
+                written += 1
+
+            if progress is not None:
+                progress(written)
+
+        # chunks are written in submission order, keeping two chunks per worker in flight so no worker waits for the next chunk
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_format_chunk, chunk, file_format))
+            if len(pending) >= 2 * workers:
+                write_chunk(pending.popleft())
+
+        while pending:
+            write_chunk(pending.popleft())
+
+    return counts
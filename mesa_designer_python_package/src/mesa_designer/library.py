@@ -0,0 +1,366 @@
+from __future__ import annotations
+import heapq
+from itertools import product
+from math import prod
+import random
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from .mesa import MesaChain, MESA_ORDER, get_linker_suffixes
+from .part import AnnotatedPart
+from .registry import PART_REGISTRY, PROTEASE_FAMILIES, CataloguePart
+
+# Defines the slots filled from the catalogue and the families their part names are looked up in.
+CATALOGUE_SLOTS: Dict[str, Union[str, Tuple[str, ...]]] = {"signal_peptide": "signal",
+                                                           "tmd": "tmd",
+                                                           "protease": PROTEASE_FAMILIES,
+                                                           "prs": "prs",
+                                                           "aip": "aip"}
+
+# Defines the MesaChain methods adding plain sequences for the respective slots. Other slots are added with add_component.
+SEQUENCE_SLOTS: Dict[str, Callable[[MesaChain, str], MesaChain]] = {"binder": MesaChain.add_binder,
+                                                                    "tmd_linker": MesaChain.add_tmd_linker,
+                                                                    "cargo": MesaChain.add_cargo}
+
+# A single choice of a slot: a catalogue part name (catalogue slots), a sequence (other slots), an AnnotatedPart or None to leave the slot empty.
+Choice = Union[str, AnnotatedPart, None]
+# A resolved choice as stored by the library: a CataloguePart, a sequence, an AnnotatedPart or None.
+ResolvedChoice = Union[CataloguePart, str, AnnotatedPart, None]
+
+
+def _choice_sequence(choice: ResolvedChoice) -> Optional[str]:
+    """
+    Retrieves the uppercase amino acid sequence a resolved choice contributes to a chain.
+    :param choice: The resolved choice.
+    :return: The sequence, or None if the choice leaves its slot empty.
+    """
+    if choice is None:
+        return None
+
+    if isinstance(choice, AnnotatedPart):
+        return choice.get_sequence().upper()
+
+    if isinstance(choice, CataloguePart):
+        return choice.protein.upper()
+
+    return choice.upper()
+
+
+class Design:
+    """
+    Represents a single member of a MesaLibrary. The MesaChain is only assembled when it is first accessed,
+    so filters which only inspect the labels of a design never build a chain.
+    """
+    __slots__ = ("index", "id", "labels", "_library", "_choice_indices", "_chain")
+
+    def __init__(self, library: MesaLibrary, index: int, choice_indices: Tuple[int, ...]) -> None:
+        """
+        Initializes a Design. Designs are created by a MesaLibrary and not meant to be created directly.
+        :param library: The MesaLibrary this design belongs to.
+        :param index: The position of the design in the (unfiltered) design space.
+        :param choice_indices: The index of the chosen option for every slot of the library.
+        :return: None
+        """
+        self.index: int = index
+        # The id only depends on the library's name and the position in the design space, so it is stable between runs.
+        self.id: str = f"{library.name}_{index:0{library.id_width}d}"
+        self.labels: Dict[str, str] = {slot: library.choices[slot][i][0] for slot, i in zip(library.slots, choice_indices)}
+        self._library: MesaLibrary = library
+        self._choice_indices: Tuple[int, ...] = choice_indices
+        self._chain: Optional[MesaChain] = None
+
+    @property
+    def chain(self) -> MesaChain:
+        """
+        Retrieves the MesaChain of this design, which is assembled on first access.
+        :return: The MesaChain named after the design's id.
+        """
+        if self._chain is None:
+            self._chain = self._library.build_chain(self._choice_indices, name=self.id)
+
+        return self._chain
+
+    def __repr__(self) -> str:
+        return f"Design(id={self.id!r}, labels={self.labels!r})"
+
+
+class MesaLibrary:
+    """
+    Represents a combinatorial library of MESA chains, defined by a set of choices for every slot (e.g., all binders crossed with all TMDs).
+    Designs are enumerated lazily in a deterministic order, so design spaces with millions of members can be streamed in constant memory.
+    """
+    __slots__ = ("name", "slots", "choices", "sizes", "size", "id_width", "_filters")
+
+    def __init__(self, slots: Mapping[str, Union[Mapping[str, Choice], Iterable[Choice]]], name: str = "design") -> None:
+        """
+        Initializes a MesaLibrary.
+        :param slots: A dictionary mapping slot names (e.g., "binder", "tmd", or the name of a custom component) to their choices.
+        Choices are either given as an iterable or as a dictionary mapping labels to choices. A choice is a catalogue part name for
+        catalogue slots (tmd, protease, prs, aip, signal_peptide), a sequence for all other slots, an AnnotatedPart or None to leave the slot empty.
+        :param name: The name of the library, used as prefix of the design ids.
+        :return: None
+        :raises ValueError: If a slot has no choices or a catalogue part does not exist.
+        """
+        self.name: str = name
+        # Slots are ordered as in MESA_ORDER followed by custom slots, so the enumeration order does not depend on how they were passed.
+        self.slots: Tuple[str, ...] = tuple(sorted(slots.keys(), key=lambda slot: MESA_ORDER.index(slot) if slot in MESA_ORDER else len(MESA_ORDER)))
+        self.choices: Dict[str, Tuple[Tuple[str, ResolvedChoice], ...]] = {slot: self._resolve_choices(slot, slots[slot]) for slot in self.slots}
+        self.sizes: Tuple[int, ...] = tuple(len(self.choices[slot]) for slot in self.slots)
+        # The number of designs in the unfiltered design space.
+        self.size: int = prod(self.sizes)
+        self.id_width: int = len(str(max(self.size - 1, 0)))
+        self._filters: Tuple[Callable[[Design], bool], ...] = ()
+
+    @staticmethod
+    def _resolve_choices(slot: str, choices: Union[Mapping[str, Choice], Iterable[Choice]]) -> Tuple[Tuple[str, ResolvedChoice], ...]:
+        """
+        Labels the choices of a slot and looks up catalogue parts, so invalid choices fail before enumeration starts.
+        :param slot: The name of the slot.
+        :param choices: The choices of the slot as an iterable or a dictionary mapping labels to choices.
+        :return: A tuple of (label, resolved choice) pairs.
+        :raises ValueError: If the slot has no choices or a catalogue part does not exist.
+        """
+        labelled: List[Tuple[str, Choice]] = list(choices.items()) if isinstance(choices, Mapping) else [(None, choice) for choice in choices]
+        if not labelled:
+            raise ValueError(f"Slot '{slot}' has no choices")
+
+        resolved: List[Tuple[str, ResolvedChoice]] = []
+        for i, (label, choice) in enumerate(labelled):
+            if choice is None:
+                resolved.append((label if label else "none", None))
+
+            elif isinstance(choice, AnnotatedPart):
+                resolved.append((label if label else choice.name, choice))
+
+            elif slot in CATALOGUE_SLOTS:
+                part: Optional[CataloguePart] = PART_REGISTRY.get(choice, CATALOGUE_SLOTS[slot])
+                if part is None:
+                    raise ValueError(f"Unknown part '{choice}' for slot '{slot}'")
+                resolved.append((label if label else part.name, part))
+
+            else:
+                if not choice:
+                    raise ValueError(f"Sequence of slot '{slot}' cannot be empty")
+                resolved.append((label if label else f"{slot}_{i + 1}", choice))
+
+        return tuple(resolved)
+
+    def build_chain(self, choice_indices: Tuple[int, ...], name: Optional[str] = None) -> MesaChain:
+        """
+        Assembles the MesaChain for a combination of choices.
+        :param choice_indices: The index of the chosen option for every slot of the library.
+        :param name: An optional name for the MesaChain.
+        :return: The assembled MesaChain.
+        """
+        chain: MesaChain = MesaChain(name=name)
+        for slot, i in zip(self.slots, choice_indices):
+            choice: ResolvedChoice = self.choices[slot][i][1]
+            if choice is None:
+                continue
+
+            if isinstance(choice, AnnotatedPart):
+                chain.add_part(slot, choice)
+
+            elif isinstance(choice, CataloguePart):
+                # catalogue parts are added by name, so the chain references the shared catalogue part
+                getattr(chain, f"add_{slot}")(choice.name)
+
+            elif slot in SEQUENCE_SLOTS:
+                SEQUENCE_SLOTS[slot](chain, choice)
+
+            else:
+                chain.add_component(slot, sequence=choice, annotation=self.choices[slot][i][0])
+
+        return chain
+
+    def design(self, index: int) -> Design:
+        """
+        Retrieves a design by its position in the unfiltered design space without enumerating the preceding designs.
+        :param index: The position of the design. Negative indices count from the end.
+        :return: The Design at this position.
+        :raises IndexError: If the index is out of range.
+        """
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError("Design index out of range")
+
+        # decode the mixed radix index, the last slot changes fastest as in itertools.product
+        choice_indices: List[int] = []
+        remainder: int = index
+        for size in reversed(self.sizes):
+            remainder, i = divmod(remainder, size)
+            choice_indices.append(i)
+
+        return Design(self, index, tuple(reversed(choice_indices)))
+
+    def filter(self, predicate: Callable[[Design], bool]) -> MesaLibrary:
+        """
+        Creates a view of this library which only yields designs accepted by a predicate. Nothing is enumerated until the view is iterated.
+        :param predicate: A function receiving a Design and returning whether to keep it. Inspecting design.labels avoids assembling the chain.
+        :return: A new MesaLibrary sharing the choices of this library.
+        """
+        library: MesaLibrary = MesaLibrary.__new__(MesaLibrary)
+        for attribute in MesaLibrary.__slots__:
+            setattr(library, attribute, getattr(self, attribute))
+        library._filters = self._filters + (predicate, )
+
+        return library
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[Design]:
+        """
+        Draws a random sample of designs without replacement. Only the sampled designs are kept in memory.
+        :param k: The number of designs to draw.
+        :param seed: An optional seed, making the sample reproducible.
+        :return: The sampled designs, ordered by their index.
+        :raises ValueError: If k is negative or larger than the number of designs.
+        """
+        rng: random.Random = random.Random(seed)
+        if not self._filters:
+            return [self.design(index) for index in sorted(rng.sample(range(self.size), k))]
+
+        if k < 0:
+            raise ValueError("Sample size cannot be negative")
+
+        # reservoir sampling over the filtered designs, as their number and positions are unknown in advance
+        reservoir: List[Design] = []
+        for n, design in enumerate(self):
+            if n < k:
+                reservoir.append(design)
+            else:
+                j: int = rng.randrange(n + 1)
+                if j < k:
+                    reservoir[j] = design
+
+        if len(reservoir) < k:
+            raise ValueError("Sample larger than the number of designs")
+
+        return sorted(reservoir, key=lambda design: design.index)
+
+    def search(self, max_length: Optional[int] = None, forbidden_motifs: Iterable[str] = (), validators: Iterable[Callable[[Dict[str, str]], bool]] = ()) -> Iterator[Design]:
+        """
+        Yields all designs satisfying the constraints in the same order as iterating the library, without enumerating infeasible designs.
+        Slots are decided one at a time and constraints are checked on every partial assembly, so a violation prunes all designs sharing it.
+        Designs additionally have to pass the filters of the library.
+        :param max_length: The maximum length of the assembled amino acid sequence, including linkers.
+        :param forbidden_motifs: Amino acid motifs which must not occur anywhere in the assembled sequence (case-insensitive).
+        :param validators: Functions receiving the labels of the slots decided so far (in slot order) and returning whether the partial design is valid.
+        They must only reject a design based on the slots present in the labels, e.g. lambda labels: labels.get("tmd", "FGFR4").startswith("FGFR").
+        :return: An iterator over the feasible designs.
+        """
+        motifs: Tuple[str, ...] = tuple(motif.upper() for motif in forbidden_motifs if motif)
+        validators = tuple(validators)
+        slot_count: int = len(self.slots)
+
+        # choices whose own sequence contains a forbidden motif can never be part of a feasible design
+        options: List[List[Tuple[int, Optional[str]]]] = []
+        for slot in self.slots:
+            sequences = ((i, _choice_sequence(choice)) for i, (_, choice) in enumerate(self.choices[slot]))
+            options.append([(i, sequence) for i, sequence in sequences if sequence is None or not any(motif in sequence for motif in motifs)])
+
+        if not all(options):
+            return
+
+        # only slots in MESA_ORDER are assembled, custom slots are kept in the chain's parts only
+        assembled: Tuple[bool, ...] = tuple(slot in MESA_ORDER for slot in self.slots)
+        # lower bound of the length added by the remaining slots and the components which may still be added after each depth
+        remaining_length: List[int] = [0] * (slot_count + 1)
+        remaining_components: List[FrozenSet[str]] = [frozenset()] * (slot_count + 1)
+        for depth in reversed(range(slot_count)):
+            present: bool = assembled[depth] and any(sequence is not None for _, sequence in options[depth])
+            remaining_length[depth] = remaining_length[depth + 1] + (min(len(sequence) if sequence is not None else 0 for _, sequence in options[depth]) if assembled[depth] else 0)
+            remaining_components[depth] = remaining_components[depth + 1] | ({self.slots[depth]} if present else set())
+
+        # the weight of every slot in the mixed radix design index, so results keep the ids they have when iterating the library
+        weights: List[int] = [prod(self.sizes[depth + 1:]) for depth in range(slot_count)]
+
+        def is_feasible(depth: int, sequences: List[Optional[str]], labels: Dict[str, str]) -> bool:
+            # the suffix of a component is known once it is the same whether or not the remaining components are added
+            components: set = {slot for slot, sequence, included in zip(self.slots, sequences, assembled) if included and sequence is not None}
+            fewest: Dict[str, str] = get_linker_suffixes(components)
+            most: Dict[str, str] = get_linker_suffixes(components | remaining_components[depth + 1])
+
+            # collect the contiguous known segments of the partial assembly, separated by suffixes which are not known yet
+            segments: List[str] = [""]
+            length: int = 0
+            for slot, sequence, included in zip(self.slots, sequences, assembled):
+                if not included or sequence is None:
+                    continue
+                segments[-1] += sequence
+                length += len(sequence)
+                if fewest.get(slot, "") == most.get(slot, ""):
+                    segments[-1] += fewest.get(slot, "")
+                    length += len(fewest.get(slot, ""))
+                else:
+                    segments.append("")
+
+            if max_length is not None and length + remaining_length[depth + 1] > max_length:
+                return False
+
+            if any(motif in segment for segment in segments for motif in motifs):
+                return False
+
+            return all(validator(labels) for validator in validators)
+
+        def visit(depth: int, choice_indices: List[int], sequences: List[Optional[str]], labels: Dict[str, str], index: int) -> Iterator[Design]:
+            if depth == slot_count:
+                design: Design = Design(self, index, tuple(choice_indices))
+                # check the exact assembled sequence, as junctions and the starting Methionine are only known now
+                sequence: str = design.chain.get_sequence()
+                if max_length is not None and len(sequence) > max_length:
+                    return
+                if any(motif in sequence for motif in motifs):
+                    return
+                if all(predicate(design) for predicate in self._filters):
+                    yield design
+                return
+
+            slot: str = self.slots[depth]
+            for i, sequence in options[depth]:
+                choice_indices.append(i)
+                sequences.append(sequence)
+                labels[slot] = self.choices[slot][i][0]
+                if is_feasible(depth, sequences, labels):
+                    yield from visit(depth + 1, choice_indices, sequences, labels, index + i * weights[depth])
+                choice_indices.pop()
+                sequences.pop()
+                del labels[slot]
+
+        yield from visit(0, [], [], {}, 0)
+
+    def top(self, k: int, score: Callable[[Design], float], **constraints) -> List[Design]:
+        """
+        Retrieves the best scoring feasible designs. Only the k best designs are kept in a bounded heap while searching.
+        :param k: The number of designs to retrieve.
+        :param score: A function receiving a Design and returning its score, higher is better.
+        :param constraints: Constraints passed to search (max_length, forbidden_motifs, validators).
+        :return: Up to k designs, ordered by descending score. Ties are ordered by their index.
+        :raises ValueError: If k is negative.
+        """
+        if k < 0:
+            raise ValueError("Number of designs cannot be negative")
+        if k == 0:
+            return []
+
+        heap: List[Tuple[float, int, Design]] = []
+        for design in self.search(**constraints):
+            # the negated index keeps the earlier design on ties
+            entry: Tuple[float, int, Design] = (score(design), -design.index, design)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        return [design for _, _, design in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __iter__(self) -> Iterator[Design]:
+        for index, choice_indices in enumerate(product(*(range(size) for size in self.sizes))):
+            design: Design = Design(self, index, choice_indices)
+            if all(predicate(design) for predicate in self._filters):
+                yield design
+
+    def __len__(self) -> int:
+        # filtered libraries have to be enumerated to be counted, which still happens in constant memory
+        if not self._filters:
+            return self.size
+
+        return sum(1 for _ in self)
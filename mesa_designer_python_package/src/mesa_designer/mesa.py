@@ -1,8 +1,15 @@
 from __future__ import annotations
-import copy
-from typing import Dict, List, Optional, Any
-from .part import AnnotatedPart, Annotation
-from mesa_designer import TMD_DATA, AIP_DATA, SIGNAL_SEQS, NTEV_DATA, CTEV_DATA, TEVP_DATA, PRS_DATA, FRET_ICDs
+from functools import lru_cache
+from hashlib import sha256
+import json
+from typing import Dict, List, Optional, Tuple
+from .part import AnnotatedPart, Annotation, FrozenAnnotatedPart, FrozenAnnotation
+from .catalogue import CATALOGUE, DATA_ATTRIBUTES
+from .registry import PART_REGISTRY, PROTEASE_FAMILIES, CataloguePart
+
+# Lists the public names explicitly. The data attributes (e.g., TMD_DATA) are included, so star imports keep providing them through __getattr__.
+__all__ = ["MESA_ORDER", "FINGERPRINT_VERSION", "MesaChain", "MesaAssembly", "get_catalogue_part", "get_linker_suffixes",
+           "AnnotatedPart", "Annotation", "FrozenAnnotatedPart", "FrozenAnnotation", *DATA_ATTRIBUTES]
 
 # Defines the canonical order of components within a MESA chain for assembly and annotation purposes.
 MESA_ORDER: List[str] = ["signal_peptide",
@@ -16,12 +23,61 @@ MESA_ORDER: List[str] = ["signal_peptide",
                          "cargo",
                          "aip"]
 
+# The version of the fingerprint format, which has to be increased whenever the assembly rules (e.g., the linkers) change,
+# so fingerprints of chains assembled by older versions are not mistaken for current ones.
+FINGERPRINT_VERSION: int = 1
+
+
+@lru_cache(maxsize=None)
+def get_catalogue_part(part: CataloguePart, name: str, annotation: Optional[str] = None) -> FrozenAnnotatedPart:
+    """
+    Retrieves the shared, read-only AnnotatedPart of a catalogue part. Only a single instance is created per part, name and annotation,
+    so chains hold references to it instead of creating their own copies.
+    :param part: The CataloguePart from the PART_REGISTRY.
+    :param name: The name of the resulting part.
+    :param annotation: The name of the part's annotation. Defaults to 'name'.
+    :return: The shared FrozenAnnotatedPart.
+    """
+    return FrozenAnnotatedPart(sequence=part.protein,
+                               name=name,
+                               seq_annotations=[FrozenAnnotation(annotation if annotation else name, sequence=part.protein)],
+                               catalogue_key=(part.family, part.name))
+
+
+def get_linker_suffixes(components: set) -> Dict[str, str]:
+    """
+    Determines the linkers (GGGSGGGS) and terminators following each component, which depend on the other components present in a chain.
+    :param components: The names of all components present in the chain.
+    :return: A dictionary mapping component names to the sequence following them. Components without a suffix are omitted.
+    """
+    return {
+        # Add linker after binder if no explicit TMD linker is present.
+        "binder": "GGGSGGGS" if "tmd_linker" not in components else "",
+        # Add linker after TMD.
+        "tmd": "GGGSGGGS",
+        # Add linker after protease if PRS, cargo, or AIP are present.
+        "protease": "GGGSGGGS" if "prs" in components or "cargo" in components or "aip" in components else "",
+        # Add linker after PRS if cargo is present.
+        "prs": "GGGSGGGS" if "cargo" in components else "",
+        # Add linker after cargo if AIP is present and a stop codon (*) after cargo.
+        "cargo": ("GGGSGGGS" if "aip" in components else "") + "*"
+    }
+
+
+def __getattr__(name: str) -> dict:
+    # resolves the data attributes (e.g., TMD_DATA) from the catalogue, the same objects as the attributes of mesa_designer
+    if name in DATA_ATTRIBUTES:
+        return CATALOGUE[DATA_ATTRIBUTES[name]]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class MesaChain:
     """
     Represents a single MESA (Modularized Extracellular Sensing Assembly) chain,
     composed of various biological parts in a defined order.
     """
+
     def __init__(self, name: Optional[str] = None) -> None:
         """
         Initializes a new MesaChain instance.
@@ -32,10 +88,26 @@ class MesaChain:
         # A dictionary to store the individual AnnotatedPart components of the chain,
         # where keys are component names (e.g., "binder", "tmd") and values are AnnotatedPart objects.
         self.parts: Dict[str, AnnotatedPart] = {}
+        # The assembled sequence and the (annotation, offset) pairs of all components, cached by to_annotated_part.
+        self._assembly: Optional[Tuple[str, Tuple[Tuple[Annotation, int], ...]]] = None
+        # The name and GenBank string of the last export, cached by to_genbank_string and save_genbank_file.
+        self._genbank: Optional[Tuple[str, str]] = None
+
+    def clear_cache(self) -> MesaChain:
+        """
+        Clears the cached assembly and GenBank export of the chain. This is done automatically by all methods modifying the chain
+        and only has to be called after modifying the parts returned by get_parts directly.
+        :return: The MesaChain instance, allowing for method chaining.
+        """
+        self._assembly = None
+        self._genbank = None
+
+        return self
 
     def get_parts(self) -> Dict[str, AnnotatedPart]:
         """
         Retrieves the dictionary of parts currently comprising this MESA chain.
+        If the parts are modified directly, clear_cache has to be called afterwards.
         :return: A dictionary where keys are component names and values are AnnotatedPart objects.
         """
         return self.parts
@@ -58,6 +130,8 @@ class MesaChain:
                                              name=name if name else "Binder",
                                              seq_annotations=[Annotation("Binder" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_tmd_linker(self, sequence: Optional[str] = None, name: Optional[str] = None, annotation: Optional[str] = None) -> MesaChain:
@@ -77,27 +151,25 @@ class MesaChain:
                                                  name=name if name else "TMD Linker",
                                                  seq_annotations=[Annotation("Linker" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_protease(self, protease_name: str) -> MesaChain:
         """
         Adds a predefined protease component to the MESA chain.
-        :param protease_name: The name of the protease to add (must be in NTEV_DATA, CTEV_DATA, or TEVP_DATA).
+        :param protease_name: The name of the protease to add. Case-insensitive, must be found in NTEV_DATA, CTEV_DATA, or TEVP_DATA.
         :return: The MesaChain instance, allowing for method chaining.
         :raises ValueError: If the protease_name is not found in the predefined protease data.
         """
-        proteases: Dict[str, Any] = NTEV_DATA
-        proteases.update(CTEV_DATA)
-        proteases.update(TEVP_DATA)
-
-        if protease_name not in proteases.keys():
+        protease: Optional[CataloguePart] = PART_REGISTRY.get(protease_name, PROTEASE_FAMILIES)
+        if protease is None:
             raise ValueError(
                 f"{protease_name} is not a valid Protease name. Please only use available NTEV, CTEV or TEVP names")
 
-        # The sequence is assumed to be the second element (index 1) in the protease data tuple/list.
-        self.parts["protease"] = AnnotatedPart(sequence=proteases[protease_name][1],
-                                               name=protease_name,
-                                               seq_annotations=[Annotation(name=protease_name, sequence=proteases[protease_name][1])])
+        self.parts["protease"] = get_catalogue_part(protease, protease.name)
+
+        self.clear_cache()
 
         return self
 
@@ -119,25 +191,27 @@ class MesaChain:
                                                name=name if name else "Protease",
                                                seq_annotations=[Annotation("Protease" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_prs(self, prs_name: Optional[str] = None) -> MesaChain:
         """
         Adds a predefined Protease Recognition Site (PRS) component to the MESA chain.
-        :param prs_name: The name of the PRS to add. If None, defaults to "PRS". Must be found in PRS_DATA.
+        :param prs_name: The name of the PRS to add. If None, defaults to "PRS". Case-insensitive, must be found in PRS_DATA.
         :return: The MesaChain instance, allowing for method chaining.
         :raises ValueError: If the prs_name is not found in the predefined PRS data.
         """
         if not prs_name:
             prs_name = "PRS"
 
-        if prs_name not in PRS_DATA.keys():
+        prs: Optional[CataloguePart] = PART_REGISTRY.get(prs_name, "prs")
+        if prs is None:
             raise ValueError(f"{prs_name} is not a valid PRS name. Please only use available PRS names")
 
-        # The sequence is assumed to be the second element (index 1) in the PRS data tuple/list.
-        self.parts["prs"] = AnnotatedPart(sequence=PRS_DATA[prs_name][1],
-                                          name=prs_name,
-                                          seq_annotations=[Annotation(prs_name, sequence=PRS_DATA[prs_name][1])])
+        self.parts["prs"] = get_catalogue_part(prs, prs.name)
+
+        self.clear_cache()
 
         return self
 
@@ -159,6 +233,8 @@ class MesaChain:
                                           name=name if name else "PRS",
                                           seq_annotations=[Annotation(name="PRS" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_cargo(self, sequence: str, name: Optional[str] = None, annotation: Optional[str] = None) -> MesaChain:
@@ -179,6 +255,8 @@ class MesaChain:
                                             name=name if name else "Cargo",
                                             seq_annotations=[Annotation(name="Cargo" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_tmd(self, tmd_name: str) -> MesaChain:
@@ -188,15 +266,14 @@ class MesaChain:
         :return: The MesaChain instance, allowing for method chaining.
         :raises ValueError: If the tmd_name is not found in the predefined TMD data.
         """
-        tmd_name = tmd_name.upper()
-        if tmd_name not in TMD_DATA.keys():
+        tmd: Optional[CataloguePart] = PART_REGISTRY.get(tmd_name, "tmd")
+        if tmd is None:
             raise ValueError(
                 f"{tmd_name} is not a valid TMD name. Please only use available TMD names or use a custom TMD")
 
-        # The sequence is assumed to be the second element (index 1) in the TMD data tuple/list.
-        self.parts["tmd"] = AnnotatedPart(sequence=TMD_DATA[tmd_name][1],
-                                          name=f"{tmd_name}_TMD",
-                                          seq_annotations=[Annotation(f"{tmd_name}_TMD", sequence=TMD_DATA[tmd_name][1])])
+        self.parts["tmd"] = get_catalogue_part(tmd, f"{tmd.name}_TMD")
+
+        self.clear_cache()
 
         return self
 
@@ -218,6 +295,8 @@ class MesaChain:
                                           name=name if name else "TMD",
                                           seq_annotations=[Annotation(f"{name}_TMD" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_signal_peptide(self, peptide_name: Optional[str] = None) -> MesaChain:
@@ -230,15 +309,14 @@ class MesaChain:
         if not peptide_name:
             peptide_name = "CD4"
 
-        peptide_name = peptide_name.upper()
-        if peptide_name not in SIGNAL_SEQS.keys():
+        peptide: Optional[CataloguePart] = PART_REGISTRY.get(peptide_name, "signal")
+        if peptide is None:
             raise ValueError(
                 f"{peptide_name} is not a valid peptide name. Please only use available peptide names or use a custom peptide sequence")
 
-        # The sequence is assumed to be the second element (index 1) in the signal sequence data tuple/list.
-        self.parts["signal_peptide"] = AnnotatedPart(sequence=SIGNAL_SEQS[peptide_name][1],
-                                                     name=f"{peptide_name}_Signal_Peptide",
-                                                     seq_annotations=[Annotation(f"{peptide_name}_Signal_Peptide", sequence=SIGNAL_SEQS[peptide_name][1])])
+        self.parts["signal_peptide"] = get_catalogue_part(peptide, f"{peptide.name}_Signal_Peptide")
+
+        self.clear_cache()
 
         return self
 
@@ -260,6 +338,8 @@ class MesaChain:
                                                      name=name if name else "Signal_Peptide",
                                                      seq_annotations=[Annotation(f"{annotation}_Signal_Peptide" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_aip(self, aip_name: str) -> MesaChain:
@@ -269,15 +349,14 @@ class MesaChain:
         :return: The MesaChain instance, allowing for method chaining.
         :raises ValueError: If the aip_name is not found in the predefined AIP data.
         """
-        aip_name = aip_name.upper()
-        if aip_name not in AIP_DATA.keys():
+        aip: Optional[CataloguePart] = PART_REGISTRY.get(aip_name, "aip")
+        if aip is None:
             raise ValueError(
                 f"{aip_name} is not a valid AIP name. Please only use available AIP names or use a custom AIP")
 
-        # The sequence is assumed to be the second element (index 1) in the AIP data tuple/list.
-        self.parts["aip"] = AnnotatedPart(sequence=AIP_DATA[aip_name][1],
-                                          name=f"{aip_name}_AIP",
-                                          seq_annotations=[Annotation(f"{aip_name}_AIP", sequence=AIP_DATA[aip_name][1])])
+        self.parts["aip"] = get_catalogue_part(aip, f"{aip.name}_AIP")
+
+        self.clear_cache()
 
         return self
 
@@ -299,6 +378,8 @@ class MesaChain:
                                           name=name,
                                           seq_annotations=[Annotation(f"{name}_AIP" if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_component(self, name: str, sequence: str, part_id: Optional[str] = None, description: Optional[str] = None, annotation: Optional[str] = None) -> MesaChain:
@@ -326,6 +407,8 @@ class MesaChain:
                                                           description=description if description else name,
                                                           seq_annotations=[Annotation(name if not annotation else annotation, sequence=sequence)])
 
+        self.clear_cache()
+
         return self
 
     def add_part(self, name: str, annotated_part: AnnotatedPart) -> MesaChain:
@@ -344,6 +427,8 @@ class MesaChain:
 
         self.parts[name] = annotated_part
 
+        self.clear_cache()
+
         return self
 
     def remove_component(self, component: str) -> MesaChain:
@@ -362,8 +447,17 @@ class MesaChain:
         else:
             raise ValueError("Component not in current MESA Chain")
 
+        self.clear_cache()
+
         return self
 
+    def get_sequence(self) -> str:
+        """
+        Retrieves the assembled amino acid sequence of the chain, including linkers and the starting Methionine.
+        :return: The assembled sequence, as used by to_annotated_part.
+        """
+        return self._assemble()[0]
+
     def to_annotated_part(self, name: str, part_id: Optional[str] = None, description: Optional[str] = None) -> AnnotatedPart:
         """
         Converts the MesaChain into a single AnnotatedPart, concatenating all its components
@@ -373,54 +467,10 @@ class MesaChain:
         :param description: An optional description for the resulting AnnotatedPart. Defaults to 'name'.
         :return: A single AnnotatedPart representing the entire MESA chain.
         """
-        temp: MesaChain = copy.deepcopy(self)
+        sequence, offsets = self._assemble()
 
-        sequence: str = ""
-        seq_annotations: List[Annotation] = []
-        for component in MESA_ORDER:
-            if component in temp.parts.keys():
-                # Shift annotations of the current part to their correct position in the concatenated sequence.
-                # get_annotations()[0] assumes each AnnotatedPart in self.parts has at least one annotation.
-                seq_annotations.append(temp.parts[component].get_annotations()[0].shift_annotation(len(sequence)))
-                # Concatenate the sequence of the current part.
-                sequence += temp.parts[component].get_sequence()
-
-                # Conditionally add short linker sequences (GGGSGGGS) between specific components.
-                match component:
-                    case "binder":
-                        # Add linker after binder if no explicit TMD linker is present.
-                        if "tmd_linker" not in temp.parts.keys():
-                            sequence += "GGGSGGGS"
-
-                    case "tmd":
-                        # Add linker after TMD.
-                        sequence += "GGGSGGGS"
-
-                    case "protease":
-                        # Add linker after protease if PRS, cargo, or AIP are present.
-                        if "prs" in temp.parts.keys() or "cargo" in temp.parts.keys() or "aip" in temp.parts.keys():
-                            sequence += "GGGSGGGS"
-
-                    case "prs":
-                        # Add linker after PRS if cargo is present.
-                        if "cargo" in temp.parts.keys():
-                            sequence += "GGGSGGGS"
-
-                    case "cargo":
-                        # Add linker after cargo if AIP is present.
-                        if "aip" in temp.parts.keys():
-                            sequence += "GGGSGGGS"
-
-                        # Add a stop codon (*) after cargo.
-                        sequence += "*"
-
-        # Ensure the final sequence starts with a Methionine (M) and adjust annotations if necessary.
-        if not sequence.startswith("M"):
-            sequence = "M" + sequence
-            for annotation in seq_annotations:
-                annotation.shift_annotation(1)  # Shift all existing annotations by 1 due to added 'M'.
-
-        sequence = sequence.upper()
+        # Create shifted copies of the annotations, leaving the annotations of the parts unchanged.
+        seq_annotations: List[Annotation] = [annotation.shifted(offset) for annotation, offset in offsets]
 
         return AnnotatedPart(sequence=sequence,
                              name=name,
@@ -428,13 +478,74 @@ class MesaChain:
                              description=description if description else name,
                              seq_annotations=seq_annotations)
 
+    def _assemble(self) -> Tuple[str, Tuple[Tuple[Annotation, int], ...]]:
+        """
+        Assembles the sequence of the chain and determines the offset of every component's annotation.
+        The result is cached until the chain is modified.
+        :return: A tuple of the assembled sequence and (annotation, offset) pairs in MESA_ORDER.
+        """
+        if self._assembly is not None:
+            return self._assembly
+
+        components: set = set(self.parts.keys())
+        suffixes: Dict[str, str] = get_linker_suffixes(components)
+
+        # Collect all sequence segments in a single pass and record where each component starts in the concatenated sequence.
+        segments: List[str] = []
+        offsets: List[tuple] = []
+        length: int = 0
+        for component in MESA_ORDER:
+            if component in components:
+                part: AnnotatedPart = self.parts[component]
+                offsets.append((part, length))
+                for segment in (part.get_sequence(), suffixes.get(component, "")):
+                    segments.append(segment)
+                    length += len(segment)
+
+        sequence: str = "".join(segments)
+
+        # Ensure the final sequence starts with a Methionine (M) and shift all annotations by 1 if it has to be added.
+        start_offset: int = 0
+        if not sequence.startswith("M"):
+            sequence = "M" + sequence
+            start_offset = 1
+
+        # get_annotations()[0] assumes each AnnotatedPart in self.parts has at least one annotation.
+        self._assembly = (sequence.upper(), tuple((part.get_annotations()[0], offset + start_offset) for part, offset in offsets))
+
+        return self._assembly
+
+    def fingerprint(self) -> str:
+        """
+        Computes a content-addressed fingerprint of the chain from its assembled sequence and annotations, which result from the ordered parts
+        and the linker rules. Chains built by different routes (e.g., in different sessions or from catalogue or custom parts) share a fingerprint
+        exactly if they assemble to the same sequence and annotations. The name of the chain is not included.
+        :return: The SHA-256 fingerprint as hexadecimal string.
+        """
+        sequence, offsets = self._assemble()
+        content: list = [FINGERPRINT_VERSION, sequence, [[annotation.name, annotation.type, annotation.start + offset, annotation.stop + offset] for annotation, offset in offsets]]
+
+        return sha256(json.dumps(content, separators=(",", ":")).encode()).hexdigest()
+
     def to_genbank_string(self) -> str:
         """
         Converts the MesaChain into a GenBank formatted string.
         :return: A string representation of the MesaChain in GenBank format.
         """
-        # Converts the chain to an AnnotatedPart and then calls its to_genbank_string method.
-        return self.to_annotated_part(name="mesa_chain").to_genbank_string()
+        return self._to_genbank_string(name="mesa_chain")
+
+    def _to_genbank_string(self, name: str) -> str:
+        """
+        Converts the MesaChain into a GenBank formatted string. The string of the last export is returned
+        without converting the chain again if the chain and name are unchanged.
+        :param name: The name of the construct within the GenBank record.
+        :return: A string representation of the MesaChain in GenBank format.
+        """
+        if self._genbank is None or self._genbank[0] != name:
+            # Converts the chain to an AnnotatedPart and then calls its to_genbank_string method.
+            self._genbank = (name, self.to_annotated_part(name=name).to_genbank_string())
+
+        return self._genbank[1]
 
     def save_genbank_file(self, file_path: str, name: Optional[str] = None) -> None:
         """
@@ -444,8 +555,9 @@ class MesaChain:
         :return: None
         """
         # Derives the name for the AnnotatedPart from the file path if not provided.
-        # Then converts to an AnnotatedPart and saves it.
-        self.to_annotated_part(name=name if name else file_path.split("/")[-1].split(".")[-2]).save_genbank_file(file_path)
+        content: str = self._to_genbank_string(name=name if name else file_path.split("/")[-1].split(".")[-2])
+        with open(file_path, "w") as f:
+            f.write(content)
 
     def to_fret_chains(self) -> 'MesaAssembly':
         """
@@ -456,16 +568,15 @@ class MesaChain:
         :return: A MesaAssembly containing the two FRET-modified MesaChains.
         """
         chains: MesaAssembly = MesaAssembly()
-        chain: MesaChain = copy.deepcopy(self)
         # Remove components that are usually cleaved off or not relevant for FRET constructs.
-        for component in {"protease", "cargo", "prs", "aip"}:
-            if component in chain.parts.keys():
-                chain.remove_component(component)
+        # The remaining parts are shared with this chain instead of copied, as assembling a chain does not modify its parts.
+        base_parts: Dict[str, AnnotatedPart] = {component: part for component, part in self.parts.items() if component not in {"protease", "cargo", "prs", "aip"}}
 
-        # Create the mVenus FRET chain.
-        chains.set_chain("mVenus", copy.deepcopy(chain).add_component("fret", sequence=FRET_ICDs["mVenus"][1], annotation="mVenus"))
-        # Create the mCerulean FRET chain (using the modified base chain, then adding mCerulean).
-        chains.set_chain("mCerulean", chain.add_component("fret", sequence=FRET_ICDs["mCerulean"][1], annotation="mCerulean"))
+        # Create the mVenus and mCerulean FRET chains, each with its own parts dictionary.
+        for fret_name in ("mVenus", "mCerulean"):
+            chain: MesaChain = MesaChain(name=self.name)
+            chain.parts = dict(base_parts)
+            chains.set_chain(fret_name, chain.add_part("fret", get_catalogue_part(PART_REGISTRY.get(fret_name, "fret"), "fret", fret_name)))
 
         return chains
 
@@ -475,6 +586,7 @@ class MesaAssembly:
     Represents an assembly of multiple MesaChain objects, typically used for managing
     related constructs, such as FRET pairs.
     """
+
     def __init__(self, mesa_chains: Optional[Dict[str, MesaChain]] = None) -> None:
         """
         Initializes a new MesaAssembly instance.
@@ -498,6 +610,15 @@ class MesaAssembly:
 
         return self
 
+    def fingerprint(self) -> str:
+        """
+        Computes a content-addressed fingerprint of the assembly from the names and fingerprints of its chains, in order.
+        :return: The SHA-256 fingerprint as hexadecimal string.
+        """
+        content: list = [FINGERPRINT_VERSION, [[name, mesa_chain.fingerprint()] for name, mesa_chain in self.mesa_chains.items()]]
+
+        return sha256(json.dumps(content, separators=(",", ":")).encode()).hexdigest()
+
     def to_genbank_strings(self) -> Dict[str, str]:
         """
         Converts all MesaChain objects in the assembly into a dictionary of GenBank formatted strings.
@@ -1,10 +1,23 @@
 from __future__ import annotations
-from Bio import SeqIO
-from Bio.SeqFeature import SeqFeature, FeatureLocation
-from Bio.SeqRecord import SeqRecord
-from Bio.Seq import Seq
+from functools import lru_cache
 from io import StringIO
-from typing import Optional, List
+from string import ascii_letters, digits
+from struct import Struct
+from typing import Optional, List, TextIO, Tuple, TYPE_CHECKING
+
+# Biopython is only imported when a SeqRecord is needed (FASTA export and GenBank records format_genbank does not support),
+# as importing it takes most of the import time of mesa_designer.
+if TYPE_CHECKING:
+    from Bio.SeqFeature import SeqFeature
+    from Bio.SeqRecord import SeqRecord
+
+# Defines the supported output formats.
+RECORD_FORMATS: Tuple[str, ...] = ("genbank", "fasta")
+
+# Characters Biopython allows in feature keys without warning.
+GENBANK_FEATURE_KEY_CHARS: frozenset = frozenset(ascii_letters + digits + "_-'*")
+# The constant lines of a GenBank record without keywords, source and organism (as written by Biopython).
+GENBANK_SOURCE_LINES: str = "KEYWORDS    .\nSOURCE      .\n  ORGANISM  .\n            .\nFEATURES             Location/Qualifiers\n"
 
 
 class Annotation:
@@ -12,6 +25,8 @@ class Annotation:
     Represents an annotation for a biological sequence part,
     detailing its name, type, and genomic coordinates.
     """
+    __slots__ = ("name", "start", "stop", "type")
+
     def __init__(self, name: str, sequence: str, start: Optional[int] = None, stop: Optional[int] = None, part_type: Optional[str] = None) -> None:
         """
         Initializes an Annotation object.
@@ -40,6 +55,15 @@ class Annotation:
 
         return self
 
+    def shifted(self, amount: int) -> Annotation:
+        """
+        Creates a copy of the annotation with its start and stop positions shifted by a specified amount.
+        Unlike shift_annotation, the original annotation is left unchanged, so parts can be assembled repeatedly without copying them.
+        :param amount: The integer value by which to shift the annotation. A positive value shifts it downstream, a negative value upstream.
+        :return: A new Annotation object with the shifted 'start' and 'stop' attributes.
+        """
+        return Annotation(self.name, sequence="", start=self.start + amount, stop=self.stop + amount, part_type=self.type)
+
     def to_seq_feature(self) -> SeqFeature:
         """
         Converts the annotation into a Biopython SeqFeature object.
@@ -47,6 +71,8 @@ class Annotation:
         and output functionalities, such as generating GenBank files.
         :return: A Biopython `Bio.SeqFeature.SeqFeature` object representing this annotation. It includes the location, type, and the annotation's name as a qualifier.
         """
+        from Bio.SeqFeature import SeqFeature, FeatureLocation
+
         return SeqFeature(location=FeatureLocation(self.start, self.stop), type=self.type, qualifiers={"name": self.name})
 
 
@@ -56,6 +82,8 @@ class AnnotatedPart:
     This class provides methods to manage these annotations and convert the part into
     Biopython SeqRecord objects for GenBank output.
     """
+    __slots__ = ("sequence", "annotations", "name", "part_id", "description")
+
     def __init__(self, sequence: str, name: str, part_id: Optional[str] = None, description: Optional[str] = None, seq_annotations: Optional[List[Annotation]] = None) -> None:
         """
         Initializes an AnnotatedPart object.
@@ -141,18 +169,47 @@ class AnnotatedPart:
         in a format suitable for bioinformatics operations and file output.
         :return: A Biopython `Bio.SeqRecord.SeqRecord` object.
         """
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+
         return SeqRecord(Seq(self.sequence), id=self.part_id, name=self.name, description=self.description, features=[
             annotation.to_seq_feature() for annotation in self.annotations], annotations={"molecule_type": "PROTEIN"})
 
     def to_genbank_string(self) -> str:
         """
         Generates a GenBank formatted string representation of this AnnotatedPart.
+        Records are formatted natively by format_genbank, identical to Biopython's output. Records it does not support are written by Biopython.
         :return: A string containing the GenBank record.
         """
+        record: Optional[str] = format_genbank(self)
+        if record is not None:
+            return record
+
+        from Bio import SeqIO
+
         f: StringIO = StringIO()
         SeqIO.write(self.get_seq_record(), f, "genbank")
         return f.getvalue()
 
+    def write(self, handle: TextIO, file_format: str = "genbank") -> None:
+        """
+        Writes this AnnotatedPart as a single record directly to an open text handle, without building the record as a string first.
+        Writing multiple parts to the same handle results in a valid multi-record file.
+        :param handle: The text handle to write to (e.g., an open file or gzip stream).
+        :param file_format: The output format, either "genbank" or "fasta".
+        :return: None
+        :raises ValueError: If the format is not supported.
+        """
+        if file_format not in RECORD_FORMATS:
+            raise ValueError(f"Unsupported format '{file_format}', choose one of: {', '.join(RECORD_FORMATS)}")
+
+        if file_format == "genbank":
+            handle.write(self.to_genbank_string())
+        else:
+            from Bio.SeqIO.FastaIO import FastaWriter
+
+            FastaWriter(handle).write_record(self.get_seq_record())
+
     def save_genbank_file(self, file_path: str) -> None:
         """
         Saves the GenBank formatted string of this AnnotatedPart to a specified file.
@@ -162,3 +219,150 @@ class AnnotatedPart:
         content: str = self.to_genbank_string()
         with open(file_path, "w") as f:
             f.write(content)
+
+
+@lru_cache(maxsize=None)
+def _genbank_feature_key(feature_type: str) -> Optional[str]:
+    """
+    Formats the key column of a GenBank feature line, as written by Biopython.
+    :param feature_type: The type of the feature (e.g., "CDS").
+    :return: The feature key padded to the location column, or None if Biopython would warn about the key.
+    """
+    feature_type = feature_type.replace(" ", "_")
+    if not feature_type or len(feature_type) > 15 or not GENBANK_FEATURE_KEY_CHARS.issuperset(feature_type):
+        return None
+
+    return f"     {feature_type:<16}"
+
+
+@lru_cache(maxsize=1024)
+def _genbank_sequence_layout(chunk_count: int) -> Tuple[Struct, bytes]:
+    """
+    Creates the layout of a GenBank ORIGIN section for a sequence of chunk_count blocks of 10 letters.
+    The blocks are split off the sequence by a single struct call and placed into the lines by a single format operation,
+    which avoids slicing and joining every block in Python.
+    :param chunk_count: The number of 10 letter blocks.
+    :return: A struct splitting the padded sequence into blocks and the format string of the lines.
+    """
+    line_format: str = "".join((f"{i * 10 + 1:>9} " if i % 6 == 0 else " ") + "%s" + ("\n" if i % 6 == 5 else "") for i in range(chunk_count))
+
+    return Struct("10s" * chunk_count), line_format.encode("ascii")
+
+
+def format_genbank(part: AnnotatedPart) -> Optional[str]:
+    """
+    Formats an AnnotatedPart as a GenBank record without Biopython, producing exactly the output of SeqIO.write for the protein records
+    created by mesa_designer. Records for which Biopython would wrap lines, warn or raise (e.g., long names or descriptions,
+    invalid feature types or locations) are not supported.
+    :param part: The AnnotatedPart to format.
+    :return: The GenBank record as a string, or None if the record has to be written by Biopython.
+    """
+    locus: str = part.name
+    record_id: str = part.part_id
+    # descriptions are followed by a period and have to fit on a single line
+    definition: str = (part.description + ".").strip() if isinstance(part.description, str) else ""
+    if not (isinstance(locus, str) and isinstance(record_id, str) and definition) or locus == "<unknown name>" or part.description == "<unknown description>":
+        return None
+
+    # names with whitespace or more than 16 characters, ids which Biopython splits into accession and version and long lines are left to Biopython
+    if len(locus) > 16 or locus.split() != [locus] or "." in record_id or record_id.split() != [record_id] or len(record_id) > 68 or len(definition) > 68:
+        return None
+
+    sequence: str = part.sequence
+    if not isinstance(sequence, str) or not sequence.isascii() or " " in sequence or "\n" in sequence:
+        return None
+    length: int = len(sequence)
+
+    lines: List[str] = [f"LOCUS       {locus}{str(length).rjust(28)[len(locus):]} aa                     UNK 01-JAN-1980\n"
+                        f"DEFINITION  {definition.replace(chr(10), ' ')}\n"
+                        f"ACCESSION   {record_id}\n"
+                        f"VERSION     {record_id}\n"
+                        f"{GENBANK_SOURCE_LINES}"]
+
+    for annotation in part.annotations:
+        name, start, stop = annotation.name, annotation.start, annotation.stop
+        key: Optional[str] = _genbank_feature_key(annotation.type) if isinstance(annotation.type, str) else None
+        if key is None or type(start) is not int or type(stop) is not int or start < 0 or stop < start or not isinstance(name, str):
+            return None
+
+        # zero length features are written as the point between two letters and single letter features as a single position
+        if start + 1 < stop:
+            location: str = f"{start + 1}..{stop}"
+        elif start == stop:
+            location = f"{length}^1" if stop == length else f"{stop}^{stop + 1}"
+        else:
+            location = str(stop)
+
+        if '"' in name:
+            name = name.replace('"', '""')
+        # qualifiers longer than a line and long locations are wrapped by Biopython
+        if len(name) > 51 or len(location) > 59:
+            return None
+
+        lines.append(f'{key}{location}\n                     /name="{name}"\n')
+
+    lines.append("ORIGIN\n")
+    if length:
+        chunk_count: int = (length + 9) // 10
+        blocks, line_format = _genbank_sequence_layout(chunk_count)
+        # the last block is padded with spaces, which are removed again from the end of the last line
+        lines.append((line_format % blocks.unpack(sequence.lower().encode("ascii").ljust(chunk_count * 10))).decode("ascii").rstrip(" \n") + "\n")
+    lines.append("//\n")
+
+    return "".join(lines)
+
+
+class FrozenAnnotation(Annotation):
+    """
+    Read-only annotation used by catalogue parts, which are shared between chains.
+    Use shifted() to obtain a modifiable, shifted copy.
+    """
+    __slots__ = ("_frozen", )
+
+    def __init__(self, name: str, sequence: str, start: Optional[int] = None, stop: Optional[int] = None, part_type: Optional[str] = None) -> None:
+        """
+        Initializes a FrozenAnnotation object. The parameters are the same as for Annotation.
+        :return: None
+        """
+        super().__init__(name, sequence, start, stop, part_type)
+        self._frozen: bool = True
+
+    def __setattr__(self, key: str, value) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Cannot modify '{key}' of a catalogue annotation, as it is shared between chains. Use shifted() instead")
+
+        super().__setattr__(key, value)
+
+    def __reduce__(self):
+        # unpickling restores slots with setattr, which a frozen annotation refuses, so it is recreated through __init__ instead
+        return FrozenAnnotation, (self.name, "", self.start, self.stop, self.type)
+
+
+class FrozenAnnotatedPart(AnnotatedPart):
+    """
+    Read-only part used for catalogue parts (flyweights). A single instance exists per catalogue part and label,
+    which all chains reference instead of holding their own copies.
+    """
+    __slots__ = ("catalogue_key", "_frozen")
+
+    def __init__(self, sequence: str, name: str, part_id: Optional[str] = None, description: Optional[str] = None, seq_annotations: Optional[List[Annotation]] = None,
+                 catalogue_key: Optional[Tuple[str, str]] = None) -> None:
+        """
+        Initializes a FrozenAnnotatedPart object. The parameters are the same as for AnnotatedPart, the annotations are stored as an immutable tuple.
+        :param catalogue_key: The (family, name) of the catalogue part this part was created from, if any. Allows referencing the part
+        by its catalogue entry instead of its full sequence, e.g. when sending chains to other processes.
+        :return: None
+        """
+        super().__init__(sequence, name, part_id, description, tuple(seq_annotations) if seq_annotations is not None else ())
+        self.catalogue_key: Optional[Tuple[str, str]] = catalogue_key
+        self._frozen: bool = True
+
+    def __setattr__(self, key: str, value) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Cannot modify '{key}' of a catalogue part, as it is shared between chains. Create a new AnnotatedPart instead")
+
+        super().__setattr__(key, value)
+
+    def __reduce__(self):
+        # see FrozenAnnotation.__reduce__
+        return FrozenAnnotatedPart, (self.sequence, self.name, self.part_id, self.description, list(self.annotations), self.catalogue_key)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+from mesa_designer import ALL_DATA
+
+# Defines the part families which together form the available proteases.
+PROTEASE_FAMILIES: Tuple[str, ...] = ("ntev", "ctev", "tev")
+
+
+class CataloguePart(NamedTuple):
+    """
+    Represents an immutable part of the catalogue shipped with mesa_designer.
+    """
+    family: str
+    name: str
+    dna: str
+    protein: str
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a part name for case-insensitive lookups.
+    :param name: The part name (e.g., "GpA" or " fgfr4 ").
+    :return: The normalized part name (e.g., "GPA").
+    """
+    return name.strip().upper()
+
+
+class PartRegistry:
+    """
+    Read-only registry of all catalogue parts, which is built once and allows case-insensitive lookups in constant time.
+    Parts are stored as immutable CataloguePart tuples, so they can be shared between any number of chains without copying.
+    """
+    __slots__ = ("_families", "_parts")
+
+    def __init__(self, data: Mapping[str, Mapping[str, List[str]]]) -> None:
+        """
+        Initializes a PartRegistry from catalogue data.
+        :param data: A dictionary mapping family names (e.g., "tmd") to dictionaries mapping part names to [dna_sequence, protein_sequence] lists.
+        :return: None
+        :raises ValueError: If two parts of a family only differ in the case of their names.
+        """
+        families: Dict[str, Mapping[str, CataloguePart]] = {}
+        for family, parts in data.items():
+            family_parts: Dict[str, CataloguePart] = {}
+            for name, (dna, protein) in parts.items():
+                key: str = normalize_name(name)
+                if key in family_parts:
+                    raise ValueError(f"Duplicate part name '{name}' in family '{family}'")
+                family_parts[key] = CataloguePart(family=family, name=name, dna=dna, protein=protein)
+
+            families[family] = MappingProxyType(family_parts)
+
+        self._families: Mapping[str, Mapping[str, CataloguePart]] = MappingProxyType(families)
+        self._parts: Tuple[CataloguePart, ...] = tuple(part for family_parts in families.values() for part in family_parts.values())
+
+    def get(self, name: str, families: Union[str, Tuple[str, ...]]) -> Optional[CataloguePart]:
+        """
+        Looks up a part by its case-insensitive name within one or multiple families.
+        :param name: The name of the part.
+        :param families: The family (e.g., "tmd") or a tuple of families (e.g., PROTEASE_FAMILIES) to search in order.
+        :return: The CataloguePart, or None if no part with this name exists in the families.
+        """
+        key: str = normalize_name(name)
+        for family in ((families, ) if isinstance(families, str) else families):
+            part: Optional[CataloguePart] = self._families.get(family, {}).get(key)
+            if part is not None:
+                return part
+
+        return None
+
+    def family(self, family: str) -> Mapping[str, CataloguePart]:
+        """
+        Retrieves a read-only view of all parts of a family.
+        :param family: The name of the family (e.g., "tmd").
+        :return: A read-only mapping of normalized part names to CataloguePart objects.
+        :raises KeyError: If the family does not exist.
+        """
+        return self._families[family]
+
+    def families(self) -> Tuple[str, ...]:
+        """
+        Retrieves the names of all families in the registry.
+        :return: A tuple of family names.
+        """
+        return tuple(self._families.keys())
+
+    def __iter__(self) -> Iterator[CataloguePart]:
+        return iter(self._parts)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+
+# The registry of all parts shipped with mesa_designer, built once at import time.
+PART_REGISTRY: PartRegistry = PartRegistry(ALL_DATA)
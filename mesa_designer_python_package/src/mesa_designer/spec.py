@@ -0,0 +1,218 @@
+from __future__ import annotations
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+from .mesa import MesaAssembly, MesaChain, get_catalogue_part
+from .part import AnnotatedPart, Annotation, FrozenAnnotatedPart
+from .registry import PART_REGISTRY, CataloguePart
+
+# msgpack is an optional dependency (pip install mesa-designer[msgpack]), JSON is always available.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# The version of the serialized design documents. Documents of other versions are rejected when loading.
+SPEC_VERSION: int = 1
+# Defines the supported serialization formats.
+SPEC_FORMATS: Tuple[str, ...] = ("json", "msgpack")
+
+# A compact description of a catalogue part: ("catalogue", family, catalogue name, part name, annotation name).
+CataloguePartSpec = Tuple[str, str, str, str, Optional[str]]
+# A compact description of a custom part: ("part", sequence, name, part_id, description, ((name, start, stop, type), ...)).
+CustomPartSpec = Tuple[str, str, str, str, str, Tuple[Tuple[str, int, int, str], ...]]
+PartSpec = Union[CataloguePartSpec, CustomPartSpec]
+# A compact description of a MesaChain: (name, ((component, part spec), ...)).
+ChainSpec = Tuple[Optional[str], Tuple[Tuple[str, PartSpec], ...]]
+
+
+def part_to_spec(part: AnnotatedPart) -> PartSpec:
+    """
+    Describes a part by plain tuples of strings and integers, which are cheap to pickle and send to other processes.
+    Catalogue parts are referenced by their catalogue entry instead of their sequence.
+    :param part: The AnnotatedPart to describe.
+    :return: The part spec.
+    """
+    if isinstance(part, FrozenAnnotatedPart) and part.catalogue_key is not None:
+        family, catalogue_name = part.catalogue_key
+        # an annotation named like the part is the default of get_catalogue_part, omitting it resolves to the same shared part
+        annotation: Optional[str] = part.annotations[0].name if part.annotations else None
+        return "catalogue", family, catalogue_name, part.name, annotation if annotation != part.name else None
+
+    return ("part", part.sequence, part.name, part.part_id, part.description,
+            tuple((annotation.name, annotation.start, annotation.stop, annotation.type) for annotation in part.annotations))
+
+
+def part_from_spec(spec: PartSpec) -> AnnotatedPart:
+    """
+    Recreates a part from its spec. Catalogue parts resolve to the shared catalogue part of this process.
+    :param spec: The part spec created by part_to_spec.
+    :return: The AnnotatedPart.
+    :raises ValueError: If the spec is malformed or references a part missing from the catalogue.
+    """
+    if spec[0] == "catalogue":
+        _, family, catalogue_name, name, annotation = spec
+        part: Optional[CataloguePart] = PART_REGISTRY.get(catalogue_name, family)
+        if part is None:
+            raise ValueError(f"Unknown part '{catalogue_name}' in family '{family}'")
+        # the cache of get_catalogue_part distinguishes omitted from default arguments, so the annotation is only passed when it differs
+        return get_catalogue_part(part, name, annotation) if annotation is not None else get_catalogue_part(part, name)
+
+    if spec[0] == "part":
+        _, sequence, name, part_id, description, annotations = spec
+        return AnnotatedPart(sequence=sequence,
+                             name=name,
+                             part_id=part_id,
+                             description=description,
+                             seq_annotations=[Annotation(annotation_name, "", start, stop, annotation_type) for annotation_name, start, stop, annotation_type in annotations])
+
+    raise ValueError(f"Unknown part spec type '{spec[0]}'")
+
+
+def chain_to_spec(chain: MesaChain) -> ChainSpec:
+    """
+    Describes a MesaChain by its name and the specs of its parts.
+    :param chain: The MesaChain to describe.
+    :return: The chain spec.
+    """
+    return chain.name, tuple((component, part_to_spec(part)) for component, part in chain.parts.items())
+
+
+def chain_from_spec(spec: ChainSpec) -> MesaChain:
+    """
+    Recreates a MesaChain from its spec.
+    :param spec: The chain spec created by chain_to_spec.
+    :return: The MesaChain.
+    :raises ValueError: If a part spec is malformed or references a part missing from the catalogue.
+    """
+    name, parts = spec
+    chain: MesaChain = MesaChain(name=name)
+    for component, part_spec in parts:
+        chain.add_part(component, part_from_spec(part_spec))
+
+    return chain
+
+
+def to_document(item: Union[MesaChain, MesaAssembly]) -> Dict[str, Any]:
+    """
+    Describes a MesaChain or MesaAssembly as a versioned document of plain lists, strings and integers, which can be serialized as JSON or msgpack.
+    :param item: The MesaChain or MesaAssembly.
+    :return: The document, e.g. {"version": 1, "chain": [name, [[component, part spec], ...]]}.
+    :raises TypeError: If the item is neither a MesaChain nor a MesaAssembly.
+    """
+    if isinstance(item, MesaChain):
+        return {"version": SPEC_VERSION, "chain": chain_to_spec(item)}
+
+    if isinstance(item, MesaAssembly):
+        return {"version": SPEC_VERSION, "assembly": {name: chain_to_spec(chain) for name, chain in item.mesa_chains.items()}}
+
+    raise TypeError(f"Cannot serialize object of type {type(item).__name__}")
+
+
+def from_document(document: Dict[str, Any]) -> Union[MesaChain, MesaAssembly]:
+    """
+    Recreates a MesaChain or MesaAssembly from a document created by to_document.
+    :param document: The document.
+    :return: The MesaChain or MesaAssembly.
+    :raises ValueError: If the document has an unsupported version, is malformed or references a part missing from the catalogue.
+    """
+    if document.get("version") != SPEC_VERSION:
+        raise ValueError(f"Unsupported spec version {document.get('version')!r}, expected {SPEC_VERSION}")
+
+    if "chain" in document:
+        return chain_from_spec(document["chain"])
+
+    if "assembly" in document:
+        return MesaAssembly({name: chain_from_spec(spec) for name, spec in document["assembly"].items()})
+
+    raise ValueError("Document contains neither a chain nor an assembly")
+
+
+def _check_format(spec_format: str) -> None:
+    """
+    Validates a serialization format.
+    :param spec_format: The format, either "json" or "msgpack".
+    :return: None
+    :raises ValueError: If the format is not supported.
+    :raises ImportError: If msgpack is requested but not installed.
+    """
+    if spec_format not in SPEC_FORMATS:
+        raise ValueError(f"Unsupported format '{spec_format}', choose one of: {', '.join(SPEC_FORMATS)}")
+
+    if spec_format == "msgpack" and msgpack is None:
+        raise ImportError("The msgpack format requires the msgpack package (pip install mesa-designer[msgpack])")
+
+
+def dumps(item: Union[MesaChain, MesaAssembly], spec_format: str = "json") -> Union[str, bytes]:
+    """
+    Serializes a MesaChain or MesaAssembly.
+    :param item: The MesaChain or MesaAssembly.
+    :param spec_format: The format, either "json" (returns a string) or "msgpack" (returns bytes).
+    :return: The serialized document.
+    :raises ValueError: If the format is not supported.
+    :raises ImportError: If msgpack is requested but not installed.
+    """
+    _check_format(spec_format)
+    if spec_format == "msgpack":
+        return msgpack.packb(to_document(item))
+
+    return json.dumps(to_document(item), separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes], spec_format: str = "json") -> Union[MesaChain, MesaAssembly]:
+    """
+    Deserializes a MesaChain or MesaAssembly.
+    :param data: The serialized document.
+    :param spec_format: The format, either "json" or "msgpack".
+    :return: The MesaChain or MesaAssembly.
+    :raises ValueError: If the format is not supported or the document is invalid.
+    :raises ImportError: If msgpack is requested but not installed.
+    """
+    _check_format(spec_format)
+    if spec_format == "msgpack":
+        return from_document(msgpack.unpackb(data))
+
+    return from_document(json.loads(data))
+
+
+def dump_all(items: Iterable[Union[MesaChain, MesaAssembly]], handle: Union[TextIO, BinaryIO], spec_format: str = "json") -> int:
+    """
+    Streams many chains or assemblies to a handle, as JSON lines (one document per line, text handle) or as consecutive msgpack documents (binary handle).
+    :param items: An iterable of MesaChains and MesaAssemblies.
+    :param handle: The open handle to write to.
+    :param spec_format: The format, either "json" or "msgpack".
+    :return: The number of documents written.
+    :raises ValueError: If the format is not supported.
+    :raises ImportError: If msgpack is requested but not installed.
+    """
+    _check_format(spec_format)
+    # the encoder is created once for all documents instead of once per document as by json.dumps
+    encode = msgpack.Packer().pack if spec_format == "msgpack" else json.JSONEncoder(separators=(",", ":")).encode
+    # msgpack documents delimit themselves and are written as bytes, JSON lines are text
+    newline: Union[str, bytes] = b"" if spec_format == "msgpack" else "\n"
+
+    count: int = 0
+    for item in items:
+        handle.write(encode(to_document(item)) + newline)
+        count += 1
+
+    return count
+
+
+def load_all(handle: Union[TextIO, BinaryIO], spec_format: str = "json") -> Iterator[Union[MesaChain, MesaAssembly]]:
+    """
+    Streams the chains and assemblies written by dump_all from a handle, one document at a time.
+    :param handle: The open handle to read from (text for JSON lines, binary for msgpack).
+    :param spec_format: The format, either "json" or "msgpack".
+    :return: An iterator over the MesaChains and MesaAssemblies.
+    :raises ValueError: If the format is not supported or a document is invalid.
+    :raises ImportError: If msgpack is requested but not installed.
+    """
+    _check_format(spec_format)
+    if spec_format == "msgpack":
+        for document in msgpack.Unpacker(handle):
+            yield from_document(document)
+        return
+
+    for line in handle:
+        if line.strip():
+            yield from_document(json.loads(line))
@@ -0,0 +1,153 @@
+from __future__ import annotations
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable, List, Optional, Tuple, Union
+
+# The fraction of the size limit an eviction shrinks the store to, so the next writes do not immediately trigger another eviction.
+EVICTION_TARGET: float = 0.9
+
+
+class ArtifactStore:
+    """
+    Content-addressed on-disk store of rendered artifacts (e.g., the GenBank record of a chain), keyed by the fingerprint of the design,
+    the kind of artifact and its parameters. Repeated exports of the same design become a single file lookup.
+    The store is capped in size: when it grows beyond max_bytes, the least recently used artifacts are evicted.
+    Artifacts are written atomically, so multiple processes can share a store.
+    """
+    __slots__ = ("directory", "max_bytes", "_size")
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 1 << 30) -> None:
+        """
+        Initializes an ArtifactStore, creating the directory if necessary.
+        :param directory: The directory the artifacts are stored in.
+        :param max_bytes: The maximum total size of all artifacts in bytes. Defaults to 1 GiB.
+        :return: None
+        :raises ValueError: If max_bytes is not positive.
+        """
+        if max_bytes < 1:
+            raise ValueError("Maximum size must be positive")
+
+        self.directory: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # The total size of the artifacts, determined once and updated by put. Other processes writing to the same directory are only
+        # accounted for when evicting, which always rescans the directory.
+        self._size: int = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def key(fingerprint: str, kind: str, *parameters: str) -> str:
+        """
+        Derives the key of an artifact.
+        :param fingerprint: The fingerprint of the design (e.g., MesaChain.fingerprint()).
+        :param kind: The kind of artifact (e.g., "genbank" or "dna_genbank").
+        :param parameters: Further parameters the artifact depends on (e.g., the record name or the codon optimization species).
+        :return: The key as hexadecimal string.
+        """
+        return sha256(json.dumps([fingerprint, kind, parameters], separators=(",", ":")).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # artifacts are spread over 256 subdirectories, so no single directory grows too large
+        return self.directory / key[:2] / key[2:]
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        """
+        Lists all stored artifacts.
+        :return: A list of (path, size, modification time) tuples.
+        """
+        artifacts: List[Tuple[Path, int, float]] = []
+        for path in self.directory.glob("??/*"):
+            if path.name.startswith("."):  # artifacts being written by put
+                continue
+
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:  # evicted by another process in the meantime
+                continue
+            artifacts.append((path, stat.st_size, stat.st_mtime))
+
+        return artifacts
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Retrieves an artifact and marks it as recently used.
+        :param key: The key of the artifact.
+        :return: The artifact, or None if it is not stored.
+        """
+        path: Path = self._path(key)
+        try:
+            data: bytes = path.read_bytes()
+            # the modification time serves as last use, as access times are not updated on many file systems
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Stores an artifact, evicting the least recently used artifacts if the store exceeds its size limit.
+        :param key: The key of the artifact.
+        :param data: The artifact.
+        :return: None
+        """
+        path: Path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # write to a temporary file first, so readers never see partially written artifacts
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=".tmp")
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        """
+        Retrieves a text artifact, rendering and storing it if it is not stored yet.
+        :param key: The key of the artifact.
+        :param render: A function creating the artifact.
+        :return: The artifact.
+        """
+        data: Optional[bytes] = self.get(key)
+        if data is not None:
+            return data.decode()
+
+        text: str = render()
+        self.put(key, text.encode())
+
+        return text
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Removes the least recently used artifacts until the store is below its size limit.
+        :param max_bytes: The size to shrink the store to. Defaults to EVICTION_TARGET times the size limit.
+        :return: The number of removed artifacts.
+        """
+        target: int = max_bytes if max_bytes is not None else int(self.max_bytes * EVICTION_TARGET)
+        artifacts: List[Tuple[Path, int, float]] = sorted(self._scan(), key=lambda artifact: artifact[2])
+        self._size = sum(size for _, size, _ in artifacts)
+
+        removed: int = 0
+        for path, size, _ in artifacts:
+            if self._size <= target:
+                break
+
+            try:
+                path.unlink()
+            except FileNotFoundError:  # evicted by another process in the meantime
+                pass
+            self._size -= size
+            removed += 1
+
+        return removed
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def __len__(self) -> int:
+        return len(self._scan())
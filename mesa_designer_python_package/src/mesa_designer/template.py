@@ -0,0 +1,110 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from .mesa import MesaChain, MESA_ORDER, get_linker_suffixes
+from .part import AnnotatedPart, Annotation
+
+# A compiled annotation: its name, type and start and stop relative to the segment it belongs to.
+CompiledAnnotation = Tuple[str, str, int, int]
+
+
+class DesignTemplate:
+    """
+    Represents a MesaChain with one variable slot (usually the binder), compiled once so it can be applied to many sequences.
+    The fixed parts, linkers and annotation offsets are precomputed, so applying the template only concatenates the variable sequence
+    between a fixed prefix and suffix and shifts the annotations by precomputed offsets.
+    Applying a template yields the same AnnotatedPart as adding the sequence to the chain and calling to_annotated_part.
+    """
+    __slots__ = ("slot", "annotation", "prefix", "suffix", "linker", "prefix_annotations", "suffix_annotations", "methionine")
+
+    def __init__(self, chain: MesaChain, slot: str = "binder", annotation: str = "Binder") -> None:
+        """
+        Initializes and compiles a DesignTemplate.
+        :param chain: The MesaChain containing all fixed parts. A part in the variable slot is ignored.
+        :param slot: The name of the variable slot, which has to be part of MESA_ORDER.
+        :param annotation: The annotation name of the variable part. Defaults to "Binder", as used by MesaChain.add_binder.
+        :return: None
+        :raises ValueError: If the slot is not part of MESA_ORDER.
+        """
+        if slot not in MESA_ORDER:
+            raise ValueError(f"Slot '{slot}' is not part of MESA_ORDER")
+
+        self.slot: str = slot
+        self.annotation: str = annotation
+
+        # the linkers are determined as if the variable part is present, which it always is when the template is applied
+        components: set = set(chain.get_parts().keys()) | {slot}
+        suffixes = get_linker_suffixes(components)
+        # the linker following the variable part
+        self.linker: str = suffixes.get(slot, "").upper()
+
+        segments: List[List[str]] = [[], []]
+        annotations: List[List[CompiledAnnotation]] = [[], []]
+        lengths: List[int] = [0, 0]
+        side: int = 0
+        for component in MESA_ORDER:
+            if component == slot:
+                side = 1
+                continue
+
+            if component in components:
+                part: AnnotatedPart = chain.get_parts()[component]
+                # get_annotations()[0] assumes each AnnotatedPart has at least one annotation, as in MesaChain.to_annotated_part
+                first: Annotation = part.get_annotations()[0]
+                annotations[side].append((first.name, first.type, first.start + lengths[side], first.stop + lengths[side]))
+                for segment in (part.get_sequence(), suffixes.get(component, "")):
+                    segments[side].append(segment)
+                    lengths[side] += len(segment)
+
+        # whether a Methionine has to be prepended is known in advance unless the variable part comes first
+        # (decided on the sequence before uppercasing, as in MesaChain.to_annotated_part)
+        self.methionine: Optional[str] = None if not segments[0] else ("" if "".join(segments[0]).startswith("M") else "M")
+        self.prefix: str = "".join(segments[0]).upper()
+        self.suffix: str = "".join(segments[1]).upper()
+        self.prefix_annotations: Tuple[CompiledAnnotation, ...] = tuple(annotations[0])
+        self.suffix_annotations: Tuple[CompiledAnnotation, ...] = tuple(annotations[1])
+
+    def apply(self, sequence: str, name: str, part_id: Optional[str] = None, description: Optional[str] = None) -> AnnotatedPart:
+        """
+        Applies the template to a single sequence.
+        :param sequence: The amino acid sequence of the variable part.
+        :param name: The name for the resulting AnnotatedPart.
+        :param part_id: An optional ID for the resulting AnnotatedPart. Defaults to 'name'.
+        :param description: An optional description for the resulting AnnotatedPart. Defaults to 'name'.
+        :return: The AnnotatedPart representing the assembled chain.
+        :raises ValueError: If the sequence is empty or None.
+        """
+        if not sequence:
+            raise ValueError("Sequence cannot be None")
+
+        sequence = sequence.upper()
+        assembled: str = self.prefix + sequence + self.linker + self.suffix
+
+        # prepend a Methionine only if the assembled sequence does not start with one, shifting all annotations by 1
+        methionine: str = self.methionine if self.methionine is not None else ("" if sequence.startswith("M") else "M")
+        assembled = methionine + assembled
+        start_offset: int = len(methionine)
+
+        variable_start: int = len(self.prefix) + start_offset
+        suffix_start: int = variable_start + len(sequence) + len(self.linker)
+
+        # annotations are created with positional arguments, as this is the hot loop when applying a template to large batches
+        seq_annotations: List[Annotation] = [Annotation(annotation_name, "", start + start_offset, stop + start_offset, annotation_type)
+                                             for annotation_name, annotation_type, start, stop in self.prefix_annotations]
+        seq_annotations.append(Annotation(self.annotation, "", variable_start, variable_start + len(sequence)))
+        seq_annotations += [Annotation(annotation_name, "", start + suffix_start, stop + suffix_start, annotation_type)
+                            for annotation_name, annotation_type, start, stop in self.suffix_annotations]
+
+        return AnnotatedPart(sequence=assembled,
+                             name=name,
+                             part_id=part_id if part_id else name,
+                             description=description if description else name,
+                             seq_annotations=seq_annotations)
+
+    def apply_batch(self, sequences: Union[Mapping[str, str], Iterable[Tuple[str, str]]]) -> Iterator[AnnotatedPart]:
+        """
+        Applies the template to a batch of sequences. The batch is processed lazily, so it can be streamed.
+        :param sequences: A dictionary or an iterable of (name, sequence) pairs.
+        :return: An iterator over the AnnotatedParts, in the order of the sequences.
+        """
+        for name, sequence in (sequences.items() if isinstance(sequences, Mapping) else sequences):
+            yield self.apply(sequence, name)
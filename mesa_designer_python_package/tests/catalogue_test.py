@@ -0,0 +1,22 @@
+import json
+import pytest
+import mesa_designer
+from mesa_designer.catalogue import CATALOGUE, CATALOGUE_FILE, Catalogue, compile_catalogue
+
+
+def test_compiled_catalogue_is_up_to_date(tmp_path):
+    # the compiled catalogue has to be recompiled whenever a source file changes
+    assert compile_catalogue(target=tmp_path / "catalogue.json") == CATALOGUE.version
+    assert (tmp_path / "catalogue.json").read_text() == CATALOGUE_FILE.read_text()
+
+    assert mesa_designer.ALL_DATA is CATALOGUE
+    assert mesa_designer.TMD_DATA is CATALOGUE["tmd"] and "FGFR4" in mesa_designer.TMD_DATA
+
+
+def test_modified_catalogue_is_rejected(tmp_path):
+    catalogue = json.loads(CATALOGUE_FILE.read_text())
+    catalogue["families"]["tmd"]["NEW"] = ["", "AAAA"]
+    (tmp_path / "catalogue.json").write_text(json.dumps(catalogue))
+
+    with pytest.raises(ValueError):
+        Catalogue(tmp_path / "catalogue.json")["tmd"]
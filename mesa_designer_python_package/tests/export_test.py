@@ -0,0 +1,62 @@
+import gzip
+from io import StringIO
+from Bio import SeqIO
+import pytest
+from mesa_designer.export import get_shard_paths, write_records, write_records_parallel
+from mesa_designer.library import MesaLibrary
+from mesa_designer.mesa import MesaChain
+from mesa_designer.spec import chain_from_spec, chain_to_spec
+
+library = MesaLibrary({"binder": {"VHH1": "QVQLVESGG", "VHH2": "EVQLLESGG"}, "tmd": ["FGFR4", "CD28", "GpA"], "aip": [None, "AIP"]}, name="lib")
+
+
+def test_write_multi_record_stream():
+    handle = StringIO()
+    assert write_records(library, handle) == [len(library)]
+
+    records = list(SeqIO.parse(StringIO(handle.getvalue()), "genbank"))
+    assert [record.name for record in records] == [design.id for design in library]
+    assert "".join(design.chain.to_annotated_part(design.id).to_genbank_string() for design in library) == handle.getvalue()
+
+    fasta = StringIO()
+    chain = MesaChain(name="single").add_binder("QVQL").add_tmd("FGFR4")
+    write_records([chain, chain.to_fret_chains()], fasta, file_format="fasta")
+    assert [record.id for record in SeqIO.parse(StringIO(fasta.getvalue()), "fasta")] == ["single", "mVenus", "mCerulean"]
+
+
+def test_write_sharded_gzip(tmp_path):
+    counts = write_records(iter(library), tmp_path / "library.gb.gz", shards=5)
+    paths = get_shard_paths(tmp_path / "library.gb.gz", 5)
+    assert [path.name for path in paths] == [f"library_{i}.gb.gz" for i in range(5)]
+    assert sum(counts) == len(library) and max(counts) - min(counts) <= 1
+
+    names = []
+    for path in paths:
+        with gzip.open(path, "rt") as f:
+            names += [record.name for record in SeqIO.parse(f, "genbank")]
+    assert sorted(names) == sorted(design.id for design in library)
+
+    with pytest.raises(ValueError):
+        write_records(library, StringIO(), shards=2)
+
+
+def test_write_parallel_matches_sequential(tmp_path):
+    chain = MesaChain(name="single").add_binder("QVQL").add_tmd("FGFR4").add_protease("TEVp")
+    rebuilt = chain_from_spec(chain_to_spec(chain))
+    assert rebuilt.parts["tmd"] is chain.parts["tmd"] and rebuilt.get_sequence() == chain.get_sequence()
+
+    # a library is sent to the workers once, other items as chain and part specs
+    filtered = library.filter(lambda design: design.labels["tmd"] != "CD28")
+    for items in (library, filtered, [chain, chain.to_fret_chains(), chain.to_annotated_part("part"), *library]):
+        expected = StringIO()
+        expected_counts = write_records(items, expected)
+        handle = StringIO()
+        progress = []
+        assert write_records_parallel(items, handle, max_workers=2, chunk_size=5, progress=progress.append) == expected_counts
+        assert handle.getvalue() == expected.getvalue()
+        assert progress[-1] == expected_counts[0]
+
+    write_records(library, tmp_path / "sequential.fasta", file_format="fasta", shards=3)
+    write_records_parallel(library, tmp_path / "parallel.fasta", file_format="fasta", shards=3, max_workers=2, chunk_size=4)
+    for sequential, parallel in zip(get_shard_paths(tmp_path / "sequential.fasta", 3), get_shard_paths(tmp_path / "parallel.fasta", 3)):
+        assert sequential.read_text() == parallel.read_text()
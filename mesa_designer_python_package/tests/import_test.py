@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from mesa_designer import TMD_DATA, AIP_DATA, FRET_ICDs, CTEV_DATA, NTEV_DATA, TEVP_DATA, PRS_DATA, SIGNAL_SEQS, TAG_SEQS
 
 def test_data_imports():
@@ -10,3 +13,18 @@ def test_data_imports():
     assert len(PRS_DATA) > 0
     assert len(SIGNAL_SEQS) > 0
     assert len(TAG_SEQS) > 0
+
+
+def test_star_import():
+    namespace = {}
+    exec("from mesa_designer import *", namespace)
+    assert namespace["TMD_DATA"] is TMD_DATA
+    assert namespace["PRS_DATA"] is PRS_DATA
+    assert len(namespace["ALL_DATA"]) > 0
+
+
+def test_imports_are_deferred():
+    # Biopython is only imported when a SeqRecord is needed, the catalogue files are only read when first accessed
+    code = ("import sys, mesa_designer.mesa, mesa_designer.export; assert 'Bio' not in sys.modules; "
+            "import mesa_designer; assert 'TAG_SEQS' not in vars(mesa_designer); mesa_designer.TAG_SEQS; assert 'TAG_SEQS' in vars(mesa_designer)")
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
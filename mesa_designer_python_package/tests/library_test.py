@@ -0,0 +1,80 @@
+import pytest
+from mesa_designer import TMD_DATA, PRS_DATA
+from mesa_designer.library import MesaLibrary
+from mesa_designer.part import AnnotatedPart, Annotation
+
+library = MesaLibrary({"binder": {"VHH1": "QVQLVESGG", "VHH2": "EVQLLESGG"},
+                       "tmd": list(TMD_DATA.keys()),
+                       "tmd_linker": {f"L{n}": "GGGGS" * n for n in (1, 2, 3)},
+                       "prs": list(PRS_DATA.keys()),
+                       "aip": [None, "AIP"]},
+                      name="lib")
+
+
+def test_library_enumeration():
+    assert len(library) == library.size == 2 * len(TMD_DATA) * 3 * len(PRS_DATA) * 2
+
+    designs = list(library)
+    assert len(designs) == len(library)
+    assert [design.index for design in designs] == list(range(len(library)))
+    assert len({design.id for design in designs}) == len(designs)
+
+    # the design order does not depend on the order of the slots and random access matches enumeration
+    for index in (0, 17, len(library) - 1):
+        assert library.design(index).labels == designs[index].labels
+        assert library.design(index).id == designs[index].id
+    assert library.design(-1).index == len(library) - 1
+
+    first = designs[0]
+    assert first.labels == {"binder": "VHH1", "tmd_linker": "L1", "tmd": "CD28", "prs": "PRS", "aip": "none"}
+    assert set(first.chain.get_parts().keys()) == {"binder", "tmd_linker", "tmd", "prs"}
+    assert "aip" in designs[1].chain.get_parts()
+
+
+def test_library_filter_and_sample():
+    filtered = library.filter(lambda design: design.labels["tmd"] == "FGFR4").filter(lambda design: design.labels["aip"] != "none")
+    assert len(filtered) == 2 * 3 * len(PRS_DATA)
+    assert all(design.chain.get_parts()["tmd"].name == "FGFR4_TMD" for design in filtered)
+    assert len(library) == library.size
+
+    sample = library.sample(10, seed=1)
+    assert [design.id for design in sample] == [design.id for design in library.sample(10, seed=1)]
+    assert len({design.index for design in sample}) == 10
+
+    filtered_sample = filtered.sample(5, seed=1)
+    assert len(filtered_sample) == 5 and all(design.labels["tmd"] == "FGFR4" for design in filtered_sample)
+
+    with pytest.raises(ValueError):
+        filtered.sample(len(filtered) + 1)
+
+
+def test_library_custom_slots():
+    tag = AnnotatedPart(sequence="YPYDVPDYA", name="HA", seq_annotations=[Annotation("HA", sequence="YPYDVPDYA")])
+    custom = MesaLibrary({"tags": [tag, None], "binder": ["QVQL"], "tmd": ["gpa"]})
+    assert len(custom) == 2
+    assert custom.design(0).chain.get_parts()["tags"] is tag
+    assert custom.design(0).chain.to_annotated_part("design").sequence.startswith("MYPYDVPDYAQVQL")
+
+    with pytest.raises(ValueError):
+        MesaLibrary({"tmd": ["NOT_A_TMD"]})
+
+    with pytest.raises(ValueError):
+        MesaLibrary({"binder": []})
+
+
+def test_library_search_matches_filtering():
+    motifs = ["GGGGSGGGGSGGGGS", "EVQLL"]
+    validators = [lambda labels: labels.get("tmd", "FGFR1").startswith("FGFR")]
+    expected = [design.index for design in library
+                if len(design.chain.get_sequence()) <= 60
+                and not any(motif in design.chain.get_sequence() for motif in motifs)
+                and design.labels["tmd"].startswith("FGFR")]
+
+    found = [design.index for design in library.search(max_length=60, forbidden_motifs=motifs, validators=validators)]
+    assert found and found == expected
+
+    top = library.top(3, score=lambda design: -len(design.chain.get_sequence()), max_length=60, forbidden_motifs=motifs, validators=validators)
+    assert [design.index for design in top] == sorted(expected, key=lambda index: len(library.design(index).chain.get_sequence()))[:3]
+    assert library.top(0, score=lambda design: 0) == []
+    with pytest.raises(ValueError):
+        library.top(-1, score=lambda design: 0)
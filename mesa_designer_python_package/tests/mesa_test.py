@@ -4,4 +4,53 @@ chain_a = MesaChain()
 
 chain_a.add_binder(sequence="BINDERASEQUENCE")
 
-chain_a.save_genbank_file("a.gb")
\ No newline at end of file
+chain_a.save_genbank_file("a.gb")
+
+def test_to_annotated_part_keeps_parts_unchanged():
+    chain = MesaChain()
+    chain.add_binder(sequence="BINDERASEQUENCE").add_tmd("FGFR4").add_cargo(sequence="CARGO")
+
+    first = chain.to_annotated_part(name="first")
+    second = chain.to_annotated_part(name="first")
+
+    # assembling must not shift the annotations of the chain's parts
+    assert chain.get_parts()["binder"].get_annotations()[0].start == 0
+    assert first.to_genbank_string() == second.to_genbank_string()
+    assert first.sequence.startswith("MBINDERASEQUENCEGGGSGGGS")
+    assert [(annotation.start, annotation.stop) for annotation in first.annotations][0] == (1, 16)
+
+    fret_assembly = chain.to_fret_chains()
+    assert set(fret_assembly.mesa_chains.keys()) == {"mVenus", "mCerulean"}
+    assert "cargo" in chain.get_parts() and "fret" not in chain.get_parts()
+    assert all("cargo" not in fret_chain.get_parts() for fret_chain in fret_assembly.mesa_chains.values())
+
+
+def test_export_cache_is_invalidated_on_change():
+    chain = MesaChain().add_binder(sequence="BINDERASEQUENCE").add_tmd("FGFR4")
+
+    first = chain.to_genbank_string()
+    assert chain.to_genbank_string() is first
+
+    chain.add_cargo(sequence="CARGO")
+    with_cargo = chain.to_genbank_string()
+    assert with_cargo != first and "/name=\"Cargo\"" in with_cargo
+
+    chain.remove_component("cargo")
+    assert chain.to_genbank_string() == first
+
+    # modifying the annotations of an assembled part must not affect the cached assembly
+    chain.to_annotated_part(name="first").get_annotations()[0].shift_annotation(3)
+    assert chain.to_annotated_part(name="first").get_annotations()[0].start == 1
+
+
+def test_fingerprint_depends_on_content_only():
+    chain = MesaChain(name="first").add_binder(sequence="QVQLVESGG").add_tmd("FGFR4")
+    tmd = chain.get_parts()["tmd"]
+    # the same chain assembled from a custom TMD with the same sequence and annotation
+    same = MesaChain(name="second").add_custom_tmd(tmd.get_sequence(), annotation=tmd.get_annotations()[0].name).add_binder(sequence="qvqlvesgg")
+    assert chain.fingerprint() == same.fingerprint()
+
+    # the linker after the binder changes when a TMD linker is added
+    other = MesaChain().add_binder(sequence="QVQLVESGG").add_tmd("FGFR4").add_tmd_linker(sequence="GGGGS")
+    assert chain.fingerprint() != other.fingerprint()
+    assert MesaAssembly({"a": chain}).fingerprint() != MesaAssembly({"a": other}).fingerprint()
@@ -1,4 +1,7 @@
+from io import StringIO
+from Bio import SeqIO
 from mesa_designer.mesa import *
+from mesa_designer.part import format_genbank
 
 def test_annotation():
     a = Annotation("test", 5, 10, part_type="CDS")
@@ -7,4 +10,26 @@ def test_annotation():
 
     ap.add_annotation(a)
 
-    ap.save_genbank_file("test.gb")
\ No newline at end of file
+    ap.save_genbank_file("test.gb")
+
+
+def test_native_genbank_matches_biopython():
+    chain = MesaChain().add_signal_peptide("CD4").add_binder("QVQLVESGG" * 7).add_tmd("FGFR4").add_protease("TEVp").add_prs("PRS").add_cargo("CARGO").add_aip("AIP")
+    parts = [chain.to_annotated_part("construct"),
+             AnnotatedPart("", name="empty"),
+             AnnotatedPart("MKV" * 20, name="quoted", seq_annotations=[Annotation('say "hi"', "", 0, 1), Annotation("point", "", 5, 5, part_type="misc_feature")]),
+             # not supported natively (long locus name), written by Biopython instead
+             AnnotatedPart("MKV", name="a_very_long_locus_name", seq_annotations=[Annotation("x", "MKV")])]
+
+    for part in parts:
+        reference = StringIO()
+        SeqIO.write(part.get_seq_record(), reference, "genbank")
+        assert part.to_genbank_string() == reference.getvalue()
+
+        record = SeqIO.read(StringIO(part.to_genbank_string()), "genbank")
+        assert str(record.seq) == part.sequence.upper()
+        assert [(int(feature.location.start), int(feature.location.end), feature.qualifiers["name"][0]) for feature in record.features] == \
+               [(annotation.start, annotation.stop, annotation.name) for annotation in part.annotations]
+
+    assert format_genbank(parts[0]) is not None
+    assert format_genbank(parts[-1]) is None
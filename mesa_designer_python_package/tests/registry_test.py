@@ -0,0 +1,53 @@
+import pytest
+from mesa_designer import NTEV_DATA, CTEV_DATA, TEVP_DATA, TMD_DATA
+from mesa_designer.mesa import MesaChain
+from mesa_designer.registry import PART_REGISTRY, PROTEASE_FAMILIES
+
+
+def test_registry_lookup():
+    assert PART_REGISTRY.get("fgfr4", "tmd").protein == TMD_DATA["FGFR4"][1]
+    assert PART_REGISTRY.get("GPA", "tmd").name == "GpA"
+    assert PART_REGISTRY.get(list(TEVP_DATA.keys())[0].lower(), PROTEASE_FAMILIES).family == "tev"
+    assert PART_REGISTRY.get("FGFR4", "prs") is None
+    assert len(PART_REGISTRY) == sum(len(PART_REGISTRY.family(family)) for family in PART_REGISTRY.families())
+
+
+def test_registry_is_read_only():
+    with pytest.raises(TypeError):
+        PART_REGISTRY.family("tmd")["NEW"] = None
+
+    with pytest.raises(AttributeError):
+        PART_REGISTRY.get("FGFR4", "tmd").protein = "AAAA"
+
+
+def test_add_protease_keeps_catalogue_unchanged():
+    ntev_names = set(NTEV_DATA.keys())
+
+    chain = MesaChain()
+    for protease_name in list(CTEV_DATA.keys()) + list(TEVP_DATA.keys()):
+        chain.add_protease(protease_name)
+
+    assert set(NTEV_DATA.keys()) == ntev_names
+    assert chain.get_parts()["protease"].name == list(TEVP_DATA.keys())[-1]
+
+
+def test_add_tmd_mixed_case_names():
+    chain = MesaChain().add_tmd("GpA")
+    assert chain.get_parts()["tmd"].name == "GpA_TMD"
+    assert chain.get_parts()["tmd"].sequence == TMD_DATA["GpA"][1]
+
+
+def test_catalogue_parts_are_shared_flyweights():
+    first = MesaChain().add_tmd("FGFR4").add_binder("QVQL")
+    second = MesaChain().add_tmd("fgfr4").add_binder("EVQL")
+    assert first.get_parts()["tmd"] is second.get_parts()["tmd"]
+
+    tmd = first.get_parts()["tmd"]
+    with pytest.raises(AttributeError):
+        tmd.add("AAAA")
+
+    with pytest.raises(AttributeError):
+        tmd.get_annotations()[0].shift_annotation(5)
+
+    assert first.to_annotated_part("first").get_annotations()[1].start > tmd.get_annotations()[0].start
+    assert tmd.get_annotations()[0].start == 0
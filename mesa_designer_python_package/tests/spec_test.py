@@ -0,0 +1,46 @@
+import json
+from io import BytesIO, StringIO
+import pytest
+from mesa_designer.mesa import MesaChain
+from mesa_designer.part import AnnotatedPart, Annotation
+from mesa_designer.spec import SPEC_VERSION, dump_all, dumps, load_all, loads
+
+chain = (MesaChain(name="design").add_signal_peptide("CD4").add_binder("QVQLVESGG").add_tmd("FGFR4").add_protease("TEVp").add_cargo("GSGSDYKDDDDK")
+         .add_part("tags", AnnotatedPart("HHHHHH", name="His", seq_annotations=[Annotation("His", "HHHHHH", 0, 6, "misc_feature")])))
+
+
+def test_chain_round_trip():
+    data = dumps(chain)
+    document = json.loads(data)
+    assert document["version"] == SPEC_VERSION
+    # catalogue parts are stored by their registry key instead of their sequence
+    assert ["tmd", ["catalogue", "tmd", "FGFR4", "FGFR4_TMD", None]] in document["chain"][1]
+
+    restored = loads(data)
+    assert restored.parts["tmd"] is chain.parts["tmd"]
+    assert restored.to_genbank_string() == chain.to_genbank_string()
+
+    with pytest.raises(ValueError):
+        loads(json.dumps({**document, "version": SPEC_VERSION + 1}))
+
+
+def test_bulk_round_trip():
+    items = [chain, chain.to_fret_chains(), MesaChain().add_binder("EVQLL").add_tmd("CD28")]
+    handle = StringIO()
+    assert dump_all(items, handle) == 3
+    assert len(handle.getvalue().splitlines()) == 3
+
+    handle.seek(0)
+    restored = list(load_all(handle))
+    assert restored[0].to_genbank_string() == chain.to_genbank_string()
+    assert {name: c.get_sequence() for name, c in restored[1].mesa_chains.items()} == {name: c.get_sequence() for name, c in items[1].mesa_chains.items()}
+    assert restored[2].name is None and restored[2].get_sequence() == items[2].get_sequence()
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    handle = BytesIO()
+    dump_all([chain, chain], handle, spec_format="msgpack")
+    handle.seek(0)
+    assert [c.to_genbank_string() for c in load_all(handle, spec_format="msgpack")] == [chain.to_genbank_string()] * 2
+    assert loads(dumps(chain, spec_format="msgpack"), spec_format="msgpack").get_sequence() == chain.get_sequence()
@@ -0,0 +1,53 @@
+import os
+from io import StringIO
+import pytest
+from mesa_designer.export import write_records
+from mesa_designer.library import MesaLibrary
+from mesa_designer.mesa import MesaChain
+from mesa_designer.store import ArtifactStore
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = ArtifactStore(tmp_path, max_bytes=300)
+    keys = [store.key("fingerprint", "genbank", str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        store.put(key, bytes(100))
+        # make the modification times distinguishable
+        os.utime(store._path(key), (i, i))
+
+    assert store.get(keys[0]) == bytes(100)
+    store.put(store.key("fingerprint", "genbank", "3"), bytes(100))
+    # the store shrinks to 90% of its limit, evicting the two artifacts not used since they were written
+    assert keys[0] in store and keys[1] not in store and keys[2] not in store and len(store) == 2
+    assert ArtifactStore(tmp_path, max_bytes=300)._size == 200
+
+
+def test_get_or_render(tmp_path):
+    store = ArtifactStore(tmp_path)
+    chain = MesaChain().add_binder("QVQLVESGG").add_tmd("FGFR4")
+    key = store.key(chain.fingerprint(), "genbank", "design")
+    assert key != store.key(chain.fingerprint(), "genbank", "other")
+
+    rendered = []
+    for _ in range(2):
+        assert store.get_or_render(key, lambda: rendered.append(1) or chain.to_genbank_string()) == chain.to_genbank_string()
+    assert rendered == [1]
+
+
+def test_write_records_with_store(tmp_path, monkeypatch):
+    library = MesaLibrary({"binder": {"VHH1": "QVQLVESGG", "VHH2": "EVQLLESGG"}, "tmd": ["FGFR4", "CD28"]}, name="lib")
+    expected = StringIO()
+    write_records(library, expected)
+
+    store = ArtifactStore(tmp_path)
+    for file_format in ("genbank", "fasta"):
+        output = StringIO()
+        write_records(library, output, file_format, store=store)
+        assert len(store) == len(library) * (1 if file_format == "genbank" else 2)
+    assert store.get(store.key(library.design(0).chain.fingerprint(), "genbank", library.design(0).id)) is not None
+
+    # a repeated export of the rebuilt designs is served from the store without rendering
+    monkeypatch.setattr(MesaChain, "to_annotated_part", lambda *args, **kwargs: pytest.fail("record rendered again"))
+    output = StringIO()
+    write_records(library, output, store=store)
+    assert output.getvalue() == expected.getvalue()
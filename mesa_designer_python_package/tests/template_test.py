@@ -0,0 +1,19 @@
+from mesa_designer.mesa import MesaChain
+from mesa_designer.template import DesignTemplate
+
+binders = {"VHH1": "QVQLVESGGGLVQ", "VHH2": "mEVQLLESGG", "VHH3": "DIQMTQSPSS"}
+
+
+def test_template_matches_chain_assembly():
+    templates = [MesaChain().add_signal_peptide("CD4").add_tmd("FGFR4").add_protease("TEVp").add_cargo("CARGO").add_aip("AIP"),
+                 MesaChain().add_tmd_linker().add_tmd("CD28").add_prs("PRS"),
+                 MesaChain().add_tmd("GpA")]
+
+    for template_chain in templates:
+        template = DesignTemplate(template_chain)
+        for part in template.apply_batch(binders):
+            expected = MesaChain().add_binder(binders[part.name])
+            for component, template_part in template_chain.get_parts().items():
+                expected.add_part(component, template_part)
+
+            assert part.to_genbank_string() == expected.to_annotated_part(part.name).to_genbank_string()
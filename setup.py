@@ -9,6 +9,8 @@ import zipfile
 import tarfile
 import os
 import shutil
+import subprocess
+import sys
 
 # Defines a function to download a file from a given URL to a specified file path
 def download_file(url: str, file_path: str) -> bool:
@@ -177,6 +179,19 @@ if offline_mode:
 
     print("Successfully downloaded sabdab pdb files!")
 
+# extract chain sequences of all local structures once, so the API and app can answer chain requests without parsing structure files
+# this runs in a separate process as the process pool used for extraction must not re-execute this script in its workers
+print("Extracting chain sequences from local structures...")
+if subprocess.run([sys.executable, "-m", "util.chain_database"], cwd=Path(__file__).resolve().parent).returncode != 0:
+    print("Failed to create chain sequence database! Exiting!")
+    exit(1)
+
+# build a k-mer index over all chain sequences for sequence-based structure search
+print("Building k-mer index for sequence search...")
+if subprocess.run([sys.executable, "-m", "util.sequence_search"], cwd=Path(__file__).resolve().parent).returncode != 0:
+    print("Failed to create k-mer index! Exiting!")
+    exit(1)
+
 print("Successfully setup databases!")
 
 # track completed download
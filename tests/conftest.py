@@ -0,0 +1,6 @@
+from pathlib import Path
+import sys
+
+# Add the parent directory of the current file to sys.path
+# This allows for importing modules from the 'util' package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,77 @@
+from Bio.Restriction import BsaI, BsmBI, EcoRI
+from Bio.Seq import Seq
+import dnachisel
+import pytest
+
+from util import TMD_DATA, SIGNAL_SEQS
+from util import dna_optimization
+from util.dna_optimization import assemble_construct, get_junction_windows, optimize_block, optimize_construct
+
+SPECIES = "h_sapiens"
+ENZYMES = [BsaI, BsmBI, EcoRI]
+ENZYME_NAMES = tuple(sorted(str(enzyme) for enzyme in ENZYMES))
+constructs = [
+    [SIGNAL_SEQS["CD4"][1], "M", "QVQLVESGGGLVQAGGSLRLSCAASG", "GGGSGGGS", TMD_DATA["FGFR4"][1], "*"],
+    ["M", "EVQLLESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKG", "GGGSGGGS", TMD_DATA["CD28"][1], "GGGSGGGS", "ENLYFQS", "*"],
+    # ends on G, L and E, F, so the assembled blocks may form BsaI (GGTCTC) and EcoRI (GAATTC) sites across junctions
+    ["MKG", "LSE", "FAG", "LSE", "F*"],
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    optimize_block.cache_clear()
+    assemble_construct.cache_clear()
+    yield
+    optimize_block.cache_clear()
+    assemble_construct.cache_clear()
+
+
+def assert_valid(dna: str, parts: list[str]) -> None:
+    assert str(Seq(dna).translate()) == "".join(parts).upper()
+    for enzyme in ENZYMES:
+        assert enzyme.search(Seq(dna), linear=True) == [], f"{enzyme} site in {dna}"
+
+
+@pytest.mark.parametrize("parts", constructs)
+def test_optimize_construct(parts):
+    dna = optimize_construct(parts, SPECIES, list(ENZYME_NAMES))
+    assert_valid(dna, parts)
+
+    # outside the junction windows the construct consists of the cached blocks
+    blocks = [optimize_block(part.upper(), SPECIES, ENZYME_NAMES) for part in parts]
+    frozen = [True] * len(dna)
+    for start, end in get_junction_windows([len(block) for block in blocks]):
+        frozen[start:end] = [False] * (end - start)
+    assert all(base == assembled for base, assembled, keep in zip("".join(blocks), dna, frozen) if keep)
+
+
+def test_junction_sites_are_removed(monkeypatch):
+    parts = ["MKG", "LSE", "FAG"]
+    # blocks without sites of their own, which form a BsaI and an EcoRI site at their junctions
+    blocks = {"MKG": "ATGAAAGGT", "LSE": "CTCAGCGAA", "FAG": "TTCGCAGGC"}
+    monkeypatch.setattr(dna_optimization, "optimize_block", lambda part, species, enzymes: blocks[part])
+    assert BsaI.search(Seq("".join(blocks.values())), linear=True) and EcoRI.search(Seq("".join(blocks.values())), linear=True)
+
+    assert_valid(assemble_construct(tuple(parts), SPECIES, ENZYME_NAMES), parts)
+
+
+def test_fallback_to_whole_construct(monkeypatch):
+    parts = ["MKG", "LSE", "FAG"]
+    blocks = {"MKG": "ATGAAAGGT", "LSE": "CTCAGCGAA", "FAG": "TTCGCAGGC"}
+    monkeypatch.setattr(dna_optimization, "optimize_block", lambda part, species, enzymes: blocks[part])
+    # windows missing the junctions leave the sites in frozen regions, which cannot be resolved
+    monkeypatch.setattr(dna_optimization, "get_junction_windows", lambda block_lengths: [(0, 3)])
+    optimize_sequence = dna_optimization.optimize_sequence
+    calls = []
+    monkeypatch.setattr(dna_optimization, "optimize_sequence", lambda *args: calls.append(args) or optimize_sequence(*args))
+
+    assert_valid(assemble_construct(tuple(parts), SPECIES, ENZYME_NAMES), parts)
+    assert calls == [("MKGLSEFAG", SPECIES, ENZYME_NAMES)]
+
+
+def test_warm_cache_does_not_optimize(monkeypatch):
+    dna = optimize_construct(constructs[0], SPECIES, list(ENZYME_NAMES))
+    monkeypatch.setattr(dnachisel, "DnaOptimizationProblem", lambda *args, **kwargs: pytest.fail("dnachisel invoked for a cached construct"))
+    # the order of the enzymes does not matter
+    assert optimize_construct(constructs[0], SPECIES, list(reversed(ENZYME_NAMES))) == dna
@@ -1,5 +1,6 @@
 from pathlib import Path
 import json
+import sys
 
 # Defines the base directory as the parent of the current file.
 BASE_DIR: Path = Path(__file__).resolve().parent
@@ -10,42 +11,36 @@ FILES_DIR: Path = BASE_DIR.parent / "files"
 # Defines the resources directory, located one level up from the base directory in a folder named "resources".
 RESOURCES_DIR: Path = BASE_DIR.parent / "resources"
 
-# Opens and loads TMD (Transmembrane Domain) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "tmd/tmd_list.json", "r") as f:
-    TMD_DATA: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads AIP (Auto-Inhibitory Peptide) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "aip/aip_list.json", "r") as f:
-    AIP_DATA: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads FRET (Förster Resonance Energy Transfer) ICDs (Intracellular Domains) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "FRET/ICDs.json", "r") as f:
-    FRET_ICDs: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads CTEV (C-Terminal End of TEV Protease) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "intracellular/CTEV_list.json", "r") as f:
-    CTEV_DATA: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads NTEV (N-Terminal End of TEV Protease) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "intracellular/NTEV_list.json", "r") as f:
-    NTEV_DATA: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads TEVp (TEV protease) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "intracellular/TEVp_list.json", "r") as f:
-    TEVP_DATA: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads PRS (Protease Recognition Site) data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "prs/prs_list.json", "r") as f:
-    PRS_DATA: dict[str, list[str]] = dict(json.load(f))
+# Defines the source directory of the mesa_designer package, whose part catalogue is shared by util, the app, the API and the package itself.
+PACKAGE_DIR: Path = BASE_DIR.parent / "mesa_designer_python_package" / "src"
+# Prefers the package of this repository over an installed version, so both always use the same catalogue.
+if str(PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PACKAGE_DIR))
+
+from mesa_designer.catalogue import CATALOGUE
+
+# The catalogue is compiled into a single file and parsed once. These are the same dictionaries as mesa_designer.TMD_DATA etc.
+# TMD (Transmembrane Domain) data.
+TMD_DATA: dict[str, list[str]] = CATALOGUE["tmd"]
+# AIP (Auto-Inhibitory Peptide) data.
+AIP_DATA: dict[str, list[str]] = CATALOGUE["aip"]
+# FRET (Förster Resonance Energy Transfer) ICDs (Intracellular Domains) data.
+FRET_ICDs: dict[str, list[str]] = CATALOGUE["fret"]
+# CTEV (C-Terminal End of TEV Protease) data.
+CTEV_DATA: dict[str, list[str]] = CATALOGUE["ctev"]
+# NTEV (N-Terminal End of TEV Protease) data.
+NTEV_DATA: dict[str, list[str]] = CATALOGUE["ntev"]
+# TEVp (TEV protease) data.
+TEVP_DATA: dict[str, list[str]] = CATALOGUE["tev"]
+# PRS (Protease Recognition Site) data.
+PRS_DATA: dict[str, list[str]] = CATALOGUE["prs"]
+# Signal sequences data.
+SIGNAL_SEQS: dict[str, list[str]] = CATALOGUE["signal"]
+# Tag sequences data.
+TAG_SEQS: dict[str, list[str]] = CATALOGUE["tag"]
+# The version hash of the catalogue.
+CATALOGUE_VERSION: str = CATALOGUE.version
 
 # Opens and loads chain color data from a JSON file into a dictionary.
 with open(RESOURCES_DIR / "colors/chain_colors.json", "r") as f:
     CHAIN_COLORS: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads signal sequences data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "signal_seqs/signal_sequences.json", "r") as f:
-    SIGNAL_SEQS: dict[str, list[str]] = dict(json.load(f))
-
-# Opens and loads tag sequences data from a JSON file into a dictionary.
-with open(RESOURCES_DIR / "tags/tag_sequences.json", "r") as f:
-    TAG_SEQS: dict[str, list[str]] = dict(json.load(f))
\ No newline at end of file
@@ -1,8 +1,17 @@
 from util import DATA_DIR, FILES_DIR
 from util.database_interaction import *
+from util.chain_database import get_local_structure_files
+from util.pdb_interaction import extract_seqres_from_pdb, get_chain_sequences_from_rcsb, get_fetch_pool
+from util.sequence_search import encode_kmers, KMER_LENGTH
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from difflib import SequenceMatcher
 from pathlib import Path
 import datetime
+import math
+import numpy as np
 import pandas as pd
+import threading
 
 conn: sqlite3.Connection = create_connection(str(DATA_DIR / "sabdab_summary_all.sqlite")) # Establishes a connection to an SQLite database file named "sabdab_summary_all.sqlite" located in DATA_DIR.
 sabdab_df: pd.DataFrame = get_dataframe(conn, "main") # Loads data from the "main" table of the connected SQLite database into a pandas DataFrame named sabdab_df.
@@ -11,6 +20,12 @@ skempi_df: pd.DataFrame = get_dataframe(conn, "skempi") # Loads data from the "s
 file_priority_list: list[str] = ["imgt", "chothia", "raw", "skempi", "abdb"] # Defines a list of keywords representing the priority order for different types of PDB files.
 skempi_pdbs: set[str] = set([x[:5] for x in list(skempi_df["#Pdb"])]) # Strips extra annotation of skempi pdb files to be compatible with regular pdb ids.
 
+MAX_REMOTE_FETCHES: int = 50 # Defines the maximum number of structures per search whose chain sequences are fetched from RCSB. Hits beyond it are not deduplicated.
+REMOTE_FETCH_TIMEOUT: float = 30 # Defines the time in seconds a search waits for the sequences fetched from RCSB.
+MAX_CACHED_SEQUENCES: int = 1024 # Defines the maximum number of structures whose deposited chain sequences are kept in memory.
+deposited_sequences: OrderedDict[str, dict[str, str]] = OrderedDict() # Caches the deposited chain sequences per PDB ID, least recently used first. Failed fetches are not cached, so they are retried by later searches.
+deposited_sequences_lock: threading.Lock = threading.Lock() # Guards the cache, searches of different sessions run concurrently.
+
 def get_highest_priority_path(list_of_paths: list[Path], priority_list: list[str]) -> Path | None: # Defines a function to get the highest priority file path from a list, based on a given priority list of keywords.
     """
     "Function which gets a file path from a list of paths according to a list of keywords where the keywords' indices represent their priority.
@@ -35,17 +50,159 @@ def get_highest_priority_path(list_of_paths: list[Path], priority_list: list[str
 
     return sorted_paths[0] if sorted_paths else None # Returns the first path in the sorted list (highest priority), or None if the list is empty.
 
-# TODO: re-implement structure filtering
-def search_antibodies(antigen: str, filter_structures: bool=True) -> tuple[pd.DataFrame, dict[str, pd.DataFrame], dict[str, str | Path], datetime.timedelta]: # Defines a function to search for antibodies based on an antigen, with an option to filter structures.
+def get_quality_key(row: pd.Series) -> tuple[float, float]: # Defines a function to rank search hits by their experimental quality.
+    """
+    Creates a sort key which ranks search hits by best (lowest) resolution first and best (lowest) affinity second. Missing values are ranked last.
+    :param row: A row of the sabdab dataframe
+    :return: A tuple of resolution and affinity
+    """
+    def to_float(value) -> float: # Defines a nested helper function to convert database strings to floats.
+        try:
+            number: float = float(value) # Tries to convert the value to a float.
+            return number if not math.isnan(number) else math.inf # Treats NaN like a missing value.
+        except (TypeError, ValueError):
+            return math.inf # Missing or non-numeric values (e.g. None, "NOT") are ranked last.
+
+    return to_float(row["resolution"]), to_float(row["affinity"]) # Returns the resolution and affinity as sort key.
+
+def cache_deposited_sequences(pdb: str, chain_sequences: dict[str, str]) -> None: # Defines a function to store the chain sequences of a structure in the bounded cache.
+    """
+    Stores the deposited chain sequences of a structure and evicts the least recently used structures beyond MAX_CACHED_SEQUENCES.
+    :param pdb: The lowercase PDB ID
+    :param chain_sequences: A dictionary mapping chain IDs to sequences
+    :return: None
+    """
+    with deposited_sequences_lock:
+        deposited_sequences[pdb] = chain_sequences
+        deposited_sequences.move_to_end(pdb)
+        while len(deposited_sequences) > MAX_CACHED_SEQUENCES:
+            deposited_sequences.popitem(last=False)
+
+def get_chain_pair_sequences(sabdab_selection: pd.DataFrame) -> list[tuple[str, str] | None]: # Defines a function to retrieve heavy and light chain sequences for search hits.
+    """
+    Retrieves the deposited heavy and light chain sequences of every search hit. All hits are compared by their deposited sequences, which are read
+    from the SEQRES records of local structures and fetched from RCSB for the others (at most MAX_REMOTE_FETCHES per search, concurrently).
+    The sequences of resolved residues in the chain database are not used, since they differ from the deposited ones wherever residues are disordered.
+    :param sabdab_selection: The sabdab search results
+    :return: A list with one (heavy_sequence, light_sequence) tuple per row, or None for rows without any available chain sequence
+    """
+    pdb_ids: list[str] = list(dict.fromkeys(sabdab_selection["pdb"].str.lower())) # Collects the unique PDB IDs of all hits in order.
+    sequences: dict[str, dict[str, str]] = {} # Initializes the dictionary mapping PDB IDs to their chain sequences.
+    with deposited_sequences_lock:
+        for pdb in pdb_ids: # Takes the sequences of recently used structures from the cache.
+            if pdb in deposited_sequences:
+                deposited_sequences.move_to_end(pdb)
+                sequences[pdb] = deposited_sequences[pdb]
+
+    local_files: dict[str, Path] = get_local_structure_files([pdb for pdb in pdb_ids if pdb not in sequences]) # Looks up the structure files of all uncached local structures with a single query.
+    for pdb, file_path in local_files.items(): # Reads the SEQRES records of local structures, which are identical to the sequences deposited at RCSB.
+        chain_sequences: dict[str, str] | None = extract_seqres_from_pdb(file_path)
+        if chain_sequences:
+            sequences[pdb] = chain_sequences
+            cache_deposited_sequences(pdb, chain_sequences)
+
+    missing_pdbs: list[str] = [pdb for pdb in pdb_ids if pdb not in sequences][:MAX_REMOTE_FETCHES] # Selects the structures to fetch, including local ones without SEQRES records.
+    fetches: dict[Future, str] = {get_fetch_pool().submit(get_chain_sequences_from_rcsb, pdb): pdb for pdb in missing_pdbs} # Fetches only the sequences, not the structures, in the shared pool.
+    done, not_done = wait(fetches, timeout=REMOTE_FETCH_TIMEOUT) # Waits for the fetches, slow ones are left out of the deduplication.
+    for future in not_done:
+        future.cancel()
+    for future in done:
+        if future.exception() is None and future.result(): # Caches the sequences of successfully retrieved structures.
+            sequences[fetches[future]] = future.result()
+            cache_deposited_sequences(fetches[future], future.result())
+
+    chain_pairs: list[tuple[str, str] | None] = [] # Initializes the list of chain pair sequences.
+    for pdb, heavy_chain, light_chain in zip(sabdab_selection["pdb"].str.lower(), sabdab_selection["Hchain"], sabdab_selection["Lchain"]): # Iterates over the PDB ID and chain IDs of every hit.
+        chain_sequences: dict[str, str] = sequences.get(pdb, {}) # Gets the chain sequences of the structure, empty if none are available.
+        heavy_sequence: str = chain_sequences.get(heavy_chain, "") if heavy_chain else "" # Gets the heavy chain sequence, empty for missing chains (e.g. light chain only entries).
+        light_sequence: str = chain_sequences.get(light_chain, "") if light_chain else "" # Gets the light chain sequence.
+        chain_pairs.append((heavy_sequence, light_sequence) if heavy_sequence or light_sequence else None) # Stores None if no sequence is available, which prevents the hit from being clustered.
+
+    return chain_pairs
+
+def is_similar_sequence(sequence_a: str, kmers_a: np.ndarray, sequence_b: str, kmers_b: np.ndarray, identity_threshold: float) -> bool: # Defines a function to check whether two chain sequences are near-identical.
+    """
+    Checks whether two sequences reach an identity threshold. A cheap k-mer containment prefilter rejects most dissimilar pairs before the identity check.
+    :param sequence_a: The first sequence
+    :param kmers_a: The unique k-mer codes of the first sequence
+    :param sequence_b: The second sequence
+    :param kmers_b: The unique k-mer codes of the second sequence
+    :param identity_threshold: The minimum identity (0-1) of similar sequences
+    :return: True if the sequences are similar, False otherwise
+    """
+    if not (sequence_a and sequence_b): # Missing chains are only similar to missing chains.
+        return sequence_a == sequence_b
+
+    shared_fraction: float = len(np.intersect1d(kmers_a, kmers_b, assume_unique=True)) / max(1, min(len(kmers_a), len(kmers_b))) # Calculates the fraction of shared k-mers.
+    if shared_fraction < identity_threshold ** KMER_LENGTH * 0.5: # A k-mer is only conserved if all its residues are, allowing for some slack before rejecting the pair.
+        return False
+
+    return SequenceMatcher(None, sequence_a, sequence_b, autojunk=False).ratio() >= identity_threshold # Checks the identity of the remaining candidates.
+
+def cluster_antibodies(sabdab_selection: pd.DataFrame, identity_threshold: float=0.95) -> pd.DataFrame: # Defines a function to remove redundant search hits.
+    """
+    Clusters search hits by heavy and light chain sequence identity and keeps one representative per cluster.
+    Identical chain pairs are grouped by hashing first, the remaining groups are merged if both chains reach the identity threshold.
+    The representative of each cluster is the hit with the best resolution, followed by the best affinity.
+    :param sabdab_selection: The sabdab search results
+    :param identity_threshold: The minimum identity (0-1) of heavy and light chains of hits in the same cluster
+    :return: The representative rows in their original order with additional 'cluster_size' and 'cluster_pdbs' columns
+    """
+    chain_pairs: list[tuple[str, str] | None] = get_chain_pair_sequences(sabdab_selection) # Retrieves the chain sequences of all hits.
+    quality_keys: list[tuple[float, float]] = [get_quality_key(row) for _, row in sabdab_selection.iterrows()] # Determines the quality of every hit.
+
+    # group identical chain pairs by their hash, hits without sequences form their own group
+    exact_groups: dict[tuple[str, str] | int, list[int]] = {} # Initializes a dictionary mapping chain pairs to row positions.
+    for i, chain_pair in enumerate(chain_pairs):
+        exact_groups.setdefault(chain_pair if chain_pair is not None else i, []).append(i)
+
+    # merge near-identical groups greedily, starting from the groups with the best hits
+    clusters: list[list[int]] = [] # Initializes the list of clusters (lists of row positions).
+    centroids: list[tuple[str, np.ndarray, str, np.ndarray] | None] = [] # Initializes the list of cluster centroid sequences and k-mers.
+    for key, rows in sorted(exact_groups.items(), key=lambda item: min(quality_keys[i] for i in item[1])):
+        if isinstance(key, int): # Hits without sequences cannot be compared and stay on their own.
+            clusters.append(rows)
+            centroids.append(None)
+            continue
+
+        heavy_kmers: np.ndarray = encode_kmers(key[0]) # Encodes the heavy chain k-mers.
+        light_kmers: np.ndarray = encode_kmers(key[1]) # Encodes the light chain k-mers.
+        for cluster, centroid in zip(clusters, centroids):
+            if centroid and is_similar_sequence(key[0], heavy_kmers, centroid[0], centroid[1], identity_threshold) and is_similar_sequence(key[1], light_kmers, centroid[2], centroid[3], identity_threshold):
+                cluster.extend(rows) # Adds the group to the first similar cluster.
+                break
+        else:
+            clusters.append(list(rows)) # Creates a new cluster with the group's sequences as centroid.
+            centroids.append((key[0], heavy_kmers, key[1], light_kmers))
+
+    representatives: list[int] = [] # Initializes the list of representative row positions.
+    cluster_sizes: list[int] = [] # Initializes the list of cluster sizes.
+    cluster_pdbs: list[str] = [] # Initializes the list of PDB IDs in each cluster.
+    for cluster in clusters:
+        representatives.append(min(cluster, key=lambda i: (quality_keys[i], i))) # Selects the hit with the best quality as representative.
+        cluster_sizes.append(len(cluster))
+        cluster_pdbs.append(", ".join(dict.fromkeys(sabdab_selection["pdb"].iloc[i] for i in sorted(cluster))))
+
+    order: list[int] = sorted(range(len(representatives)), key=lambda i: representatives[i]) # Restores the original order of the search results.
+    result: pd.DataFrame = sabdab_selection.iloc[[representatives[i] for i in order]].copy() # Selects the representative rows.
+    result.insert(1, "cluster_size", [cluster_sizes[i] for i in order]) # Adds the cluster size after the PDB ID.
+    result["cluster_pdbs"] = [cluster_pdbs[i] for i in order] # Adds the PDB IDs of all cluster members.
+
+    return result
+
+def search_antibodies(antigen: str, filter_structures: bool=False, identity_threshold: float=0.95) -> tuple[pd.DataFrame, dict[str, pd.DataFrame], dict[str, str | Path], datetime.timedelta]: # Defines a function to search for antibodies based on an antigen, with an option to remove redundant structures.
     """
     This function searches multiple databases based on the input search term / antigen name and returns found data from sabdab and skempi databases. It also searches for local structures and returns the search time.
     :param antigen: The search term or antigen name
-    :param filter_structures: To filter duplicate structures
+    :param filter_structures: To cluster redundant hits by heavy/light chain sequence identity and only return one representative per cluster
+    :param identity_threshold: The minimum chain identity (0-1) of redundant hits, only used if filter_structures is True
     :return: Search results
     """
     time: datetime.datetime = datetime.datetime.now() # Records the current time to measure the search duration.
     sabdab_selection: pd.DataFrame = sabdab_df.loc[sabdab_df["antigen_name"].str.contains(antigen, case=False) | # Selects rows from sabdab_df where the 'antigen_name' column (case-insensitive)
                                      sabdab_df["compound"].str.contains(antigen, case=False)].sort_values("affinity") # or 'compound' column contains the given antigen, then sorts by 'affinity'.
+    if filter_structures and len(sabdab_selection) > 0: # Removes redundant hits before collecting files, so fewer structures have to be looked up.
+        sabdab_selection = cluster_antibodies(sabdab_selection, identity_threshold)
     skempi_selection: dict[str, pd.DataFrame] = {} # Initializes an empty dictionary to store SKEMPI data related to selected PDBs.
     pdb_files: dict[str, str | Path | list[Path]] = {} # Initializes an empty dictionary to store file paths for PDBs.
 
@@ -78,18 +235,16 @@ def search_antibodies(antigen: str, filter_structures: bool=True) -> tuple[pd.Da
         sel: pd.DataFrame = skempi_df.loc[skempi_df["#Pdb"].str[:5] == pdb] # Selects rows from skempi_df where the PDB ID matches the current one.
         skempi_selection[pdb] = sel if len(sel) > 0 else None # Stores the selected SKEMPI data for the PDB, or None if no data is found.
 
-    #    if filter_structures:
-#        for key in pdb_files:
-#            pdb_files[key] = get_highest_priority_path(pdb_files[key], file_priority_list)
     return sabdab_selection, skempi_selection, pdb_files, datetime.datetime.now()-time # Returns the SABDAB selection, SKEMPI selection, PDB file paths, and the duration of the search.
 
-def search_antibodies_api(antigen: str) -> dict[str, list[dict[str, str]] | float]: # Defines a function for searching antibodies, intended for API use, returning results as a dictionary.
+def search_antibodies_api(antigen: str, filter_structures: bool=False) -> dict[str, list[dict[str, str]] | float]: # Defines a function for searching antibodies, intended for API use, returning results as a dictionary.
     """
     API wrapper function around the search_antibodies function
     :param antigen: The search term / antigen name
+    :param filter_structures: To only return one representative per cluster of redundant hits
     :return: Search data
     """
-    sabdab_selection, skempi_selection, pdb_files, search_duration = search_antibodies(antigen) # Calls the main search_antibodies function to get the results.
+    sabdab_selection, skempi_selection, pdb_files, search_duration = search_antibodies(antigen, filter_structures) # Calls the main search_antibodies function to get the results.
 
     # convert sabdab to dict
     sabdab_data = sabdab_selection.to_dict(orient="records") # Converts the sabdab_selection DataFrame into a list of dictionaries, where each dictionary represents a row.
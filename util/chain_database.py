@@ -0,0 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+import json
+import sqlite3
+
+from util import DATA_DIR, FILES_DIR
+from util.pdb_interaction import build_residue_index, extract_chains_from_pdb
+
+# Defines the path of the SQLite database which stores pre-extracted chain data of all local structures.
+CHAIN_DATABASE: Path = DATA_DIR / "chain_sequences.sqlite"
+
+# Defines the structure directories (relative to FILES_DIR) in order of priority. Only structures with their original numbering are indexed,
+# as the stored residue numbers are combined with the structures retrieved from RCSB (e.g., for the viewer and residue selections).
+# Renumbered structures (IMGT, Chothia, AbDb) are left out, their chains are extracted from the RCSB structure instead.
+STRUCTURE_PRIORITY: list[str] = ["sabdab_structures/raw", "skempi_structures"]
+
+
+def collect_structure_files(files_dir: Path = FILES_DIR) -> dict[str, Path]:
+    """
+    Collects one structure file per PDB ID from the local structure directories according to STRUCTURE_PRIORITY.
+    :param files_dir: The directory containing the downloaded structure directories.
+    :return: A dictionary mapping lowercase PDB IDs to the path of their highest priority structure file.
+    """
+    structure_files: dict[str, Path] = {}
+    for directory in STRUCTURE_PRIORITY:
+        for path in sorted((files_dir / directory).glob("*.pdb")):
+            structure_files.setdefault(path.stem[:4].lower(), path)
+
+    return structure_files
+
+
+def _extract_chain_rows(pdb_id: str, path: Path) -> list[tuple[str, str, str, str, str, int, int, str, str]]:
+    """
+    Worker function which extracts the chains of a single structure file and converts them to database rows.
+    :param pdb_id: The PDB ID of the structure.
+    :param path: The path to the structure file.
+    :return: A list of rows for the chains table. Empty if the file could not be parsed.
+    """
+    try:
+        chains_data = extract_chains_from_pdb(file_path=str(path))
+    except Exception as e:
+        print(f"Could not extract chains from {path}: {e}")
+        return []
+
+    return [(pdb_id, chain_id, chain["id"], chain["fasta_name"], chain["sequence"], chain["start"], chain["end"], json.dumps(chain["residue_numbers"]), str(path))
+            for chain_id, chain in chains_data.items()]
+
+
+def build_chain_database(files_dir: Path = FILES_DIR, db_path: Path = CHAIN_DATABASE, max_workers: int | None = None) -> int:
+    """
+    Runs the chain extractor over every local structure file in parallel and stores the chain id, sequence,
+    start/end residue numbers and the residue number of every sequence position in an SQLite database.
+    An existing database is replaced.
+    :param files_dir: The directory containing the downloaded structure directories.
+    :param db_path: The path of the SQLite database to create.
+    :param max_workers: The maximum number of worker processes. Defaults to the number of CPUs.
+    :return: The number of chains stored in the database.
+    """
+    structure_files: dict[str, Path] = collect_structure_files(files_dir)
+
+    Path.mkdir(db_path.parent, parents=True, exist_ok=True)
+    tmp_path: Path = db_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn: sqlite3.Connection = sqlite3.connect(tmp_path)
+    conn.execute("create table chains (pdb TEXT, chain_id TEXT, id TEXT, fasta_name TEXT, sequence TEXT, start INTEGER, end INTEGER, residue_numbers TEXT, file TEXT, primary key (pdb, chain_id))")
+
+    chain_count: int = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for rows in executor.map(_extract_chain_rows, structure_files.keys(), structure_files.values(), chunksize=64):
+            conn.executemany("insert or replace into chains values (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            chain_count += len(rows)
+
+    conn.commit()
+    conn.close()
+
+    # swap in the new database only once it is complete, so readers never see a partial table
+    tmp_path.replace(db_path)
+
+    return chain_count
+
+
+def get_local_chains(pdb_id: str, db_path: Path = CHAIN_DATABASE) -> dict[str, dict[str, str | int | list[str]]] | None:
+    """
+    Retrieves pre-extracted chain data for a PDB ID from the chain database without touching the structure file.
+    :param pdb_id: The PDB ID to retrieve chain data for (case-insensitive).
+    :param db_path: The path to the chain database.
+    :return: A dictionary in the same format as returned by extract_chains_from_pdb, or None if the structure is not in the database.
+    """
+    if not db_path.is_file():
+        return None
+
+    try:
+        # open a new read-only connection per call, as callers (API, streamlit) run in different threads
+        with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+            rows = conn.execute("select chain_id, id, fasta_name, sequence, start, end, residue_numbers from chains where pdb=? order by chain_id", (pdb_id.lower(), )).fetchall()
+    except sqlite3.Error as e:
+        print(e)
+        return None
+
+    if not rows:
+        return None
+
+    chains_data: dict[str, dict[str, str | int | list[str] | dict[str, int]]] = {}
+    for chain_id, record_id, fasta_name, sequence, start, end, residue_numbers in rows:
+        chains_data[chain_id] = {"id": record_id,
+                                 "chain_id": chain_id,
+                                 "fasta_name": fasta_name,
+                                 "sequence": sequence,
+                                 "start": start,
+                                 "end": end,
+                                 "residue_numbers": json.loads(residue_numbers)}
+        chains_data[chain_id]["residue_index"] = build_residue_index(chains_data[chain_id]["residue_numbers"])
+
+    return chains_data
+
+
+def get_local_structure_files(pdb_ids: list[str], db_path: Path = CHAIN_DATABASE) -> dict[str, Path]:
+    """
+    Retrieves the paths of the structure files the chains of multiple PDB IDs were extracted from in a single query.
+    :param pdb_ids: The PDB IDs to retrieve structure files for (case-insensitive).
+    :param db_path: The path to the chain database.
+    :return: A dictionary mapping lowercase PDB IDs to structure file paths. Structures not in the database are omitted.
+    """
+    if not (pdb_ids and db_path.is_file()):
+        return {}
+
+    pdb_ids = list({pdb_id.lower() for pdb_id in pdb_ids})
+    rows: list[tuple[str, str]] = []
+    try:
+        with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+            # query in batches to stay below SQLite's limit of host parameters per statement
+            for i in range(0, len(pdb_ids), 900):
+                batch: list[str] = pdb_ids[i:i + 900]
+                rows += conn.execute(f"select distinct pdb, file from chains where pdb in ({', '.join('?' for _ in batch)})", batch).fetchall()
+    except sqlite3.Error as e:
+        print(e)
+        return {}
+
+    return {pdb_id: Path(file) for pdb_id, file in rows}
+
+
+# Can be run from the project root to (re-)build the chain database: python -m util.chain_database
+if __name__ == "__main__":
+    print("Extracting chains from local structures...")
+    print(f"Successfully stored {build_chain_database()} chains in {CHAIN_DATABASE}")
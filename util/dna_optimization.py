@@ -0,0 +1,145 @@
+from functools import lru_cache
+from itertools import accumulate
+import dnachisel
+
+from util import CATALOGUE
+
+# Defines the number of codons on each side of a junction between two blocks which are re-optimized after assembly.
+# 10 codons (30 bp) exceed the recognition site of every restriction enzyme, so any site spanning a junction lies within its window.
+JUNCTION_CODONS: int = 10
+# Defines the maximum number of optimized blocks which are kept in memory.
+MAX_BLOCKS: int = 4096
+
+
+@lru_cache(maxsize=1)
+def get_catalogue_dna() -> dict[str, str]:
+    """
+    Collects the DNA sequences stored in the catalogue (e.g., of the TMDs), which serve as starting point for the optimization of their parts.
+    :return: A dictionary mapping protein sequences to DNA sequences translating to them.
+    """
+    catalogue_dna: dict[str, str] = {}
+    for family in CATALOGUE.values():
+        for dna, protein in family.values():
+            protein = protein.upper()
+            # only DNA which actually encodes the protein is used, some parts do not carry DNA
+            if dna and len(dna) == 3 * len(protein) and dnachisel.translate(dna.upper()) == protein:
+                catalogue_dna[protein] = dna.upper()
+
+    return catalogue_dna
+
+
+def get_constraints(enzymes: tuple[str, ...]) -> list[dnachisel.Specification]:
+    """
+    Creates the constraints every optimized sequence has to satisfy.
+    :param enzymes: The names of the restriction enzymes whose sites are avoided (e.g., "BsaI").
+    :return: The constraints: avoid the restriction sites and keep the translation.
+    """
+    constraints: list[dnachisel.Specification] = [dnachisel.AvoidPattern(enzyme + "_site") for enzyme in enzymes]
+    constraints.append(dnachisel.EnforceTranslation())
+
+    return constraints
+
+
+@lru_cache(maxsize=MAX_BLOCKS)
+def optimize_block(protein: str, species: str, enzymes: tuple[str, ...]) -> str:
+    """
+    Optimizes the DNA of a single part. Results are cached, so every catalogue part (and a binder exported repeatedly) is only optimized once
+    per species and set of avoided restriction enzymes.
+    :param protein: The amino acid sequence of the part.
+    :param species: The species whose codon usage is matched.
+    :param enzymes: The sorted names of the restriction enzymes whose sites are avoided.
+    :return: The optimized DNA sequence.
+    """
+    sequence: str = get_catalogue_dna().get(protein) or dnachisel.reverse_translate(protein)
+    problem: dnachisel.DnaOptimizationProblem = dnachisel.DnaOptimizationProblem(sequence=sequence,
+                                                                                  constraints=get_constraints(enzymes),
+                                                                                  objectives=[dnachisel.CodonOptimize(species=species, method="match_codon_usage")],
+                                                                                  logger=None)
+    problem.resolve_constraints(final_check=True)
+    problem.optimize()
+
+    return problem.sequence
+
+
+def optimize_sequence(protein: str, species: str, enzymes: tuple[str, ...]) -> str:
+    """
+    Optimizes the DNA of a whole construct at once, as done before parts were optimized separately.
+    :param protein: The amino acid sequence of the construct.
+    :param species: The species whose codon usage is matched.
+    :param enzymes: The names of the restriction enzymes whose sites are avoided.
+    :return: The optimized DNA sequence.
+    """
+    problem: dnachisel.DnaOptimizationProblem = dnachisel.DnaOptimizationProblem(sequence=dnachisel.reverse_translate(protein),
+                                                                                  constraints=get_constraints(enzymes),
+                                                                                  objectives=[dnachisel.CodonOptimize(species=species, method="match_codon_usage")],
+                                                                                  logger=None)
+    problem.resolve_constraints(final_check=True)
+    problem.optimize()
+
+    return problem.sequence
+
+
+def get_junction_windows(block_lengths: list[int], junction_size: int = 3 * JUNCTION_CODONS) -> list[tuple[int, int]]:
+    """
+    Determines the regions around the junctions of consecutive blocks, merging overlapping regions.
+    :param block_lengths: The lengths of the blocks in base pairs, multiples of 3.
+    :param junction_size: The number of base pairs on each side of a junction, a multiple of 3.
+    :return: A list of sorted, non-overlapping (start, end) tuples.
+    """
+    total: int = sum(block_lengths)
+    windows: list[tuple[int, int]] = []
+    for junction in accumulate(block_lengths[:-1]):
+        start, end = max(0, junction - junction_size), min(total, junction + junction_size)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+
+    return windows
+
+
+@lru_cache(maxsize=MAX_BLOCKS)
+def assemble_construct(parts: tuple[str, ...], species: str, enzymes: tuple[str, ...]) -> str:
+    """
+    Assembles the optimized DNA of a construct from the optimized DNA of its parts and re-optimizes the junctions. Results are cached,
+    so repeated exports of the same construct do not run dnachisel at all.
+    :param parts: The non-empty, uppercase amino acid sequences of the parts in order.
+    :param species: The species whose codon usage is matched.
+    :param enzymes: The sorted names of the restriction enzymes whose sites are avoided.
+    :return: The optimized DNA sequence.
+    """
+    blocks: list[str] = [optimize_block(part, species, enzymes) for part in parts]
+    sequence: str = "".join(blocks)
+    windows: list[tuple[int, int]] = get_junction_windows([len(block) for block in blocks])
+    if not windows:
+        return sequence
+
+    # restriction sites may span junctions and codon usage changes abruptly at them, so only the junction windows are re-optimized
+    constraints: list[dnachisel.Specification] = get_constraints(enzymes)
+    boundaries: list[int] = [0] + [position for window in windows for position in window] + [len(sequence)]
+    constraints.extend(dnachisel.AvoidChanges(location=(start, end)) for start, end in zip(boundaries[::2], boundaries[1::2]) if start < end)
+    problem: dnachisel.DnaOptimizationProblem = dnachisel.DnaOptimizationProblem(sequence=sequence,
+                                                                                  constraints=constraints,
+                                                                                  objectives=[dnachisel.CodonOptimize(species=species, method="match_codon_usage", location=window)
+                                                                                              for window in windows],
+                                                                                  logger=None)
+    try:
+        problem.resolve_constraints(final_check=True)
+    except dnachisel.NoSolutionError:
+        # a restriction site reaching too far into a cached block, optimize the whole construct instead
+        return optimize_sequence("".join(parts), species, enzymes)
+    problem.optimize()
+
+    return problem.sequence
+
+
+def optimize_construct(parts: list[str], species: str, enzymes: list[str]) -> str:
+    """
+    Optimizes the DNA of a construct by assembling the cached optimized DNA of its parts. Only parts which were not optimized before
+    (usually the binder) and the windows around the junctions of the parts are optimized, the rest of the construct is kept as cached.
+    :param parts: The amino acid sequences of the parts in order.
+    :param species: The species whose codon usage is matched.
+    :param enzymes: The names of the restriction enzymes whose sites are avoided.
+    :return: The optimized DNA sequence, encoding the concatenated parts.
+    """
+    return assemble_construct(tuple(part.upper() for part in parts if part), species, tuple(sorted(set(enzymes))))
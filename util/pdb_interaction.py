@@ -1,20 +1,66 @@
 from Bio import SeqIO
+from Bio.Data.PDBData import protein_letters_3to1_extended
+from Bio.PDB.Chain import Chain
+from Bio.PDB.kdtrees import KDTree
+from Bio.PDB.PDBParser import PDBParser
+from Bio.SeqIO.PdbIO import AtomIterator
+from collections.abc import Iterator
+from itertools import permutations
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from io import StringIO
+from pathlib import Path
+import numpy as np
+import os
 import re
 import requests
+import threading
 
+# Defines the distance in Angstrom a single linker residue is assumed to span. The maximal C-alpha distance of consecutive residues is 3.8 A,
+# a slightly lower value keeps flexible linkers from being fully stretched.
+LINKER_RESIDUE_SPAN: float = 3.5
 
-def extract_chains_from_pdb(file_path: str | None = None, file_content: str | None = None) -> dict[str, dict[str, str | int]]:
+# Defines the maximum number of segments per chain whose permutations are evaluated (8! = 40320 orders).
+MAX_ORDER_SEGMENTS: int = 8
+
+# Defines the levels of detail of structures sent to the 3D viewer. 'full' keeps all heavy atoms, 'trace' only the C-alpha atoms
+# and 'auto' switches to the C-alpha trace for structures with more than TRACE_RESIDUE_THRESHOLD residues.
+LEVELS_OF_DETAIL: tuple[str, ...] = ("full", "trace", "auto")
+TRACE_RESIDUE_THRESHOLD: int = 3000
+
+# Defines residue names of water molecules, which are removed from structures sent to the 3D viewer.
+WATER_RESIDUES: set[str] = {"HOH", "WAT", "DOD", "H2O"}
+
+# Defines the number of seconds after which a request to RCSB is given up, so a stalled download does not block its caller.
+RCSB_TIMEOUT: float = 30
+
+# Defines the maximum number of concurrent requests to RCSB over all calls of iter_chains_from_rcsb, e.g. of concurrent API requests.
+MAX_RCSB_REQUESTS: int = 16
+# Defines the number of worker processes parsing fetched structures, shared by all calls of iter_chains_from_rcsb.
+PARSE_WORKERS: int = os.cpu_count() or 1
+
+# The pools of iter_chains_from_rcsb. They are created on first use and shared, so concurrent calls neither start their own
+# processes nor exceed MAX_RCSB_REQUESTS.
+_fetch_pool: ThreadPoolExecutor | None = None
+_parse_pool: ProcessPoolExecutor | None = None
+_pool_lock: threading.Lock = threading.Lock()
+
+
+def extract_chains_from_pdb(file_path: str | None = None, file_content: str | None = None) -> dict[str, dict[str, str | int | list[str]]]:
     """
-    Extracts chain data (ID, chain ID, FASTA name, sequence) from a PDB file, either from a file path or direct content.
+    Extracts chain data (ID, chain ID, FASTA name, sequence, residue numbers) from a PDB file, either from a file path or direct content.
     :param file_path: The path to the PDB file.
     :param file_content: The content of the PDB file as a string.
-    :return: A list of dictionaries, where each dictionary represents a chain with its 'id', 'chain_id', 'fasta_name', and 'sequence'.
+    :return: A dictionary mapping chain IDs to dictionaries with the chain's 'id', 'chain_id', 'fasta_name', 'sequence', 'start', 'end', 'residue_numbers'
+        and the 'residue_index' mapping residue numbers to sequence offsets.
     """
     try:
-        chains_data: dict[str, dict[str, str]] = {}
-        records = SeqIO.parse(StringIO(file_content) if file_content else file_path, "pdb-atom")
-        for record in records:
+        chains_data: dict[str, dict[str, str | int | list[str]]] = {}
+        # parse the structure only once and derive both the sequences and the residue numbering from it
+        structure = PDBParser(QUIET=True).get_structure(None, StringIO(file_content) if file_content else file_path)
+        pdb_id: str = structure.header["idcode"] if structure.header.get("idcode") else "????"
+
+        for record in AtomIterator(pdb_id, structure):
             fasta_name: str = re.sub("[^a-zA-Z0-9]", "", record.id.replace(":", "_"))
 
             chains_data[record.annotations["chain"]] = {
@@ -23,14 +69,110 @@ def extract_chains_from_pdb(file_path: str | None = None, file_content: str | No
                 "fasta_name": fasta_name,
                 "sequence": str(record.seq),
                 "start": record.annotations["start"],
-                "end": record.annotations["end"]
+                "end": record.annotations["end"],
+                "residue_numbers": get_residue_numbers(structure[0][record.annotations["chain"]])
             }
+            chains_data[record.annotations["chain"]]["residue_index"] = build_residue_index(chains_data[record.annotations["chain"]]["residue_numbers"])
 
         return chains_data
     except Exception as e:
         raise(e)
 
 
+def get_residue_numbers(chain: Chain) -> list[str]:
+    """
+    Determines the residue number (including insertion codes, e.g. '52A') of every position in a chain's sequence.
+    Mirrors the sequence extraction of Biopython's 'pdb-atom' parser, which fills missing residues with 'X', so that the returned list has the same length as the extracted sequence.
+    :param chain: A Bio.PDB chain object.
+    :return: A list of residue number strings, one per sequence position.
+    """
+    residues = [res for res in chain.get_unpacked_list() if res.get_resname().upper() in protein_letters_3to1_extended]
+    residue_numbers: list[str] = []
+
+    for i, residue in enumerate(residues):
+        residue_number: int = residue.id[1]
+        residue_numbers.append(f"{residue_number}{residue.id[2].strip()}")
+
+        if i == len(residues) - 1:
+            break
+
+        next_residue_number: int = residues[i + 1].id[1]
+        if next_residue_number < residue_number:
+            # out-of-order residues after a gap are dropped by the sequence parser as well
+            break
+
+        # fill gaps with the numbers of the missing residues
+        residue_numbers.extend(str(number) for number in range(residue_number + 1, next_residue_number))
+
+    return residue_numbers
+
+
+def build_residue_index(residue_numbers: list[str]) -> dict[str, int]:
+    """
+    Builds an index of a chain's residue numbers, which allows resolving residue numbers to sequence offsets in constant time
+    regardless of numbering gaps or insertion codes.
+    :param residue_numbers: The residue number of every sequence position as returned by get_residue_numbers.
+    :return: A dictionary mapping residue numbers (e.g. '52A') to their 0-indexed position in the chain's sequence.
+    """
+    return {number: i for i, number in enumerate(residue_numbers)}
+
+
+def parse_residue_number(residue_number: str) -> tuple[int, str]:
+    """
+    Splits a residue number into its sequence number and insertion code.
+    :param residue_number: A residue number as returned by get_residue_numbers (e.g. '52A' or '-3').
+    :return: A tuple of the sequence number and the insertion code (empty if there is none), e.g. (52, 'A').
+    """
+    match: re.Match = re.fullmatch(r"(-?\d+)([A-Za-z]?)", residue_number.strip())
+    if not match:
+        raise ValueError(f"Invalid residue number: '{residue_number}'")
+
+    return int(match.group(1)), match.group(2).upper()
+
+
+def get_residue_ranges(residue_numbers: list[str]) -> list[tuple[int, int]]:
+    """
+    Collapses residue numbers into contiguous ranges of sequence numbers, e.g. to style a selection with one call per range in 3D viewers.
+    Insertion codes are ignored, as viewers select residues by sequence number.
+    :param residue_numbers: Residue numbers in sequence order (e.g. ['1', '2', '52', '52A', '53']).
+    :return: A list of (first, last) sequence numbers (inclusive) of the contiguous ranges.
+    """
+    ranges: list[tuple[int, int]] = []
+    for residue_number in residue_numbers:
+        number: int = parse_residue_number(residue_number)[0]
+        if ranges and ranges[-1][1] <= number <= ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], number)
+        else:
+            ranges.append((number, number))
+
+    return ranges
+
+
+def resolve_selection(chain_data: dict[str, str | int | list[str] | dict[str, int]], first: int | str, last: int | str, by_residue_number: bool = True) -> tuple[int, int] | None:
+    """
+    Resolves a selection of a chain to the positions in the chain's sequence. This is the single place where selections are interpreted,
+    so a chain's sequence selection is simply chain_data['sequence'][start:end].
+    :param chain_data: The data of a chain as returned by extract_chains_from_pdb.
+    :param first: The first selected residue number (e.g. 1 or '52A') if by_residue_number, otherwise the 0-indexed start position.
+    :param last: The last selected residue number (inclusive) if by_residue_number, otherwise the 0-indexed end position (exclusive).
+    :param by_residue_number: Whether the selection is given by residue numbers of the structure or by positions in the sequence.
+    :return: A tuple of the 0-indexed start and end (exclusive) positions in the chain's sequence, or None if the selection is invalid.
+    """
+    if by_residue_number:
+        residue_index: dict[str, int] = chain_data.get("residue_index") or build_residue_index(chain_data["residue_numbers"])
+        start: int | None = residue_index.get(str(first).strip().upper())
+        end: int | None = residue_index.get(str(last).strip().upper())
+        if start is None or end is None or end < start:
+            return None
+
+        return start, end + 1
+
+    if not (isinstance(first, int) and isinstance(last, int) and 0 <= first < last <= len(chain_data["sequence"])):
+        return None
+
+    return first, last
+
+
 def extract_chains_from_fasta(fasta: str) -> list[dict] | None:
     """
     Extracts chain data from a FASTA formatted string.
@@ -84,16 +226,62 @@ def cut_protein(file_content: str) -> str:
     raise Exception("Feature currently under construction!")
 
 
-def get_pdb_from_rcsb(pdb_id: str) -> str | None:
+def trim_structure(pdb_content: str, chains: list[str] | None = None, level_of_detail: str = "auto", trace_threshold: int = TRACE_RESIDUE_THRESHOLD) -> str:
+    """
+    Reduces a structure to what the 3D viewer needs, which keeps the payload sent to the browser small for large complexes.
+    Only the coordinates of the first model are kept, hydrogens, waters and all header records are removed. Residue numbering is unchanged,
+    so selections of residues still apply to the trimmed structure.
+    :param pdb_content: The full pdb file as a string.
+    :param chains: The chain IDs to keep. If None, all chains are kept.
+    :param level_of_detail: One of LEVELS_OF_DETAIL. 'full' keeps all heavy atoms, 'trace' only C-alpha atoms, 'auto' uses the trace above the threshold.
+    :param trace_threshold: The number of residues above which 'auto' switches to the C-alpha trace.
+    :return: The trimmed structure in pdb format.
+    """
+    if level_of_detail not in LEVELS_OF_DETAIL:
+        raise ValueError(f"Invalid level of detail '{level_of_detail}', must be one of: {', '.join(LEVELS_OF_DETAIL)}")
+
+    kept_chains: set[str] | None = set(chains) if chains is not None else None
+    atom_lines: list[str] = []
+    ca_lines: list[str] = []
+
+    for line in pdb_content.splitlines():
+        record: str = line[:6]
+        if record == "ENDMDL":
+            # only the first model is displayed
+            break
+        if record not in ("ATOM  ", "HETATM"):
+            continue
+        if kept_chains is not None and line[21:22] not in kept_chains:
+            continue
+        if line[17:20].strip() in WATER_RESIDUES:
+            continue
+
+        # use the element column if present and fall back to the first letter of the atom name otherwise
+        element: str = line[76:78].strip() or line[12:16].strip()[:1]
+        if element in ("H", "D"):
+            continue
+
+        atom_lines.append(line)
+        if record == "ATOM  " and line[12:16] == " CA ":
+            ca_lines.append(line)
+
+    if level_of_detail == "trace" or (level_of_detail == "auto" and len(ca_lines) > trace_threshold):
+        atom_lines = ca_lines
+
+    return "\n".join(atom_lines + ["END", ""])
+
+
+def get_pdb_from_rcsb(pdb_id: str, timeout: float = RCSB_TIMEOUT) -> str | None:
     """
     Fetches a PDB file in plain text format from the RCSB PDB database.
     :param pdb_id: The PDB ID of the structure to fetch.
+    :param timeout: The number of seconds to wait for the server to respond.
     :return: The content of the PDB file as a string if successful, otherwise None.
     """
     url: str = f"https://files.rcsb.org/download/{pdb_id}.pdb"
 
     try:
-        res: requests.Response = requests.get(url)
+        res: requests.Response = requests.get(url, timeout=timeout)
         res.raise_for_status()
         return res.text
     except requests.exceptions.RequestException as e:
@@ -101,15 +289,16 @@ def get_pdb_from_rcsb(pdb_id: str) -> str | None:
         return None
 
 
-def get_fasta_from_rcsb(pdb_id: str) -> str | None:
+def get_fasta_from_rcsb(pdb_id: str, timeout: float = RCSB_TIMEOUT) -> str | None:
     """
     Fetches FASTA formatted sequences for a given PDB ID from the RCSB PDB database.
     :param pdb_id: The PDB ID of the structure to fetch FASTA for.
+    :param timeout: The number of seconds to wait for the server to respond.
     :return: The content of the FASTA file as a string if successful, otherwise None.
     """
     url: str = f"https://www.rcsb.org/fasta/entry/{pdb_id}"
     try:
-        res: requests.Response = requests.get(url)
+        res: requests.Response = requests.get(url, timeout=timeout)
         res.raise_for_status()
         return res.text
     except requests.exceptions.RequestException as e:
@@ -117,26 +306,331 @@ def get_fasta_from_rcsb(pdb_id: str) -> str | None:
         return None
 
 
-def generate_chain_selection(pdb_content: str, selection: dict[str, tuple[int, int]]) -> dict[str, str] | None:
+def get_chain_sequences_from_rcsb(pdb_id: str) -> dict[str, str] | None:
+    """
+    Fetches the sequences of all chains of a structure from RCSB. Much lighter than fetching and parsing the structure, but the sequences
+    are the full deposited sequences, including unresolved residues.
+    :param pdb_id: The PDB ID of the structure.
+    :return: A dictionary mapping author chain IDs (as used in PDB files) to sequences, or None if the sequences could not be retrieved.
+    """
+    fasta: str | None = get_fasta_from_rcsb(pdb_id)
+    if not fasta:
+        return None
+
+    sequences: dict[str, str] = {}
+    # headers have the form ">1A2Y_1|Chains A, C[auth L]|Description|Organism", followed by the sequence on a single line
+    for entry in fasta.split(">")[1:]:
+        header, _, sequence = entry.partition("\n")
+        fields: list[str] = header.split("|")
+        if len(fields) < 2:
+            continue
+
+        for chain in re.sub(r"^Chains? ", "", fields[1]).split(","):
+            author_id: re.Match | None = re.search(r"\[auth (\S+)]", chain)
+            sequences[author_id.group(1) if author_id else chain.strip()] = sequence.replace("\n", "").strip()
+
+    return sequences or None
+
+
+def extract_seqres_from_pdb(file_path: str | Path) -> dict[str, str] | None:
+    """
+    Extracts the deposited sequences of all chains from the SEQRES records of a PDB file. These are the same sequences as returned by
+    get_chain_sequences_from_rcsb, unlike the sequences of resolved residues returned by extract_chains_from_pdb.
+    Only the header of the file is read.
+    :param file_path: The path to the PDB file.
+    :return: A dictionary mapping chain IDs to sequences, or None if the file contains no SEQRES records.
     """
-    Generates a FASTA string from selected chains and residues within PDB content.
+    residues: dict[str, list[str]] = {}
+    try:
+        with open(file_path, "r") as f:
+            for line in f:
+                if line.startswith(("ATOM", "HETATM", "MODEL")): # SEQRES records precede the coordinates
+                    break
+                if line.startswith("SEQRES"):
+                    residues.setdefault(line[11], []).extend(line[19:].split())
+    except OSError as e:
+        print(f"Could not read SEQRES records from {file_path}: {e}")
+        return None
+
+    return {chain_id: "".join(protein_letters_3to1_extended.get(name.upper(), "X") for name in names) for chain_id, names in residues.items()} or None
+
+
+def find_interface_residues(pdb_content: str, cutoff: float = 5.0, padding: int = 10) -> dict[str, dict[str, dict[str, list[str]]]]:
+    """
+    Finds the residues of every chain which are in contact with another chain and proposes a compact residue range covering them.
+    Heavy atom coordinates are loaded into a NumPy array and all atom pairs closer than the cutoff are determined with a KD-tree.
     :param pdb_content: The full pdb file as a string.
-    :param selection: A dictionary where keys are chain IDs and values are tuples representing the (start_residue_index, end_residue_index) (0-indexed, end exclusive).
+    :param cutoff: The maximum distance in Angstrom between heavy atoms of two residues in contact.
+    :param padding: The number of residues added on both sides of the contacting residues when proposing a residue range.
+    :return: A dictionary mapping chain IDs to dictionaries which map each contacting partner chain ID to a dictionary with the contacting
+        'residues' (residue numbers in sequence order) and the proposed residue 'range' ([start, end] residue numbers, inclusive).
+    """
+    structure = PDBParser(QUIET=True).get_structure(None, StringIO(pdb_content))
+    model = structure[0]
+
+    coordinates: list[np.ndarray] = []
+    atom_residues: list[int] = []
+    residues: list[tuple[str, str]] = []
+    residue_numbers: dict[str, list[str]] = {}
+    for chain in model:
+        residue_numbers[chain.id] = get_residue_numbers(chain)
+        for residue in chain.get_unpacked_list():
+            if residue.get_resname().upper() not in protein_letters_3to1_extended:
+                continue
+
+            residues.append((chain.id, f"{residue.id[1]}{residue.id[2].strip()}"))
+            for atom in residue.get_atoms():
+                if atom.element != "H":
+                    coordinates.append(atom.coord)
+                    atom_residues.append(len(residues) - 1)
+
+    if not coordinates:
+        return {}
+
+    # determine all atom pairs within the cutoff and reduce them to pairs of residues in different chains
+    neighbors = KDTree(np.array(coordinates, dtype="d"), 10).neighbor_search(cutoff)
+    atom_pairs: np.ndarray = np.array([(neighbor.index1, neighbor.index2) for neighbor in neighbors], dtype=np.int64).reshape(-1, 2)
+    residue_pairs: np.ndarray = np.unique(np.array(atom_residues, dtype=np.int64)[atom_pairs], axis=0)
+    residue_chains: np.ndarray = np.array([chain_id for chain_id, _ in residues])
+    residue_pairs = residue_pairs[residue_chains[residue_pairs[:, 0]] != residue_chains[residue_pairs[:, 1]]]
+
+    contacts: dict[str, dict[str, set[str]]] = {}
+    for residue_a, residue_b in residue_pairs:
+        (chain_a, number_a), (chain_b, number_b) = residues[residue_a], residues[residue_b]
+        contacts.setdefault(chain_a, {}).setdefault(chain_b, set()).add(number_a)
+        contacts.setdefault(chain_b, {}).setdefault(chain_a, set()).add(number_b)
+
+    interfaces: dict[str, dict[str, dict[str, list[str]]]] = {}
+    for chain_id, partners in sorted(contacts.items()):
+        # order residues by their position in the chain's sequence, which also handles insertion codes
+        positions: dict[str, int] = build_residue_index(residue_numbers[chain_id])
+        interfaces[chain_id] = {}
+        for partner_id, numbers in sorted(partners.items()):
+            offsets: list[int] = sorted(positions[number] for number in numbers if number in positions)
+            if not offsets:
+                continue
+
+            interfaces[chain_id][partner_id] = {
+                "residues": [residue_numbers[chain_id][offset] for offset in offsets],
+                "range": [residue_numbers[chain_id][max(0, offsets[0] - padding)], residue_numbers[chain_id][min(len(residue_numbers[chain_id]) - 1, offsets[-1] + padding)]]
+            }
+
+    return interfaces
+
+
+def suggest_residue_range(interfaces: dict[str, dict[str, dict[str, list[str]]]], chains_data: dict[str, dict[str, str | int | list[str]]], chain_id: str, partner_ids: list[str] | None = None) -> tuple[str, str] | None:
+    """
+    Combines the proposed residue ranges of a chain's interfaces with the given partner chains into a single residue range.
+    :param interfaces: The result of find_interface_residues.
+    :param chains_data: The chain data of the same structure as returned by extract_chains_from_pdb.
+    :param chain_id: The chain to suggest a residue range for.
+    :param partner_ids: The partner chains (e.g. antigen chains) to consider. If None, all partner chains are considered.
+    :return: A tuple of the first and last residue number of the suggested range, or None if the chain has no contacts with the partners.
+    """
+    if chain_id not in interfaces or chain_id not in chains_data:
+        return None
+
+    ranges: list[list[str]] = [interface["range"] for partner_id, interface in interfaces[chain_id].items() if partner_ids is None or partner_id in partner_ids]
+    if not ranges:
+        return None
+
+    positions: dict[str, int] = chains_data[chain_id].get("residue_index") or build_residue_index(chains_data[chain_id]["residue_numbers"])
+    return min((start for start, _ in ranges), key=lambda number: positions.get(number, 0)), max((end for _, end in ranges), key=lambda number: positions.get(number, 0))
+
+
+def get_terminus_coordinates(pdb_content: str, segments: dict[str, tuple[str, str]]) -> dict[str, np.ndarray]:
+    """
+    Retrieves the C-alpha coordinates of the N- and C-terminus of selected chain segments. If a terminal residue has no C-alpha atom
+    (e.g. it lies in a gap of the model), the closest resolved residue within the segment is used instead.
+    :param pdb_content: The full pdb file as a string.
+    :param segments: A dictionary mapping chain IDs to the (first, last) residue numbers of the selected segment (inclusive, e.g. ('1', '52A')).
+    :return: A dictionary mapping chain IDs to a (2, 3) array holding the N-terminal and C-terminal C-alpha coordinates. Segments without resolved residues are omitted.
+    """
+    structure = PDBParser(QUIET=True).get_structure(None, StringIO(pdb_content))
+    model = structure[0]
+
+    termini: dict[str, np.ndarray] = {}
+    for chain_id, (first, last) in segments.items():
+        if chain_id not in model:
+            continue
+
+        chain: Chain = model[chain_id]
+        positions: dict[str, int] = build_residue_index(get_residue_numbers(chain))
+        if str(first) not in positions or str(last) not in positions:
+            continue
+
+        # collect the sequence positions and coordinates of all resolved residues of the segment
+        resolved: list[tuple[int, np.ndarray]] = [(positions[number], residue["CA"].coord) for residue in chain.get_unpacked_list()
+                                                   if "CA" in residue and (number := f"{residue.id[1]}{residue.id[2].strip()}") in positions
+                                                   and positions[str(first)] <= positions[number] <= positions[str(last)]]
+        if resolved:
+            resolved.sort(key=lambda position_coordinate: position_coordinate[0])
+            termini[chain_id] = np.array([resolved[0][1], resolved[-1][1]], dtype=np.float64)
+
+    return termini
+
+
+def calculate_linker_repeats(distances: np.ndarray, linker_pattern: str = "GGGGS", residue_span: float = LINKER_RESIDUE_SPAN, min_repeats: int = 1) -> np.ndarray:
+    """
+    Calculates the smallest number of linker pattern repeats spanning given terminus distances.
+    A linker of n residues connects two C-alpha atoms via n + 1 peptide units, so it spans (n + 1) * residue_span Angstrom.
+    :param distances: An array of C-terminus to N-terminus distances in Angstrom of any shape.
+    :param linker_pattern: The amino acid pattern which is repeated to form the linker.
+    :param residue_span: The distance in Angstrom a single linker residue is assumed to span.
+    :param min_repeats: The minimum number of repeats, even for termini in direct contact.
+    :return: An integer array of the same shape as distances holding the required number of repeats.
+    """
+    required_residues: np.ndarray = np.maximum(np.asarray(distances, dtype=np.float64) / residue_span - 1, 0)
+
+    return np.maximum(np.ceil(required_residues / len(linker_pattern)), min_repeats).astype(np.int64)
+
+
+def suggest_chain_order(termini: dict[str, np.ndarray], chain_ids: list[str], linker_pattern: str = "GGGGS", residue_span: float = LINKER_RESIDUE_SPAN, min_repeats: int = 1) -> dict[str, list[str] | list[float] | list[int]]:
+    """
+    Finds the order of chain segments which requires the shortest linkers when they are linked into a single chain.
+    All permutations are evaluated at once on the matrix of C-terminus to N-terminus distances. Orders are ranked by the total number of
+    linker repeats and ties are broken by the total distance.
+    :param termini: The terminus coordinates of the segments as returned by get_terminus_coordinates.
+    :param chain_ids: The IDs of the chain segments to order.
+    :param linker_pattern: The amino acid pattern which is repeated to form the linkers.
+    :param residue_span: The distance in Angstrom a single linker residue is assumed to span.
+    :param min_repeats: The minimum number of repeats per linker.
+    :return: A dictionary with the best 'order' of chain IDs and the 'distances' and linker 'repeats' of each junction in that order.
+    """
+    if any(chain_id not in termini for chain_id in chain_ids):
+        raise ValueError(f"No terminus coordinates for chains: {', '.join(chain_id for chain_id in chain_ids if chain_id not in termini)}")
+    if len(chain_ids) > MAX_ORDER_SEGMENTS:
+        raise ValueError(f"At most {MAX_ORDER_SEGMENTS} segments can be ordered, got {len(chain_ids)}.")
+    if not chain_ids:
+        return {"order": [], "distances": [], "repeats": []}
+
+    # distances[i, j] is the distance from the C-terminus of segment i to the N-terminus of segment j
+    coordinates: np.ndarray = np.array([termini[chain_id] for chain_id in chain_ids])
+    distances: np.ndarray = np.linalg.norm(coordinates[:, None, 1, :] - coordinates[None, :, 0, :], axis=-1)
+    repeats: np.ndarray = calculate_linker_repeats(distances, linker_pattern, residue_span, min_repeats)
+
+    # score every permutation by gathering its junctions from the matrices
+    orders: np.ndarray = np.array(list(permutations(range(len(chain_ids)))), dtype=np.int64)
+    junctions: tuple[np.ndarray, np.ndarray] = (orders[:, :-1], orders[:, 1:])
+    best: np.ndarray = orders[np.lexsort((distances[junctions].sum(axis=1), repeats[junctions].sum(axis=1)))[0]]
+
+    return {"order": [chain_ids[i] for i in best],
+            "distances": [round(float(distance), 2) for distance in distances[best[:-1], best[1:]]],
+            "repeats": [int(repeat) for repeat in repeats[best[:-1], best[1:]]]}
+
+
+def get_fetch_pool() -> ThreadPoolExecutor:
+    """
+    Retrieves the thread pool fetching structures from RCSB, creating it on first use.
+    :return: The shared thread pool.
+    """
+    global _fetch_pool
+    with _pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=MAX_RCSB_REQUESTS, thread_name_prefix="rcsb_fetch")
+
+        return _fetch_pool
+
+
+def submit_parse(pdb_content: str) -> Future:
+    """
+    Extracts the chains of a structure in the shared process pool, creating the pool on first use.
+    :param pdb_content: The content of the PDB file.
+    :return: A future of the result of extract_chains_from_pdb.
+    """
+    global _parse_pool
+    with _pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+
+        try:
+            return _parse_pool.submit(extract_chains_from_pdb, None, pdb_content)
+        except BrokenProcessPool:
+            # a worker process died (e.g. killed for its memory usage), which renders the pool unusable, so it is replaced
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+            return _parse_pool.submit(extract_chains_from_pdb, None, pdb_content)
+
+
+def iter_chains_from_rcsb(pdb_ids: list[str], max_concurrency: int = 8) -> Iterator[tuple[str, dict[str, dict[str, str | int]] | None, str | None]]:
+    """
+    Fetches multiple PDB files from RCSB concurrently and extracts their chains in a process pool.
+    Results are yielded as soon as each structure is parsed, so the total latency approaches that of the slowest single fetch.
+    Fetching and parsing use pools shared by all calls, which bound the total number of requests (MAX_RCSB_REQUESTS) and worker processes (PARSE_WORKERS).
+    :param pdb_ids: The PDB IDs of the structures to fetch.
+    :param max_concurrency: The maximum number of concurrent requests to RCSB of this call.
+    :return: An iterator of (pdb_id, chains_data, error) tuples in order of completion. Exactly one of chains_data and error is None.
+    """
+    if not pdb_ids:
+        return
+
+    fetch_pool: ThreadPoolExecutor = get_fetch_pool()
+    queued: Iterator[str] = iter(pdb_ids)
+    # map pending futures to their pdb id, fetches are replaced by their parse job once the file has arrived
+    pending: dict[Future, tuple[str, str]] = {}
+
+    def submit_fetches() -> None:
+        # keep at most max_concurrency fetches of this call pending, so a single call does not occupy the whole shared pool
+        while sum(stage == "fetch" for _, stage in pending.values()) < max_concurrency and (pdb_id := next(queued, None)) is not None:
+            pending[fetch_pool.submit(get_pdb_from_rcsb, pdb_id)] = (pdb_id, "fetch")
+
+    submit_fetches()
+    try:
+        while pending:
+            done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                pdb_id, stage = pending.pop(future)
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield pdb_id, None, f"Could not {stage} PDB ID '{pdb_id}': {e}"
+                    continue
+
+                if stage == "fetch":
+                    if not result:
+                        yield pdb_id, None, f"PDB ID '{pdb_id}' not found or could not be retrieved from RCSB."
+                        continue
+
+                    pending[submit_parse(result)] = (pdb_id, "parse")
+
+                elif not result:
+                    yield pdb_id, None, f"No chain data extracted for PDB ID '{pdb_id}'."
+
+                else:
+                    yield pdb_id, result, None
+
+            submit_fetches()
+    finally:
+        # cancel outstanding work if the consumer stops early (e.g. a closed client connection)
+        for future in pending:
+            future.cancel()
+
+
+def generate_chain_selection(pdb_content: str | None, selection: dict[str, tuple[int | str, int | str]], by_residue_number: bool = False, chains_data: dict[str, dict] | None = None) -> dict[str, str] | None:
+    """
+    Generates the selected sequences of chains within PDB content.
+    :param pdb_content: The full pdb file as a string. Only parsed if no chains_data is provided.
+    :param selection: A dictionary where keys are chain IDs and values are tuples of either the first and last residue number (inclusive, e.g. (1, '52A'))
+        if by_residue_number, or the (start_residue_index, end_residue_index) (0-indexed, end exclusive) otherwise.
+    :param by_residue_number: Whether the selection is given by residue numbers of the structure or by positions in the sequence.
+    :param chains_data: Already extracted chain data of the structure as returned by extract_chains_from_pdb.
     :return: A dictionary where keys are chain IDs and values are the selected sequence strings, or None if input is invalid.
     """
-    if not (pdb_content and selection):
+    if not ((pdb_content or chains_data) and selection):
         return None
 
+    chains_data = chains_data or extract_chains_from_pdb(file_content=pdb_content)
     chain_selection: dict[str, str] = {}
-    pdb_data: list[dict[str, str]] = extract_chains_from_pdb(file_content=pdb_content)
 
-    for chain_data in pdb_data:
-        chain_id: str = chain_data["chain_id"]
-        if not chain_id in selection.keys():
-            continue
+    for chain_id, (first, last) in selection.items():
+        if chain_id not in chains_data:
+            return None
+
+        positions: tuple[int, int] | None = resolve_selection(chains_data[chain_id], first, last, by_residue_number)
+        if not positions:
+            return None
 
-        sequence: str = chain_data["sequence"][selection[chain_id][0]:selection[chain_id][1]]
-        chain_selection[chain_id] = sequence
+        chain_selection[chain_id] = chains_data[chain_id]["sequence"][positions[0]:positions[1]]
 
     return chain_selection
 
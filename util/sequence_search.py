@@ -0,0 +1,216 @@
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+import sqlite3
+import time
+import numpy as np
+
+from util import DATA_DIR
+from util.chain_database import CHAIN_DATABASE
+
+# Defines the path of the k-mer index built from the chain database.
+KMER_INDEX: Path = DATA_DIR / "chain_kmer_index.npz"
+
+# Defines the k-mer length. Longer k-mers make posting lists shorter (faster queries) while shorter k-mers are more sensitive for distant hits.
+KMER_LENGTH: int = 5
+
+# Maps the 20 standard amino acids to integer codes. k-mers containing any other letter (e.g. X for missing residues) are ignored.
+AMINO_ACIDS: str = "ACDEFGHIKLMNPQRSTVWY"
+_AA_CODES: np.ndarray = np.full(256, -1, dtype=np.int64)
+_AA_CODES[np.frombuffer(AMINO_ACIDS.encode(), dtype=np.uint8)] = np.arange(len(AMINO_ACIDS))
+
+
+def encode_kmers(sequence: str, k: int = KMER_LENGTH) -> np.ndarray:
+    """
+    Encodes all k-mers of an amino acid sequence as unique integers.
+    :param sequence: The amino acid sequence.
+    :param k: The k-mer length.
+    :return: A sorted array of the unique k-mer codes of the sequence.
+    """
+    codes: np.ndarray = _AA_CODES[np.frombuffer(sequence.upper().encode("ascii", "replace"), dtype=np.uint8)]
+    if len(codes) < k:
+        return np.empty(0, dtype=np.int64)
+
+    # build the k-mer codes in base len(AMINO_ACIDS) using a sliding window over the residue codes
+    windows: np.ndarray = np.lib.stride_tricks.sliding_window_view(codes, k)
+    valid: np.ndarray = (windows >= 0).all(axis=1)
+    kmers: np.ndarray = windows[valid] @ (len(AMINO_ACIDS) ** np.arange(k - 1, -1, -1, dtype=np.int64))
+
+    return np.unique(kmers)
+
+
+class KmerIndex:
+    """
+    Inverted k-mer index over chain sequences. Every k-mer code points to the list of chains containing it,
+    which allows ranking all chains by the number of shared k-mers with a query without aligning sequences.
+    """
+    def __init__(self, pdb_ids: np.ndarray, chain_ids: np.ndarray, kmer_counts: np.ndarray, kmer_codes: np.ndarray, offsets: np.ndarray, postings: np.ndarray, k: int = KMER_LENGTH) -> None:
+        """
+        Initializes a KmerIndex from its arrays. Use KmerIndex.build or KmerIndex.load to create an index.
+        :param pdb_ids: The PDB ID of every indexed chain.
+        :param chain_ids: The chain ID of every indexed chain.
+        :param kmer_counts: The number of unique k-mers of every indexed chain.
+        :param kmer_codes: The sorted unique k-mer codes contained in the index.
+        :param offsets: The start of each k-mer's posting list in postings (length len(kmer_codes) + 1).
+        :param postings: The concatenated posting lists holding chain indices.
+        :param k: The k-mer length used to build the index.
+        :return: None
+        """
+        self.pdb_ids: np.ndarray = pdb_ids
+        self.chain_ids: np.ndarray = chain_ids
+        self.kmer_counts: np.ndarray = kmer_counts
+        self.kmer_codes: np.ndarray = kmer_codes
+        self.offsets: np.ndarray = offsets
+        self.postings: np.ndarray = postings
+        self.k: int = k
+
+    @classmethod
+    def build(cls, chains: list[tuple[str, str, str]], k: int = KMER_LENGTH) -> "KmerIndex":
+        """
+        Builds an index from a list of chains.
+        :param chains: A list of (pdb_id, chain_id, sequence) tuples.
+        :param k: The k-mer length.
+        :return: The built KmerIndex.
+        """
+        chain_kmers: list[np.ndarray] = [encode_kmers(sequence, k) for _, _, sequence in chains]
+        kmer_counts: np.ndarray = np.array([len(kmers) for kmers in chain_kmers], dtype=np.int32)
+
+        all_kmers: np.ndarray = np.concatenate(chain_kmers) if chain_kmers else np.empty(0, dtype=np.int64)
+        all_chains: np.ndarray = np.repeat(np.arange(len(chains), dtype=np.int32), kmer_counts)
+
+        # sort (k-mer, chain) pairs by k-mer, so each k-mer's chains form one contiguous posting list
+        order: np.ndarray = np.argsort(all_kmers, kind="stable")
+        kmer_codes, counts = np.unique(all_kmers[order], return_counts=True)
+        offsets: np.ndarray = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        return cls(pdb_ids=np.array([pdb_id for pdb_id, _, _ in chains], dtype=str),
+                   chain_ids=np.array([chain_id for _, chain_id, _ in chains], dtype=str),
+                   kmer_counts=kmer_counts,
+                   kmer_codes=kmer_codes,
+                   offsets=offsets,
+                   postings=all_chains[order],
+                   k=k)
+
+    @classmethod
+    def load(cls, file_path: Path = KMER_INDEX) -> "KmerIndex":
+        """
+        Loads an index saved with KmerIndex.save.
+        :param file_path: The path of the saved index.
+        :return: The loaded KmerIndex.
+        """
+        with np.load(file_path) as data:
+            return cls(**{key: data[key] for key in ("pdb_ids", "chain_ids", "kmer_counts", "kmer_codes", "offsets", "postings")}, k=int(data["k"]))
+
+    def save(self, file_path: Path = KMER_INDEX) -> None:
+        """
+        Saves the index as a numpy archive.
+        :param file_path: The path to save the index to.
+        :return: None
+        """
+        np.savez(file_path, pdb_ids=self.pdb_ids, chain_ids=self.chain_ids, kmer_counts=self.kmer_counts, kmer_codes=self.kmer_codes, offsets=self.offsets, postings=self.postings, k=self.k)
+
+    def __len__(self) -> int:
+        return len(self.pdb_ids)
+
+    def search(self, sequence: str, top_n: int = 20, min_identity: float = 0.0) -> list[dict[str, str | int | float]]:
+        """
+        Ranks all indexed chains by the number of k-mers shared with the query sequence.
+        The identity is approximated from the fraction of shared query k-mers f as f^(1/k), since a k-mer is only conserved if all k residues are.
+        :param sequence: The query amino acid sequence.
+        :param top_n: The maximum number of hits to return.
+        :param min_identity: The minimum approximate identity of returned hits.
+        :return: A list of hits sorted by shared k-mers, each a dictionary with 'pdb', 'chain_id', 'shared_kmers' and 'identity'.
+        """
+        query_kmers: np.ndarray = encode_kmers(sequence, self.k)
+        if len(query_kmers) == 0 or len(self) == 0:
+            return []
+
+        # look up the posting list of every query k-mer contained in the index
+        positions: np.ndarray = np.searchsorted(self.kmer_codes, query_kmers)
+        found: np.ndarray = positions < len(self.kmer_codes)
+        found[found] = self.kmer_codes[positions[found]] == query_kmers[found]
+        positions = positions[found]
+        if len(positions) == 0:
+            return []
+
+        hit_chains: np.ndarray = np.concatenate([self.postings[self.offsets[i]:self.offsets[i + 1]] for i in positions])
+        shared: np.ndarray = np.bincount(hit_chains, minlength=len(self))
+
+        # select the top hits without sorting all chains
+        candidates: np.ndarray = np.flatnonzero(shared)
+        if len(candidates) > top_n:
+            candidates = candidates[np.argpartition(-shared[candidates], top_n - 1)[:top_n]]
+        candidates = candidates[np.lexsort((candidates, -shared[candidates]))]
+
+        identities: np.ndarray = (shared[candidates] / len(query_kmers)) ** (1 / self.k)
+
+        return [{"pdb": str(self.pdb_ids[i]), "chain_id": str(self.chain_ids[i]), "shared_kmers": int(shared[i]), "identity": round(float(identity), 3)}
+                for i, identity in zip(candidates, identities) if identity >= min_identity]
+
+
+def build_kmer_index(db_path: Path = CHAIN_DATABASE, index_path: Path = KMER_INDEX, k: int = KMER_LENGTH) -> KmerIndex:
+    """
+    Builds a k-mer index over every chain sequence in the chain database and saves it.
+    :param db_path: The path of the chain database.
+    :param index_path: The path to save the index to.
+    :param k: The k-mer length.
+    :return: The built KmerIndex.
+    """
+    with closing(sqlite3.connect(db_path)) as conn:
+        chains: list[tuple[str, str, str]] = conn.execute("select pdb, chain_id, sequence from chains order by pdb, chain_id").fetchall()
+
+    index: KmerIndex = KmerIndex.build(chains, k)
+    index.save(index_path)
+
+    return index
+
+
+@lru_cache(maxsize=1)
+def load_kmer_index(database_version: float) -> KmerIndex:
+    """
+    Loads the k-mer index once per version of the chain database. If no saved index exists or it is older than the chain database
+    (e.g., after rebuilding the database with python -m util.chain_database), it is built from the chain database.
+    Must only be called if the index or the chain database exists, see get_kmer_index.
+    :param database_version: The modification time of the chain database, or 0 if there is none. Part of the cache key, so a rebuilt database is picked up.
+    :return: The KmerIndex.
+    """
+    if KMER_INDEX.is_file() and KMER_INDEX.stat().st_mtime >= database_version:
+        return KmerIndex.load(KMER_INDEX)
+
+    return build_kmer_index()
+
+
+def get_kmer_index() -> KmerIndex | None:
+    """
+    Retrieves the k-mer index of the current chain database, loading or building it on first use. A missing index is not cached,
+    so it is picked up as soon as it is created (e.g., by the setup).
+    :return: The KmerIndex, or None if neither an index nor a chain database is available.
+    """
+    if CHAIN_DATABASE.is_file():
+        return load_kmer_index(CHAIN_DATABASE.stat().st_mtime)
+
+    if KMER_INDEX.is_file():
+        return load_kmer_index(0.0)
+
+    return None
+
+
+def search_sequence(sequence: str, top_n: int = 20, min_identity: float = 0.0) -> dict[str, list[dict[str, str | int | float]] | float]:
+    """
+    Searches the local structures for chains similar to a query sequence, e.g. a custom binder.
+    :param sequence: The query amino acid sequence.
+    :param top_n: The maximum number of hits to return.
+    :param min_identity: The minimum approximate identity of returned hits.
+    :return: A dictionary containing the ranked hits and the search duration in seconds.
+    """
+    start: float = time.perf_counter()
+    index: KmerIndex | None = get_kmer_index()
+    hits: list[dict[str, str | int | float]] = index.search(sequence, top_n, min_identity) if index else []
+
+    return {"hits": hits, "search_duration": time.perf_counter() - start}
+
+
+# Can be run from the project root to (re-)build the k-mer index: python -m util.sequence_search
+if __name__ == "__main__":
+    print("Building k-mer index over local chain sequences...")
+    print(f"Successfully indexed {len(build_kmer_index())} chains in {KMER_INDEX}")
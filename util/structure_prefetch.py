@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+from util.chain_database import get_local_chains
+from util.pdb_interaction import extract_chains_from_pdb, get_pdb_from_rcsb
+
+# Defines the number of top-ranked search results which are prefetched.
+PREFETCH_COUNT: int = 5
+# Defines the maximum number of seconds to wait for a structure which is still being prefetched, afterwards it is fetched directly.
+PREFETCH_TIMEOUT: float = 10
+
+
+class StructurePrefetcher:
+    """
+    Downloads structures and extracts their chains in a background thread pool, so they are available as soon as a user selects them.
+    At most max_structures structures are kept, the least recently requested ones are dropped first. A single instance can be shared by
+    multiple users (e.g., all sessions of the app), structures requested by several users are only fetched once. Requests are tagged with
+    a token per user, so a new search of one user cancels the pending structures of their previous search without affecting other users.
+    """
+    def __init__(self, max_workers: int = 4, max_structures: int = 16, fetch_structure: Callable[[str], str | None] = get_pdb_from_rcsb) -> None:
+        """
+        Initializes a StructurePrefetcher.
+        :param max_workers: The maximum number of structures which are downloaded concurrently.
+        :param max_structures: The maximum number of structures (finished or pending) which are kept in memory.
+        :param fetch_structure: The function retrieving the content of a pdb file by its PDB ID, e.g. a cached version of get_pdb_from_rcsb,
+            which is warmed by prefetching.
+        :return: None
+        """
+        self.max_structures: int = max_structures
+        self._fetch_structure: Callable[[str], str | None] = fetch_structure
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="structure_prefetch")
+        self._futures: OrderedDict[str, Future] = OrderedDict()
+        self._tokens: dict[str, set[str]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _fetch(self, pdb_id: str) -> tuple[str | None, dict[str, dict[str, str | int | list[str]]] | None]:
+        """
+        Worker function which downloads a structure and retrieves its chain data.
+        :param pdb_id: The PDB ID of the structure.
+        :return: A tuple of the pdb file's content and its chain data, both None if the structure could not be retrieved.
+        """
+        pdb_content: str | None = self._fetch_structure(pdb_id)
+        if not pdb_content:
+            return None, None
+
+        return pdb_content, get_local_chains(pdb_id) or extract_chains_from_pdb(file_content=pdb_content)
+
+    def prefetch(self, pdb_ids: list[str], token: str | None = None) -> None:
+        """
+        Starts fetching the given structures in the background. Structures which are still pending from the previous request with the same token
+        and are not requested again are cancelled, unless another token requested them as well. Requests of other tokens are kept, but the
+        structures requested least recently are dropped (and cancelled if still pending) once more than max_structures are kept.
+        :param pdb_ids: The PDB IDs to prefetch, in order of priority. An empty list only cancels the previous request of the token.
+        :param token: Identifies the requester (e.g., a session of the app). Requests without a token do not cancel anything.
+        :return: None
+        """
+        pdb_ids = list(dict.fromkeys(pdb_id.lower() for pdb_id in pdb_ids))[:self.max_structures]
+
+        with self._lock:
+            if token is not None:
+                # release the structures of the previous request of this token, cancelling those no one else waits for
+                for pdb_id, tokens in list(self._tokens.items()):
+                    if token in tokens and pdb_id not in pdb_ids:
+                        tokens.discard(token)
+                        if not tokens and self._futures[pdb_id].cancel():
+                            del self._futures[pdb_id], self._tokens[pdb_id]
+
+            for pdb_id in pdb_ids:
+                if pdb_id not in self._futures:
+                    self._futures[pdb_id] = self._executor.submit(self._fetch, pdb_id)
+                    self._tokens[pdb_id] = set()
+                if token is not None:
+                    self._tokens[pdb_id].add(token)
+                self._futures.move_to_end(pdb_id)
+
+            # bound memory by dropping the least recently requested structures
+            while len(self._futures) > self.max_structures:
+                pdb_id, future = self._futures.popitem(last=False)
+                del self._tokens[pdb_id]
+                future.cancel()
+
+    def get(self, pdb_id: str, timeout: float | None = None) -> tuple[str | None, dict[str, dict[str, str | int | list[str]]] | None] | None:
+        """
+        Retrieves a prefetched structure. If it is still being downloaded, this waits for the download instead of starting another one.
+        :param pdb_id: The PDB ID of the structure.
+        :param timeout: The maximum number of seconds to wait for a pending structure. Waits indefinitely if None.
+        :return: A tuple of the pdb file's content and its chain data, or None if the structure was not prefetched or is still pending after the timeout.
+        """
+        with self._lock:
+            future: Future | None = self._futures.get(pdb_id.lower())
+            if future is not None:
+                self._futures.move_to_end(pdb_id.lower())
+
+        if future is None or future.cancelled():
+            return None
+
+        try:
+            return future.result(timeout)
+        except TimeoutError: # still downloading, the caller fetches the structure itself
+            return None
+        except Exception as e:
+            print(f"Error prefetching structure {pdb_id}: {e}")
+            return None
+
+    def cancel(self) -> None:
+        """
+        Cancels all pending work. Structures which are currently downloaded or already finished are kept.
+        :return: None
+        """
+        with self._lock:
+            for pdb_id, future in list(self._futures.items()):
+                if future.cancel():
+                    del self._futures[pdb_id], self._tokens[pdb_id]
+
+    def shutdown(self) -> None:
+        """
+        Cancels all pending work and stops the thread pool without waiting for running downloads.
+        :return: None
+        """
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)